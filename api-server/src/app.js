@@ -1,10 +1,14 @@
+const cluster = require('cluster');
 const express = require('express');
 const cors = require('cors');
 const mongoose = require('mongoose');
 const config = require('./config');
 const statsController = require('./controllers/statsController');
+const backfillController = require('./controllers/backfillController');
 const natsService = require('./services/natsService');
 const dbService = require('./services/dbService');
+const { registry, httpMetricsMiddleware } = require('./utils/metrics');
+const { ingestionValidators, encodedResponses } = require('./utils/httpCache');
 
 // Create Express app
 const app = express();
@@ -12,17 +16,34 @@ const app = express();
 // Middleware
 app.use(cors());
 app.use(express.json());
+app.use(httpMetricsMiddleware);
+app.use(encodedResponses);
 
 // Routes
-app.get('/stats', statsController.getStats);
-app.get('/deviation', statsController.getDeviation);
+app.get('/stats', ingestionValidators, statsController.getStats);
+app.get('/deviation', ingestionValidators, statsController.getDeviation);
+app.get('/candles', ingestionValidators, statsController.getCandles);
+app.get('/export', statsController.exportHistory);
 app.post('/trigger-update', statsController.triggerUpdate);
+app.post('/backfill', backfillController.startBackfill);
+app.get('/backfill', backfillController.getBackfillStatus);
 
 // Health check endpoint
 app.get('/health', (req, res) => {
   res.json({ status: 'OK', timestamp: new Date() });
 });
 
+// Prometheus metrics endpoint
+app.get('/metrics', async (req, res) => {
+  try {
+    res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+    res.send(await registry.render());
+  } catch (error) {
+    console.error('Error rendering metrics:', error);
+    res.status(500).end();
+  }
+});
+
 // Connect to MongoDB
 mongoose.connect(config.mongodbUri)
   .then(() => {
@@ -32,10 +53,12 @@ mongoose.connect(config.mongodbUri)
     natsService.connect()
       .catch(err => console.error('Failed to connect to NATS:', err));
     
-    // Initial data fetch
-    dbService.storeCryptoStats()
-      .then(() => console.log('Initial cryptocurrency data stored successfully'))
-      .catch(err => console.error('Error storing initial cryptocurrency data:', err));
+    // Initial data fetch (only once per cluster, not once per worker)
+    if (!cluster.isWorker || cluster.worker.id === 1) {
+      dbService.storeCryptoStats()
+        .then(() => console.log('Initial cryptocurrency data stored successfully'))
+        .catch(err => console.error('Error storing initial cryptocurrency data:', err));
+    }
   })
   .catch(err => {
     console.error('Failed to connect to MongoDB:', err);
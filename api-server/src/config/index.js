@@ -2,8 +2,34 @@ require('dotenv').config();
 
 module.exports = {
   port: process.env.PORT || 3000,
+  // Number of processes to fork behind the port: a number or 'auto' for one per core
+  clusterWorkers: process.env.CLUSTER_WORKERS || 1,
   mongodbUri: process.env.MONGODB_URI || '',
   natsUrl: process.env.NATS_URL || 'nats://localhost:4222',
   coinGeckoApiUrl: process.env.COINGECKO_API_URL || 'https://api.coingecko.com/api/v3',
-  supportedCoins: ['bitcoin', 'ethereum', 'matic-network']
+  // Calls to CoinGecko are spaced to stay under this rate (public API limits are per minute)
+  coinGeckoRequestsPerMinute: Number(process.env.COINGECKO_REQUESTS_PER_MINUTE) || 10,
+  coinGeckoMaxRetries: 5,
+  supportedCoins: ['bitcoin', 'ethereum', 'matic-network'],
+  // Values are stored in USD with a per-tick FX vector for these currencies and converted on read
+  quoteCurrencies: (process.env.QUOTE_CURRENCIES || 'usd,eur,gbp,jpy,inr,cny,aud,cad,chf').split(','),
+  // Exchange rates move slowly; ingestions within this window reuse the last fetched vector
+  fxRefreshMs: 5 * 60 * 1000,
+  // JetStream work queue shared by all API replicas; each shard message is handled by exactly one replica
+  ingestStream: process.env.INGEST_STREAM || 'CRYPTO_UPDATES',
+  ingestSubject: 'crypto.update',
+  ingestConsumer: process.env.INGEST_CONSUMER || 'api-ingest',
+  ingestAckWaitMs: 60 * 1000,
+  ingestMaxDeliver: 5,
+  // Raw ticks older than this are expired by MongoDB; charts read from candles instead
+  rawRetentionDays: Number(process.env.RAW_RETENTION_DAYS) || 90,
+  // Candle bucket sizes (in milliseconds) maintained on every ingestion tick
+  candleIntervals: {
+    '1h': 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000
+  },
+  // Historical backfill: CoinGecko returns hourly points for ranges of up to 90 days, so windows
+  // (plus a day of lead-in for 24h change) stay well below that
+  backfillWindowDays: 30,
+  backfillConcurrency: Number(process.env.BACKFILL_CONCURRENCY) || 3
 };
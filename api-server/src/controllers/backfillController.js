@@ -0,0 +1,68 @@
+const backfillService = require('../services/backfillService');
+const config = require('../config');
+
+// Upper bound on a single backfill request
+const MAX_BACKFILL_DAYS = 3650;
+
+/**
+ * Controller for historical backfill endpoints
+ */
+class BackfillController {
+  /**
+   * Start a historical backfill in the background
+   * @param {Object} req - Express request object
+   * @param {Object} res - Express response object
+   */
+  async startBackfill(req, res) {
+    try {
+      const body = req.body || {};
+      const coins = body.coins || config.supportedCoins;
+      const days = Number(body.days || 365);
+      const concurrency = Number(body.concurrency || config.backfillConcurrency);
+      
+      if (!Array.isArray(coins) || coins.length === 0 || coins.some(coin => !config.supportedCoins.includes(coin))) {
+        return res.status(400).json({ 
+          error: `Unsupported coin. Must be one of: ${config.supportedCoins.join(', ')}` 
+        });
+      }
+      
+      if (!Number.isInteger(days) || days < 1 || days > MAX_BACKFILL_DAYS) {
+        return res.status(400).json({ error: `days must be an integer between 1 and ${MAX_BACKFILL_DAYS}` });
+      }
+      
+      if (!Number.isInteger(concurrency) || concurrency < 1) {
+        return res.status(400).json({ error: 'concurrency must be a positive integer' });
+      }
+      
+      const { job, started } = await backfillService.start({ coins, days, concurrency });
+      if (!started) {
+        return res.status(409).json({ error: 'A backfill is already running', job });
+      }
+      
+      res.status(202).json(job);
+    } catch (error) {
+      console.error('Error in startBackfill:', error);
+      res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+  }
+  
+  /**
+   * Get the status of the most recent backfill, run by any API process
+   * @param {Object} req - Express request object
+   * @param {Object} res - Express response object
+   */
+  async getBackfillStatus(req, res) {
+    try {
+      const job = await backfillService.getStatus();
+      if (!job) {
+        return res.status(404).json({ error: 'No backfill has been started' });
+      }
+      res.json(job);
+    } catch (error) {
+      console.error('Error in getBackfillStatus:', error);
+      res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+  }
+}
+
+module.exports = new BackfillController();
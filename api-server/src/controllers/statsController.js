@@ -1,5 +1,9 @@
 const dbService = require('../services/dbService');
 const config = require('../config');
+const { EXPORT_FORMATS, EXPORT_FIELDS, toExportRow, formatRow } = require('../utils/exportUtils');
+
+// Number of rows serialized per write to the response stream
+const EXPORT_CHUNK_ROWS = 500;
 
 /**
  * Controller for cryptocurrency statistics endpoints
@@ -12,7 +16,7 @@ class StatsController {
    */
   async getStats(req, res) {
     try {
-      const { coin } = req.query;
+      const { coin, currency = 'usd' } = req.query;
       
       if (!coin) {
         return res.status(400).json({ error: 'Coin parameter is required' });
@@ -24,7 +28,13 @@ class StatsController {
         });
       }
       
-      const stats = await dbService.getLatestStats(coin);
+      if (!config.quoteCurrencies.includes(currency)) {
+        return res.status(400).json({ 
+          error: `Unsupported currency. Must be one of: ${config.quoteCurrencies.join(', ')}` 
+        });
+      }
+      
+      const stats = await dbService.getLatestStats(coin, currency);
       res.json(stats);
     } catch (error) {
       console.error('Error in getStats:', error);
@@ -39,7 +49,7 @@ class StatsController {
    */
   async getDeviation(req, res) {
     try {
-      const { coin } = req.query;
+      const { coin, currency = 'usd' } = req.query;
       
       if (!coin) {
         return res.status(400).json({ error: 'Coin parameter is required' });
@@ -51,14 +61,161 @@ class StatsController {
         });
       }
       
-      const deviation = await dbService.calculatePriceDeviation(coin);
-      res.json({ deviation });
+      if (!config.quoteCurrencies.includes(currency)) {
+        return res.status(400).json({ 
+          error: `Unsupported currency. Must be one of: ${config.quoteCurrencies.join(', ')}` 
+        });
+      }
+      
+      const deviation = await dbService.calculatePriceDeviation(coin, currency);
+      res.json({ deviation, currency });
     } catch (error) {
       console.error('Error in getDeviation:', error);
       res.status(500).json({ error: error.message || 'Internal server error' });
     }
   }
   
+  /**
+   * Get OHLC candles for a specific cryptocurrency
+   * @param {Object} req - Express request object
+   * @param {Object} res - Express response object
+   */
+  async getCandles(req, res) {
+    try {
+      const { coin, interval = '1h', from, to, currency = 'usd' } = req.query;
+      
+      if (!coin) {
+        return res.status(400).json({ error: 'Coin parameter is required' });
+      }
+      
+      if (!config.supportedCoins.includes(coin)) {
+        return res.status(400).json({ 
+          error: `Unsupported coin. Must be one of: ${config.supportedCoins.join(', ')}` 
+        });
+      }
+      
+      if (!config.candleIntervals[interval]) {
+        return res.status(400).json({ 
+          error: `Unsupported interval. Must be one of: ${Object.keys(config.candleIntervals).join(', ')}` 
+        });
+      }
+      
+      if (!config.quoteCurrencies.includes(currency)) {
+        return res.status(400).json({ 
+          error: `Unsupported currency. Must be one of: ${config.quoteCurrencies.join(', ')}` 
+        });
+      }
+      
+      const fromDate = from ? new Date(from) : null;
+      const toDate = to ? new Date(to) : null;
+      if ((fromDate && isNaN(fromDate)) || (toDate && isNaN(toDate))) {
+        return res.status(400).json({ error: 'from and to must be valid dates' });
+      }
+      
+      const candles = await dbService.getCandles(coin, interval, fromDate, toDate, currency);
+      res.json({ coin, interval, currency, candles });
+    } catch (error) {
+      console.error('Error in getCandles:', error);
+      res.status(500).json({ error: error.message || 'Internal server error' });
+    }
+  }
+  
+  /**
+   * Stream stored price history as CSV or NDJSON without buffering the result set
+   * @param {Object} req - Express request object
+   * @param {Object} res - Express response object
+   */
+  async exportHistory(req, res) {
+    const { coin, from, to, interval, format = 'csv' } = req.query;
+    
+    const coins = coin ? coin.split(',') : config.supportedCoins;
+    const unsupported = coins.filter(c => !config.supportedCoins.includes(c));
+    if (unsupported.length > 0) {
+      return res.status(400).json({ 
+        error: `Unsupported coin. Must be one of: ${config.supportedCoins.join(', ')}` 
+      });
+    }
+    
+    if (!EXPORT_FORMATS[format]) {
+      return res.status(400).json({ 
+        error: `Unsupported format. Must be one of: ${Object.keys(EXPORT_FORMATS).join(', ')}` 
+      });
+    }
+    
+    if (interval && !config.candleIntervals[interval]) {
+      return res.status(400).json({ 
+        error: `Unsupported interval. Must be one of: ${Object.keys(config.candleIntervals).join(', ')}` 
+      });
+    }
+    
+    const fromDate = from ? new Date(from) : null;
+    const toDate = to ? new Date(to) : null;
+    if ((fromDate && isNaN(fromDate)) || (toDate && isNaN(toDate))) {
+      return res.status(400).json({ error: 'from and to must be valid dates' });
+    }
+    
+    const source = interval ? 'candles' : 'raw';
+    const fields = EXPORT_FIELDS[source];
+    const cursor = dbService.getExportCursor(coins, { from: fromDate, to: toDate, interval });
+    
+    // Stop reading from Mongo as soon as the client goes away
+    let aborted = false;
+    res.on('close', () => {
+      aborted = !res.writableFinished;
+    });
+    
+    try {
+      res.status(200);
+      res.set({
+        'Content-Type': EXPORT_FORMATS[format].contentType,
+        'Content-Disposition': `attachment; filename="koinx-${source}.${EXPORT_FORMATS[format].extension}"`
+      });
+      
+      if (format === 'csv') {
+        res.write(fields.join(',') + '\n');
+      }
+      
+      let chunk = '';
+      let rows = 0;
+      for await (const doc of cursor) {
+        if (aborted) break;
+        
+        chunk += formatRow(toExportRow(doc, source), format, fields);
+        rows += 1;
+        
+        if (rows % EXPORT_CHUNK_ROWS === 0) {
+          // Respect backpressure so slow clients don't make us buffer the whole export
+          if (!res.write(chunk)) {
+            await new Promise(resolve => {
+              const done = () => {
+                res.off('drain', done);
+                res.off('close', done);
+                resolve();
+              };
+              res.on('drain', done);
+              res.on('close', done);
+            });
+          }
+          chunk = '';
+        }
+      }
+      
+      if (chunk && !aborted) {
+        res.write(chunk);
+      }
+      res.end();
+    } catch (error) {
+      console.error('Error in exportHistory:', error);
+      if (!res.headersSent) {
+        res.status(500).json({ error: error.message || 'Internal server error' });
+      } else {
+        res.destroy(error);
+      }
+    } finally {
+      await cursor.close();
+    }
+  }
+  
   /**
    * Manually trigger cryptocurrency data update
    * @param {Object} req - Express request object
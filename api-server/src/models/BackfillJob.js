@@ -0,0 +1,34 @@
+const mongoose = require('mongoose');
+
+// Status of the most recent backfill. There is a single document, so every API
+// replica reports the same job and only one backfill can be claimed at a time.
+const backfillJobSchema = new mongoose.Schema({
+  _id: String,
+  jobId: {
+    type: String,
+    required: true
+  },
+  coins: [String],
+  from: Date,
+  to: Date,
+  concurrency: Number,
+  status: {
+    type: String,
+    required: true,
+    enum: ['running', 'completed', 'partial', 'failed']
+  },
+  totalWindows: { type: Number, default: 0 },
+  completedWindows: { type: Number, default: 0 },
+  skippedWindows: { type: Number, default: 0 },
+  failedWindows: { type: Number, default: 0 },
+  points: { type: Number, default: 0 },
+  startedAt: Date,
+  finishedAt: Date,
+  // Refreshed while the job runs; a running job without a recent heartbeat was interrupted
+  heartbeatAt: Date,
+  error: String
+});
+
+const BackfillJob = mongoose.model('BackfillJob', backfillJobSchema);
+
+module.exports = BackfillJob;
@@ -0,0 +1,32 @@
+const mongoose = require('mongoose');
+
+// Checkpoint for one completed backfill window; completed windows are skipped when a backfill is resumed
+const backfillWindowSchema = new mongoose.Schema({
+  coin: {
+    type: String,
+    required: true,
+    enum: ['bitcoin', 'ethereum', 'matic-network']
+  },
+  windowStart: {
+    type: Date,
+    required: true
+  },
+  windowEnd: {
+    type: Date,
+    required: true
+  },
+  points: {
+    type: Number,
+    default: 0
+  },
+  completedAt: {
+    type: Date,
+    default: Date.now
+  }
+});
+
+backfillWindowSchema.index({ coin: 1, windowStart: 1, windowEnd: 1 }, { unique: true });
+
+const BackfillWindow = mongoose.model('BackfillWindow', backfillWindowSchema);
+
+module.exports = BackfillWindow;
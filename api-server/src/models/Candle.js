@@ -0,0 +1,62 @@
+const mongoose = require('mongoose');
+const config = require('../config');
+
+const candleSchema = new mongoose.Schema({
+  coin: {
+    type: String,
+    required: true,
+    enum: ['bitcoin', 'ethereum', 'matic-network']
+  },
+  interval: {
+    type: String,
+    required: true,
+    enum: Object.keys(config.candleIntervals)
+  },
+  bucketStart: {
+    type: Date,
+    required: true
+  },
+  open: {
+    type: Number,
+    required: true
+  },
+  high: {
+    type: Number,
+    required: true
+  },
+  low: {
+    type: Number,
+    required: true
+  },
+  close: {
+    type: Number,
+    required: true
+  },
+  marketCapOpen: Number,
+  marketCapHigh: Number,
+  marketCapLow: Number,
+  marketCapClose: Number,
+  // Rolling 24h volume at the last tick of the bucket
+  volume24h: Number,
+  // USD -> currency multipliers at the last tick of the bucket
+  fx: {
+    type: Map,
+    of: Number
+  },
+  samples: Number,
+  // Time of the tick that set the open, and of the one that set the close
+  openAt: Date,
+  updatedAt: Date,
+  // Live ticks folded into this candle, so applying one twice is a no-op
+  ticks: {
+    type: [mongoose.Schema.Types.ObjectId],
+    select: false
+  }
+});
+
+// One candle per coin, interval and bucket; also serves range scans for charts
+candleSchema.index({ coin: 1, interval: 1, bucketStart: 1 }, { unique: true });
+
+const Candle = mongoose.model('Candle', candleSchema);
+
+module.exports = Candle;
@@ -1,4 +1,5 @@
 const mongoose = require('mongoose');
+const config = require('../config');
 
 const cryptoSchema = new mongoose.Schema({
   coin: {
@@ -18,15 +19,43 @@ const cryptoSchema = new mongoose.Schema({
     type: Number,
     required: true
   },
+  // Rolling 24h trading volume in USD as reported by CoinGecko
+  volume24h: Number,
+  // USD -> currency multipliers at ingestion time (see config.quoteCurrencies)
+  fx: {
+    type: Map,
+    of: Number
+  },
   timestamp: {
     type: Date,
     default: Date.now
+  },
+  // When CoinGecko last updated this price (its last_updated field)
+  sourceUpdatedAt: Date,
+  // Ingestion trace: worker fire -> NATS delivery -> CoinGecko response
+  trace: {
+    traceId: String,
+    triggeredAt: Date,
+    receivedAt: Date,
+    fetchedAt: Date
   }
 });
 
 // Create an index for faster querying by coin and timestamp
 cryptoSchema.index({ coin: 1, timestamp: -1 });
 
+// One tick per CoinGecko update: repeated or concurrent ingestion of the same update is a no-op
+cryptoSchema.index(
+  { coin: 1, sourceUpdatedAt: 1 },
+  { unique: true, partialFilterExpression: { sourceUpdatedAt: { $exists: true } } }
+);
+
+// Expire raw ticks after the retention window; long-range history lives in candles
+cryptoSchema.index(
+  { timestamp: 1 },
+  { expireAfterSeconds: config.rawRetentionDays * 24 * 60 * 60 }
+);
+
 const Crypto = mongoose.model('Crypto', cryptoSchema);
 
-module.exports = Crypto;
\ No newline at end of file
+module.exports = Crypto;
@@ -0,0 +1,16 @@
+const mongoose = require('mongoose');
+
+// Counter bumped whenever stored candles or historical points change. There is a single
+// document, so every API replica derives the same response validators from it.
+const dataGenerationSchema = new mongoose.Schema({
+  _id: String,
+  generation: {
+    type: Number,
+    default: 0
+  },
+  changedAt: Date
+});
+
+const DataGeneration = mongoose.model('DataGeneration', dataGenerationSchema);
+
+module.exports = DataGeneration;
@@ -0,0 +1,31 @@
+const mongoose = require('mongoose');
+
+// Latest 7-day price sparkline of a coin, replaced on every ingestion that stores a new tick
+const sparklineSchema = new mongoose.Schema({
+  coin: {
+    type: String,
+    required: true,
+    enum: ['bitcoin', 'ethereum', 'matic-network']
+  },
+  // Evenly spaced USD prices, oldest first, packed as little-endian float32 (BinData, 4 bytes per point)
+  prices: {
+    type: Buffer,
+    required: true
+  },
+  startsAt: {
+    type: Date,
+    required: true
+  },
+  endsAt: {
+    type: Date,
+    required: true
+  },
+  // Ingestion tick that carried this sparkline
+  sourceUpdatedAt: Date
+});
+
+sparklineSchema.index({ coin: 1 }, { unique: true });
+
+const Sparkline = mongoose.model('Sparkline', sparklineSchema);
+
+module.exports = Sparkline;
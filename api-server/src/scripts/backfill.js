@@ -0,0 +1,58 @@
+/**
+ * Backfill historical prices from the command line:
+ *
+ *   npm run backfill -- --days 365 --coins bitcoin,ethereum --concurrency 3
+ *
+ * Completed windows are checkpointed, so an interrupted run can simply be started again.
+ */
+const mongoose = require('mongoose');
+const config = require('../config');
+const backfillService = require('../services/backfillService');
+
+function parseArgs(argv) {
+  const options = {};
+  for (let i = 0; i < argv.length; i += 2) {
+    const value = argv[i + 1];
+    switch (argv[i]) {
+      case '--days':
+        options.days = Number(value);
+        break;
+      case '--coins':
+        options.coins = value.split(',');
+        break;
+      case '--concurrency':
+        options.concurrency = Number(value);
+        break;
+      default:
+        throw new Error(`Unknown option: ${argv[i]}`);
+    }
+  }
+  return options;
+}
+
+async function main() {
+  const options = parseArgs(process.argv.slice(2));
+  const unsupported = (options.coins || []).filter(coin => !config.supportedCoins.includes(coin));
+  if (unsupported.length > 0) {
+    throw new Error(`Unsupported coin: ${unsupported.join(', ')}`);
+  }
+
+  await mongoose.connect(config.mongodbUri);
+  try {
+    const job = await backfillService.run({
+      ...options,
+      onProgress: ({ completedWindows, failedWindows, skippedWindows, totalWindows, points }) => {
+        const done = completedWindows + failedWindows + skippedWindows;
+        console.log(`[${done}/${totalWindows}] ${points} points stored, ${failedWindows} windows failed`);
+      }
+    });
+    process.exitCode = job.status === 'completed' ? 0 : 1;
+  } finally {
+    await mongoose.connection.close();
+  }
+}
+
+main().catch(error => {
+  console.error('Backfill failed:', error.message);
+  process.exit(1);
+});
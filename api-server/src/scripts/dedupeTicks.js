@@ -0,0 +1,26 @@
+/**
+ * Remove duplicate ticks stored before ingestion was idempotent and build the
+ * unique (coin, sourceUpdatedAt) index:
+ *
+ *   npm run dedupe-ticks
+ *
+ * Safe to run more than once.
+ */
+const mongoose = require('mongoose');
+const config = require('../config');
+const dbService = require('../services/dbService');
+
+async function main() {
+  await mongoose.connect(config.mongodbUri, { autoIndex: false });
+  try {
+    const removed = await dbService.removeDuplicateTicks();
+    console.log(`Removed ${removed} duplicate ticks; unique tick index is in place`);
+  } finally {
+    await mongoose.connection.close();
+  }
+}
+
+main().catch(error => {
+  console.error('Deduplication failed:', error.message);
+  process.exit(1);
+});
@@ -1,8 +1,48 @@
-const app = require('./app');
+const cluster = require('cluster');
+const os = require('os');
 const config = require('./config');
 
 const PORT = config.port;
 
-app.listen(PORT, () => {
-  console.log(`API server running on port ${PORT}`);
-});
\ No newline at end of file
+/**
+ * Resolve the configured number of cluster workers
+ * @returns {number} - Worker count (1 means no cluster)
+ */
+function resolveWorkerCount() {
+  if (config.clusterWorkers === 'auto') {
+    return os.availableParallelism ? os.availableParallelism() : os.cpus().length;
+  }
+  return Math.max(1, Number(config.clusterWorkers) || 1);
+}
+
+const workerCount = resolveWorkerCount();
+
+if (workerCount > 1 && cluster.isPrimary) {
+  console.log(`API primary ${process.pid} forking ${workerCount} workers`);
+  let shuttingDown = false;
+  
+  for (let i = 0; i < workerCount; i++) {
+    cluster.fork();
+  }
+  
+  // Replace workers that die so the port keeps serving on every core
+  cluster.on('exit', (worker, code, signal) => {
+    if (shuttingDown) return;
+    console.error(`API worker ${worker.process.pid} exited (${signal || code}), restarting`);
+    cluster.fork();
+  });
+  
+  const shutdown = () => {
+    shuttingDown = true;
+    console.log('Shutting down API cluster...');
+    cluster.disconnect(() => process.exit(0));
+  };
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+} else {
+  const app = require('./app');
+  
+  app.listen(PORT, () => {
+    console.log(`API server running on port ${PORT}${cluster.isWorker ? ` (worker ${process.pid})` : ''}`);
+  });
+}
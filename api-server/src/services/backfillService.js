@@ -0,0 +1,311 @@
+const { randomUUID } = require('crypto');
+const BackfillJob = require('../models/BackfillJob');
+const BackfillWindow = require('../models/BackfillWindow');
+const coinGeckoService = require('./coinGeckoService');
+const dbService = require('./dbService');
+const config = require('../config');
+const { floorToInterval } = require('../utils/timeUtils');
+const { runWithConcurrency } = require('../utils/concurrency');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+// _id of the single BackfillJob document
+const JOB_ID = 'latest';
+// How often a running job refreshes its heartbeat, and how old a heartbeat may get before
+// the job counts as interrupted and another backfill may be claimed
+const HEARTBEAT_MS = 30 * 1000;
+const STALE_JOB_MS = 2 * 60 * 1000;
+// MongoDB error code for unique index violations
+const DUPLICATE_KEY_ERROR = 11000;
+
+/**
+ * Service to backfill historical prices from CoinGecko in parallel windows.
+ *
+ * Job status lives in MongoDB (BackfillJob), so it is shared by every API
+ * process and at most one backfill runs at a time across all of them.
+ */
+class BackfillService {
+
+  /**
+   * Split a date range into windows per coin. Window boundaries are epoch
+   * multiples of the window size, so they are identical across runs whatever
+   * day a backfill starts on or how far back it goes; only the first and last
+   * window are clipped to the range.
+   * @param {string[]} coins - Cryptocurrency identifiers
+   * @param {Date} from - Start of the range (inclusive)
+   * @param {Date} to - End of the range (exclusive)
+   * @returns {Object[]} - { coin, windowStart, windowEnd }
+   */
+  planWindows(coins, from, to) {
+    const windowMs = config.backfillWindowDays * DAY_MS;
+    const windows = [];
+    coins.forEach(coin => {
+      for (let start = floorToInterval(from, windowMs).getTime(); start < to.getTime(); start += windowMs) {
+        windows.push({
+          coin,
+          windowStart: new Date(Math.max(start, from.getTime())),
+          windowEnd: new Date(Math.min(start + windowMs, to.getTime()))
+        });
+      }
+    });
+    return windows;
+  }
+
+  /**
+   * Cut the parts already checkpointed out of a window
+   * @param {Object} window - { coin, windowStart, windowEnd }
+   * @param {Object[]} done - Checkpointed windows of the same coin, sorted by windowStart
+   * @returns {Object[]} - Remaining { coin, windowStart, windowEnd } ranges, empty when fully covered
+   */
+  uncoveredRanges(window, done) {
+    const end = window.windowEnd.getTime();
+    const ranges = [];
+    let cursor = window.windowStart.getTime();
+    for (const checkpoint of done) {
+      if (checkpoint.windowStart.getTime() >= end) break;
+      if (checkpoint.windowEnd.getTime() <= cursor) continue;
+      if (checkpoint.windowStart.getTime() > cursor) {
+        ranges.push({ coin: window.coin, windowStart: new Date(cursor), windowEnd: checkpoint.windowStart });
+      }
+      cursor = Math.max(cursor, checkpoint.windowEnd.getTime());
+    }
+    if (cursor < end) {
+      ranges.push({ coin: window.coin, windowStart: new Date(cursor), windowEnd: window.windowEnd });
+    }
+    return ranges;
+  }
+
+  /**
+   * Fetch and store one window, then checkpoint it
+   * @param {Object} window - { coin, windowStart, windowEnd }
+   * @returns {Promise<number>} - Number of points stored
+   */
+  async backfillWindow({ coin, windowStart, windowEnd }) {
+    // Ask for a day of lead-in so the first points of the window can get a 24h change
+    const data = await coinGeckoService.fetchMarketChartRange(coin, new Date(windowStart.getTime() - DAY_MS), windowEnd);
+    const marketCaps = new Map((data.market_caps || []).map(([timestamp, value]) => [timestamp, value]));
+    const volumes = new Map((data.total_volumes || []).map(([timestamp, value]) => [timestamp, value]));
+    const prices = data.prices || [];
+
+    const points = [];
+    let dayAgo = 0;
+    prices.forEach(([timestamp, price]) => {
+      while (dayAgo < prices.length && prices[dayAgo][0] <= timestamp - DAY_MS) {
+        dayAgo++;
+      }
+      if (timestamp < windowStart.getTime() || timestamp >= windowEnd.getTime()) {
+        return;
+      }
+      const reference = dayAgo > 0 ? prices[dayAgo - 1][1] : null;
+      points.push({
+        timestamp: new Date(timestamp),
+        price,
+        marketCap: marketCaps.get(timestamp) || 0,
+        volume24h: volumes.get(timestamp) || 0,
+        change24h: reference ? ((price - reference) / reference) * 100 : 0
+      });
+    });
+
+    await dbService.upsertHistory(coin, points);
+    await BackfillWindow.updateOne(
+      { coin, windowStart, windowEnd },
+      { $set: { points: points.length, completedAt: new Date() } },
+      { upsert: true }
+    );
+    return points.length;
+  }
+
+  /**
+   * Run a backfill to completion
+   * @param {Object} options
+   * @param {string[]} [options.coins] - Coins to backfill (defaults to all supported coins)
+   * @param {number} [options.days] - How many days back to go
+   * @param {number} [options.concurrency] - Windows fetched in parallel
+   * @param {Function} [options.onProgress] - Called with the job after every window
+   * @returns {Promise<Object>} - Final job status
+   */
+  async run(options = {}) {
+    const { job, started } = await this.claimJob(options);
+    if (!started) {
+      throw new Error('A backfill is already running');
+    }
+    await this.execute(job, options);
+    return job;
+  }
+
+  /**
+   * Start a backfill in the background unless one is already running anywhere
+   * @param {Object} options - Same as run()
+   * @returns {Promise<Object>} - { job, started }: the new job, or the running one with started false
+   */
+  async start(options = {}) {
+    const { job, started } = await this.claimJob(options);
+    if (started) {
+      this.execute(job, options).catch(error => {
+        console.error('Backfill failed:', error);
+        job.status = 'failed';
+        job.error = error.message;
+        this.saveJob(job).catch(saveError => console.error('Error saving backfill status:', saveError));
+      });
+    }
+    return { job, started };
+  }
+
+  /**
+   * Get the status of the most recent backfill, whichever process ran it
+   * @returns {Promise<Object|null>}
+   */
+  async getStatus() {
+    const doc = await BackfillJob.findById(JOB_ID).lean();
+    return doc ? this.toJob(doc) : null;
+  }
+
+  /**
+   * Atomically claim the job document for a new backfill. Fails over to the
+   * running job's status when another process holds a live claim.
+   * @param {Object} options - Same as run()
+   * @returns {Promise<Object>} - { job, started }
+   */
+  async claimJob({ coins = config.supportedCoins, days = 365, concurrency = config.backfillConcurrency }) {
+    // End at the start of today so backfilled candles never overwrite the live ones being built
+    const to = floorToInterval(new Date(), DAY_MS);
+    const from = new Date(to.getTime() - days * DAY_MS);
+    const now = new Date();
+    const fields = {
+      jobId: randomUUID(),
+      coins,
+      from,
+      to,
+      concurrency,
+      status: 'running',
+      totalWindows: 0,
+      completedWindows: 0,
+      skippedWindows: 0,
+      failedWindows: 0,
+      points: 0,
+      startedAt: now,
+      finishedAt: null,
+      heartbeatAt: now,
+      error: null
+    };
+
+    try {
+      // With a live running job the filter misses and the upsert fails on the duplicate _id
+      const doc = await BackfillJob.findOneAndUpdate(
+        {
+          _id: JOB_ID,
+          $or: [{ status: { $ne: 'running' } }, { heartbeatAt: { $lt: new Date(now.getTime() - STALE_JOB_MS) } }]
+        },
+        { $set: fields },
+        { upsert: true, new: true, lean: true }
+      );
+      return { job: this.toJob(doc), started: true };
+    } catch (error) {
+      if (error.code !== DUPLICATE_KEY_ERROR) {
+        throw error;
+      }
+      return { job: await this.getStatus(), started: false };
+    }
+  }
+
+  /**
+   * Shape a BackfillJob document as the job status returned by the API
+   * @param {Object} doc - Lean BackfillJob document
+   * @returns {Object}
+   */
+  toJob(doc) {
+    const job = {
+      id: doc.jobId,
+      coins: doc.coins,
+      from: doc.from,
+      to: doc.to,
+      concurrency: doc.concurrency,
+      status: doc.status,
+      totalWindows: doc.totalWindows,
+      completedWindows: doc.completedWindows,
+      skippedWindows: doc.skippedWindows,
+      failedWindows: doc.failedWindows,
+      points: doc.points,
+      startedAt: doc.startedAt,
+      finishedAt: doc.finishedAt,
+      error: doc.error
+    };
+    if (job.status === 'running' && doc.heartbeatAt < new Date(Date.now() - STALE_JOB_MS)) {
+      job.status = 'failed';
+      job.error = 'Interrupted: the process running this backfill stopped';
+    }
+    return job;
+  }
+
+  /**
+   * Write the job's status and counters to its document, if it still owns it
+   * @param {Object} job - Job status
+   * @returns {Promise<void>}
+   */
+  async saveJob(job) {
+    const { id, ...fields } = job;
+    await BackfillJob.updateOne({ _id: JOB_ID, jobId: id }, { $set: { ...fields, heartbeatAt: new Date() } });
+  }
+
+  async execute(job, { onProgress } = {}) {
+    // Keeps the claim alive while windows are slow to come back from the rate limiter
+    const heartbeat = setInterval(() => {
+      BackfillJob.updateOne({ _id: JOB_ID, jobId: job.id }, { $set: { heartbeatAt: new Date() } })
+        .catch(error => console.error('Error refreshing backfill heartbeat:', error.message));
+    }, HEARTBEAT_MS);
+
+    try {
+      const windows = this.planWindows(job.coins, job.from, job.to);
+
+      // Any checkpoint overlapping the range counts, not just exact matches, so edge windows
+      // clipped differently by an earlier run only fetch the part that is still missing
+      const done = await BackfillWindow.find({
+        coin: { $in: job.coins },
+        windowStart: { $lt: job.to },
+        windowEnd: { $gt: job.from }
+      }).sort({ windowStart: 1 }).lean();
+      const doneByCoin = new Map(job.coins.map(coin => [coin, []]));
+      done.forEach(w => doneByCoin.get(w.coin).push(w));
+
+      const pending = [];
+      windows.forEach(window => {
+        const ranges = this.uncoveredRanges(window, doneByCoin.get(window.coin));
+        if (ranges.length === 0) {
+          job.skippedWindows += 1;
+        }
+        pending.push(...ranges);
+      });
+      job.totalWindows = job.skippedWindows + pending.length;
+      await this.saveJob(job);
+
+      const tasks = pending.map(window => async () => {
+        try {
+          const points = await this.backfillWindow(window);
+          job.points += points;
+          job.completedWindows += 1;
+          await BackfillJob.updateOne(
+            { _id: JOB_ID, jobId: job.id },
+            { $inc: { completedWindows: 1, points }, $set: { heartbeatAt: new Date() } }
+          );
+        } catch (error) {
+          job.failedWindows += 1;
+          console.error(`Backfill window ${window.coin} ${window.windowStart.toISOString()} failed:`, error.message);
+          await BackfillJob.updateOne({ _id: JOB_ID, jobId: job.id }, { $inc: { failedWindows: 1 } })
+            .catch(saveError => console.error('Error saving backfill status:', saveError.message));
+          throw error;
+        } finally {
+          if (onProgress) onProgress(job);
+        }
+      });
+
+      await runWithConcurrency(tasks, job.concurrency);
+      job.status = job.failedWindows > 0 ? 'partial' : 'completed';
+      job.finishedAt = new Date();
+      await this.saveJob(job);
+      console.log(`Backfill ${job.id} ${job.status}: ${job.completedWindows} windows stored, ${job.skippedWindows} already done, ${job.failedWindows} failed`);
+    } finally {
+      clearInterval(heartbeat);
+    }
+  }
+}
+
+module.exports = new BackfillService();
@@ -1,5 +1,8 @@
 const axios = require('axios');
 const config = require('../config');
+const { coinGeckoDuration, coinGeckoErrors } = require('../utils/metrics');
+const { RateLimiter, sleep } = require('../utils/concurrency');
+const { usdRatesFromExchangeRates } = require('../utils/currencyUtils');
 
 /**
  * Service to interact with CoinGecko API
@@ -7,33 +10,100 @@ const config = require('../config');
 class CoinGeckoService {
   constructor() {
     this.apiUrl = config.coinGeckoApiUrl;
+    // Shared by live ingestion and backfills so together they stay under the rate limit
+    this.rateLimiter = new RateLimiter(config.coinGeckoRequestsPerMinute);
+  }
+
+  /**
+   * GET a CoinGecko endpoint, waiting for a rate-limit slot and retrying on 429
+   * @param {string} endpoint - Path below the API root (also used as the metrics label)
+   * @param {Object} params - Query parameters
+   * @returns {Promise<Object>} - Response body
+   */
+  async get(endpoint, params) {
+    for (let attempt = 0; ; attempt++) {
+      await this.rateLimiter.acquire();
+      try {
+        const response = await coinGeckoDuration.time(
+          { endpoint: endpoint.replace(/^coins\/[^/]+\//, 'coins/:id/') },
+          () => axios.get(`${this.apiUrl}/${endpoint}`, { params })
+        );
+        return response.data;
+      } catch (error) {
+        const status = error.response && error.response.status;
+        if (status !== 429 || attempt >= config.coinGeckoMaxRetries) {
+          throw error;
+        }
+        // Honour Retry-After when present, otherwise back off exponentially
+        const retryAfter = Number(error.response.headers['retry-after']);
+        const delayMs = retryAfter > 0 ? retryAfter * 1000 : Math.min(60000, 2000 * 2 ** attempt);
+        console.warn(`CoinGecko rate limited ${endpoint}, retrying in ${delayMs}ms`);
+        this.rateLimiter.pause(delayMs);
+        await sleep(delayMs);
+      }
+    }
   }
 
   /**
    * Fetch current cryptocurrency prices and market data
+   * @param {string[]} [coinIds] - Coins to fetch (defaults to all supported coins)
    * @returns {Promise<Object>} - Cryptocurrency data
    */
-  async fetchCryptoData() {
+  async fetchCryptoData(coinIds = config.supportedCoins) {
     try {
-      const coins = config.supportedCoins.join(',');
-      const response = await axios.get(`${this.apiUrl}/coins/markets`, {
-        params: {
-          vs_currency: 'usd',
-          ids: coins,
-          order: 'market_cap_desc',
-          per_page: 100,
-          page: 1,
-          sparkline: false,
-          price_change_percentage: '24h'
-        }
+      const coins = coinIds.join(',');
+      return await this.get('coins/markets', {
+        vs_currency: 'usd',
+        ids: coins,
+        order: 'market_cap_desc',
+        per_page: 100,
+        page: 1,
+        // Hourly 7-day prices for the dashboard's trend lines; same request, no extra call
+        sparkline: true,
+        price_change_percentage: '24h'
       });
-
-      return response.data;
     } catch (error) {
+      coinGeckoErrors.inc({ endpoint: 'coins/markets' });
       console.error('Error fetching data from CoinGecko:', error.message);
       throw new Error(`Failed to fetch data from CoinGecko: ${error.message}`);
     }
   }
+
+  /**
+   * Fetch current USD exchange rates for the configured quote currencies
+   * @returns {Promise<Object>} - USD -> currency multiplier per currency
+   */
+  async fetchExchangeRates() {
+    try {
+      const data = await this.get('exchange_rates');
+      return usdRatesFromExchangeRates(data.rates, config.quoteCurrencies);
+    } catch (error) {
+      coinGeckoErrors.inc({ endpoint: 'exchange_rates' });
+      console.error('Error fetching exchange rates from CoinGecko:', error.message);
+      throw new Error(`Failed to fetch exchange rates from CoinGecko: ${error.message}`);
+    }
+  }
+
+  /**
+   * Fetch historical prices and market caps for a time range
+   * @param {string} coin - Cryptocurrency identifier
+   * @param {Date} from - Start of the range
+   * @param {Date} to - End of the range
+   * @returns {Promise<Object>} - { prices, market_caps, total_volumes } as [ms, value] pairs
+   */
+  async fetchMarketChartRange(coin, from, to) {
+    try {
+      return await this.get(`coins/${coin}/market_chart/range`, {
+        vs_currency: 'usd',
+        from: Math.floor(from.getTime() / 1000),
+        to: Math.floor(to.getTime() / 1000)
+      });
+    } catch (error) {
+      coinGeckoErrors.inc({ endpoint: 'coins/:id/market_chart/range' });
+      console.error(`Error fetching market chart for ${coin} from CoinGecko:`, error.message);
+      throw new Error(`Failed to fetch market chart from CoinGecko: ${error.message}`);
+    }
+  }
 }
 
-module.exports = new CoinGeckoService();
\ No newline at end of file
+module.exports = new CoinGeckoService();
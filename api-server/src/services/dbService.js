@@ -1,29 +1,123 @@
+const { randomUUID } = require('crypto');
 const Crypto = require('../models/Crypto');
+const Candle = require('../models/Candle');
+const Sparkline = require('../models/Sparkline');
+const DataGeneration = require('../models/DataGeneration');
 const coinGeckoService = require('./coinGeckoService');
 const config = require('../config');
+const { floorToInterval } = require('../utils/timeUtils');
+const { mongoDuration, ingestStageDuration } = require('../utils/metrics');
+const { STATS_MONEY_FIELDS, CANDLE_MONEY_FIELDS, rateFor, convertFields } = require('../utils/currencyUtils');
+const { packFloat32, scaleFloat32 } = require('../utils/binaryUtils');
+
+// How long a looked-up ingestion marker is trusted before asking MongoDB again
+const INGESTION_MARKER_TTL_MS = 2000;
+// _id of the single DataGeneration document
+const GENERATION_ID = 'data';
+// Operations per bulkWrite batch for historical upserts
+const BULK_BATCH_SIZE = 1000;
+// MongoDB error code for unique index violations
+const DUPLICATE_KEY_ERROR = 11000;
+// Time covered by CoinGecko's sparkline_in_7d
+const SPARKLINE_SPAN_MS = 7 * 24 * 60 * 60 * 1000;
 
 class DbService {
+  constructor() {
+    this.latestIngestion = null;
+    this.latestIngestionCheckedAt = 0;
+    // Ingestions in progress keyed by their coin list, shared by concurrent callers
+    this.inFlight = new Map();
+    this.fxRates = null;
+    this.fxFetchedAt = 0;
+  }
+
   /**
-   * Store cryptocurrency statistics in the database
+   * Store cryptocurrency statistics in the database. Concurrent calls for the
+   * same coins share one ingestion, and ticks CoinGecko has not updated since
+   * the last ingestion are not written again.
+   * @param {string[]} [coins] - Coins to update (defaults to all supported coins)
+   * @param {Object} [trace] - Trace context carried from the trigger
+   * @param {string} [trace.traceId] - Id shared by every stage of this tick
+   * @param {Date} [trace.triggeredAt] - When the worker fired the update
+   * @param {Date} [trace.receivedAt] - When this server received the trigger
    */
-  async storeCryptoStats() {
+  async storeCryptoStats(coins = config.supportedCoins, trace = {}) {
+    const supported = coins.filter(coin => config.supportedCoins.includes(coin));
+    if (supported.length === 0) {
+      console.log('No supported coins in update request, skipping');
+      return true;
+    }
+    
+    const key = [...supported].sort().join(',');
+    if (this.inFlight.has(key)) {
+      console.log(`Ingestion for ${key} already in progress, joining it`);
+      return this.inFlight.get(key);
+    }
+    
+    const ingestion = this.ingestCryptoStats(supported, trace)
+      .finally(() => this.inFlight.delete(key));
+    this.inFlight.set(key, ingestion);
+    return ingestion;
+  }
+
+  /**
+   * Fetch the given coins from CoinGecko and upsert one tick per CoinGecko update
+   * @param {string[]} coins - Supported coins to update
+   * @param {Object} trace - Trace context carried from the trigger
+   */
+  async ingestCryptoStats(coins, trace) {
     try {
-      console.log('Fetching cryptocurrency data from CoinGecko...');
-      const cryptoData = await coinGeckoService.fetchCryptoData();
-      
-      const savePromises = cryptoData.map(coin => {
-        const cryptoRecord = new Crypto({
-          coin: coin.id,
-          price: coin.current_price,
-          marketCap: coin.market_cap,
-          change24h: coin.price_change_percentage_24h || 0
-        });
-        
-        return cryptoRecord.save();
-      });
+      const receivedAt = trace.receivedAt || new Date();
+      const triggeredAt = trace.triggeredAt || receivedAt;
+      const traceId = trace.traceId || randomUUID();
+      
+      console.log(`Fetching cryptocurrency data from CoinGecko for ${coins.join(', ')}...`);
+      const [cryptoData, fx] = await Promise.all([
+        coinGeckoService.fetchCryptoData(coins),
+        this.getFxRates()
+      ]);
+      
+      const fetchedAt = new Date();
+      const records = cryptoData.map(coin => ({
+        coin: coin.id,
+        price: coin.current_price,
+        marketCap: coin.market_cap,
+        change24h: coin.price_change_percentage_24h || 0,
+        volume24h: coin.total_volume || 0,
+        timestamp: fetchedAt,
+        sourceUpdatedAt: coin.last_updated ? new Date(coin.last_updated) : fetchedAt,
+        ...(fx ? { fx } : {}),
+        trace: { traceId, triggeredAt, receivedAt, fetchedAt }
+      }));
+      
+      const operations = records.map(record => ({
+        updateOne: {
+          filter: { coin: record.coin, sourceUpdatedAt: record.sourceUpdatedAt },
+          update: { $setOnInsert: record },
+          upsert: true
+        }
+      }));
+      
+      const upsertedIds = await mongoDuration.time({ operation: 'upsert_ticks' }, () => this.bulkUpsert(Crypto, operations));
+      const inserted = Object.keys(upsertedIds).map(index => records[index]);
+      
+      // Candles and sparklines are folded in for every fetched tick, not only the new ones. Both
+      // updates are idempotent, so a redelivery after a crash between the tick upsert and these
+      // writes completes them instead of finding nothing new to do.
+      const stored = await this.findStoredTicks(records);
+      await Promise.all([
+        this.updateCandles(stored),
+        this.storeSparklines(cryptoData, stored)
+      ]);
       
-      await Promise.all(savePromises);
-      console.log(`Successfully stored data for ${cryptoData.length} coins`);
+      
+      const storedAt = new Date();
+      ingestStageDuration.observe({ stage: 'queue' }, (receivedAt - triggeredAt) / 1000);
+      ingestStageDuration.observe({ stage: 'fetch' }, (fetchedAt - receivedAt) / 1000);
+      ingestStageDuration.observe({ stage: 'write' }, (storedAt - fetchedAt) / 1000);
+      ingestStageDuration.observe({ stage: 'total' }, (storedAt - triggeredAt) / 1000);
+      console.log(`Stored ${inserted.length} new ticks, skipped ${records.length - inserted.length} unchanged ` +
+        `(trace ${traceId}: queue ${receivedAt - triggeredAt}ms, fetch ${fetchedAt - receivedAt}ms, write ${storedAt - fetchedAt}ms)`);
       return true;
     } catch (error) {
       console.error('Error storing cryptocurrency data:', error);
@@ -31,30 +125,510 @@ class DbService {
     }
   }
 
+  /**
+   * Load the stored ticks of the given records, as written by whichever attempt inserted them
+   * @param {Object[]} records - Records with coin and sourceUpdatedAt
+   * @returns {Promise<Object[]>} - Lean Crypto documents
+   */
+  async findStoredTicks(records) {
+    if (records.length === 0) {
+      return [];
+    }
+    return mongoDuration.time({ operation: 'find_ticks' }, () => Crypto.find({
+      $or: records.map(({ coin, sourceUpdatedAt }) => ({ coin, sourceUpdatedAt }))
+    }).lean().exec());
+  }
+
+  /**
+   * Replace the stored 7-day sparkline of every coin with its latest tick.
+   * An older tick never overwrites a newer sparkline, so this is idempotent.
+   * @param {Object[]} markets - CoinGecko /coins/markets entries fetched with sparkline=true
+   * @param {Object[]} ticks - Stored tick records
+   * @returns {Promise<void>}
+   */
+  async storeSparklines(markets, ticks) {
+    const operations = [];
+    ticks.forEach(tick => {
+      const market = markets.find(entry => entry.id === tick.coin);
+      const prices = market && market.sparkline_in_7d && market.sparkline_in_7d.price;
+      if (!Array.isArray(prices) || prices.length < 2) {
+        return;
+      }
+      const endsAt = tick.sourceUpdatedAt;
+      operations.push({
+        updateOne: {
+          // A newer stored sparkline makes this an insert that fails on the unique coin index
+          filter: { coin: tick.coin, endsAt: { $lt: endsAt } },
+          update: {
+            $set: {
+              prices: packFloat32(prices),
+              startsAt: new Date(endsAt.getTime() - SPARKLINE_SPAN_MS),
+              endsAt,
+              sourceUpdatedAt: endsAt
+            }
+          },
+          upsert: true
+        }
+      });
+    });
+    
+    if (operations.length > 0) {
+      await mongoDuration.time({ operation: 'upsert_sparklines' }, () => this.bulkUpsert(Sparkline, operations));
+    }
+  }
+
+  /**
+   * Get the current USD exchange rate vector, fetching it at most once per refresh window
+   * @returns {Promise<Object|null>} - USD -> currency multipliers, or null if none could be fetched yet
+   */
+  async getFxRates() {
+    if (this.fxRates && Date.now() - this.fxFetchedAt < config.fxRefreshMs) {
+      return this.fxRates;
+    }
+    try {
+      this.fxRates = await coinGeckoService.fetchExchangeRates();
+      this.fxFetchedAt = Date.now();
+    } catch (error) {
+      // Prices are still worth storing; they are converted with the last known rates
+      console.error('Using last known exchange rates:', error.message);
+    }
+    return this.fxRates;
+  }
+
+  /**
+   * Get the most recent stored FX vector
+   * @param {string} [coin] - Restrict to ticks of this coin
+   * @returns {Promise<Map|null>}
+   */
+  async getLatestFx(coin) {
+    const query = { fx: { $exists: true } };
+    if (coin) query.coin = coin;
+    const record = await mongoDuration.time({ operation: 'find_latest_fx' }, () => Crypto.findOne(query)
+      .sort({ timestamp: -1 })
+      .select('fx')
+      .exec());
+    return record ? record.fx : null;
+  }
+
+  /**
+   * Run upserts and return the ids of the documents that were inserted. Losing an
+   * insert race against another replica is reported as a duplicate, not an error.
+   * @param {mongoose.Model} model - Model to write to
+   * @param {Object[]} operations - updateOne upsert operations
+   * @returns {Promise<Object>} - Map of operation index to inserted _id
+   */
+  async bulkUpsert(model, operations) {
+    try {
+      const result = await model.bulkWrite(operations, { ordered: false });
+      return result.upsertedIds;
+    } catch (error) {
+      const writeErrors = error.writeErrors || [];
+      if (writeErrors.length === 0 || writeErrors.some(writeError => writeError.code !== DUPLICATE_KEY_ERROR)) {
+        throw error;
+      }
+      return error.result.upsertedIds;
+    }
+  }
+
+  /**
+   * Collapse ticks stored more than once for the same CoinGecko update (from
+   * before ingestion was idempotent) and build the unique index that prevents it
+   * @returns {Promise<number>} - Number of duplicate ticks removed
+   */
+  async removeDuplicateTicks() {
+    // Older ticks (and backfilled points) may lack the source time; their own timestamp stands in for it
+    await Crypto.updateMany(
+      { sourceUpdatedAt: { $exists: false } },
+      [{ $set: { sourceUpdatedAt: '$timestamp' } }]
+    );
+    
+    const groups = await Crypto.aggregate([
+      { $sort: { timestamp: 1 } },
+      { $group: { _id: { coin: '$coin', sourceUpdatedAt: '$sourceUpdatedAt' }, ids: { $push: '$_id' } } },
+      { $match: { 'ids.1': { $exists: true } } }
+    ]).allowDiskUse(true);
+    
+    // Keep the earliest stored copy of each update
+    const duplicateIds = groups.flatMap(group => group.ids.slice(1));
+    for (let i = 0; i < duplicateIds.length; i += BULK_BATCH_SIZE) {
+      await Crypto.deleteMany({ _id: { $in: duplicateIds.slice(i, i + BULK_BATCH_SIZE) } });
+    }
+    
+    await Crypto.syncIndexes();
+    return duplicateIds.length;
+  }
+
+  /**
+   * Get a marker identifying the current state of the stored data: the newest
+   * tick plus the data generation, so writes that never produce the newest
+   * tick (backfills, late ticks folded into candles) still change it
+   * @returns {Promise<Object|null>} - { id, at }, or null if nothing is stored
+   */
+  async getLatestIngestion() {
+    if (Date.now() - this.latestIngestionCheckedAt < INGESTION_MARKER_TTL_MS) {
+      return this.latestIngestion;
+    }
+    
+    const [latest, generation] = await mongoDuration.time({ operation: 'find_latest_ingestion' }, () => Promise.all([
+      Crypto.findOne()
+        .sort({ timestamp: -1 })
+        .select('_id timestamp')
+        .lean()
+        .exec(),
+      DataGeneration.findById(GENERATION_ID).lean().exec()
+    ]));
+    
+    if (!latest && !generation) {
+      this.latestIngestion = null;
+    } else {
+      const times = [latest && latest.timestamp, generation && generation.changedAt].filter(Boolean);
+      this.latestIngestion = {
+        id: `${latest ? latest._id : 'none'}-${generation ? generation.generation : 0}`,
+        at: new Date(Math.max(...times.map(time => time.getTime())))
+      };
+    }
+    this.latestIngestionCheckedAt = Date.now();
+    return this.latestIngestion;
+  }
+
+  /**
+   * Record that stored candles or history changed, and drop this process's
+   * cached marker so its next response carries new validators; other
+   * replicas pick the change up within the marker TTL
+   * @returns {Promise<void>}
+   */
+  async bumpGeneration() {
+    await DataGeneration.updateOne(
+      { _id: GENERATION_ID },
+      { $inc: { generation: 1 }, $set: { changedAt: new Date() } },
+      { upsert: true }
+    );
+    this.latestIngestionCheckedAt = 0;
+  }
+
+  /**
+   * Fold stored ticks into the materialized candle collections. Idempotent:
+   * each candle records the ids of the ticks it contains, so applying a tick
+   * again changes nothing. The earliest tick sets the open and the latest the
+   * close, whatever order ticks arrive in.
+   * @param {Object[]} ticks - Stored ticks (with _id)
+   */
+  async updateCandles(ticks) {
+    const operations = [];
+
+    ticks.forEach(tick => {
+      const applied = { $in: [tick._id, { $ifNull: ['$ticks', []] }] };
+      // Candles from before openAt was tracked (or from a backfill) keep their open
+      const opens = { $or: [{ $eq: [{ $type: '$open' }, 'missing'] }, { $lt: [tick.timestamp, { $ifNull: ['$openAt', tick.timestamp] }] }] };
+      const closes = { $or: [{ $eq: [{ $type: '$updatedAt' }, 'missing'] }, { $gte: [tick.timestamp, '$updatedAt'] }] };
+      const ifOpens = (value, field) => ({ $cond: [opens, { $literal: value }, `$${field}`] });
+      const ifCloses = (value, field) => ({ $cond: [closes, { $literal: value }, `$${field}`] });
+
+      Object.entries(config.candleIntervals).forEach(([interval, intervalMs]) => {
+        operations.push({
+          updateOne: {
+            filter: {
+              coin: tick.coin,
+              interval,
+              bucketStart: floorToInterval(tick.timestamp, intervalMs)
+            },
+            update: [{
+              $set: {
+                open: ifOpens(tick.price, 'open'),
+                marketCapOpen: ifOpens(tick.marketCap, 'marketCapOpen'),
+                openAt: { $cond: [opens, tick.timestamp, '$openAt'] },
+                high: { $max: ['$high', tick.price] },
+                low: { $min: ['$low', tick.price] },
+                marketCapHigh: { $max: ['$marketCapHigh', tick.marketCap] },
+                marketCapLow: { $min: ['$marketCapLow', tick.marketCap] },
+                close: ifCloses(tick.price, 'close'),
+                marketCapClose: ifCloses(tick.marketCap, 'marketCapClose'),
+                volume24h: ifCloses(tick.volume24h, 'volume24h'),
+                ...(tick.fx ? { fx: ifCloses(tick.fx, 'fx') } : {}),
+                updatedAt: { $cond: [closes, tick.timestamp, '$updatedAt'] },
+                samples: { $cond: [applied, '$samples', { $add: [{ $ifNull: ['$samples', 0] }, 1] }] },
+                ticks: { $cond: [applied, '$ticks', { $concatArrays: [{ $ifNull: ['$ticks', []] }, [tick._id]] }] }
+              }
+            }],
+            upsert: true
+          }
+        });
+      });
+    });
+
+    if (operations.length > 0) {
+      const result = await mongoDuration.time({ operation: 'upsert_candles' }, () => Candle.bulkWrite(operations, { ordered: false }));
+      // A redelivered tick leaves every candle as it was and needs no new validators
+      if (result.modifiedCount + result.upsertedCount > 0) {
+        await this.bumpGeneration();
+      }
+    }
+  }
+
+  /**
+   * Idempotently upsert historical points and the candles built from them
+   * @param {string} coin - Cryptocurrency identifier
+   * @param {Object[]} points - { timestamp, price, marketCap, change24h, volume24h } sorted by timestamp;
+   *   should cover whole candle buckets so new candles are complete
+   * @returns {Promise<number>} - Number of raw points newly inserted
+   */
+  async upsertHistory(coin, points) {
+    // Points older than the raw retention window would be expired immediately; they only feed candles
+    const retentionCutoff = Date.now() - config.rawRetentionDays * 24 * 60 * 60 * 1000;
+    const rawOperations = points
+      .filter(point => point.timestamp.getTime() >= retentionCutoff)
+      .map(point => ({
+        updateOne: {
+          // Keyed like live ticks so a backfilled point and a live tick of the same update collapse into one
+          filter: { coin, sourceUpdatedAt: point.timestamp },
+          update: { $setOnInsert: { coin, ...point, sourceUpdatedAt: point.timestamp } },
+          upsert: true
+        }
+      }));
+    
+    let inserted = 0;
+    for (let i = 0; i < rawOperations.length; i += BULK_BATCH_SIZE) {
+      const upsertedIds = await mongoDuration.time({ operation: 'upsert_history' }, () =>
+        this.bulkUpsert(Crypto, rawOperations.slice(i, i + BULK_BATCH_SIZE)));
+      inserted += Object.keys(upsertedIds).length;
+    }
+    
+    // Merge into existing candles: extremes widen with $min/$max and the rest is only written
+    // when the candle is new, so live candles built from finer ticks keep their open, close and
+    // samples, and re-running a window leaves every candle unchanged
+    const candleOperations = [];
+    Object.entries(config.candleIntervals).forEach(([interval, intervalMs]) => {
+      const buckets = new Map();
+      points.forEach(point => {
+        const bucketStart = floorToInterval(point.timestamp, intervalMs).getTime();
+        const bucket = buckets.get(bucketStart);
+        if (!bucket) {
+          buckets.set(bucketStart, {
+            open: point.price,
+            high: point.price,
+            low: point.price,
+            close: point.price,
+            marketCapOpen: point.marketCap,
+            marketCapHigh: point.marketCap,
+            marketCapLow: point.marketCap,
+            marketCapClose: point.marketCap,
+            volume24h: point.volume24h,
+            samples: 1,
+            updatedAt: point.timestamp
+          });
+          return;
+        }
+        bucket.high = Math.max(bucket.high, point.price);
+        bucket.low = Math.min(bucket.low, point.price);
+        bucket.close = point.price;
+        bucket.marketCapHigh = Math.max(bucket.marketCapHigh, point.marketCap);
+        bucket.marketCapLow = Math.min(bucket.marketCapLow, point.marketCap);
+        bucket.marketCapClose = point.marketCap;
+        bucket.volume24h = point.volume24h;
+        bucket.samples += 1;
+        bucket.updatedAt = point.timestamp;
+      });
+      
+      buckets.forEach(({ high, low, marketCapHigh, marketCapLow, ...rest }, bucketStart) => {
+        candleOperations.push({
+          updateOne: {
+            filter: { coin, interval, bucketStart: new Date(bucketStart) },
+            update: {
+              $setOnInsert: rest,
+              $max: { high, marketCapHigh },
+              $min: { low, marketCapLow }
+            },
+            upsert: true
+          }
+        });
+      });
+    });
+    
+    let changedCandles = 0;
+    for (let i = 0; i < candleOperations.length; i += BULK_BATCH_SIZE) {
+      const result = await mongoDuration.time({ operation: 'upsert_history_candles' }, () =>
+        Candle.bulkWrite(candleOperations.slice(i, i + BULK_BATCH_SIZE), { ordered: false }));
+      changedCandles += result.modifiedCount + result.upsertedCount;
+    }
+    
+    // Backfilled points are never the newest tick, so the generation is what invalidates validators
+    if (inserted > 0 || changedCandles > 0) {
+      await this.bumpGeneration();
+    }
+    
+    return inserted;
+  }
+
+  /**
+   * Get OHLC candles for a specific cryptocurrency
+   * @param {string} coin - Cryptocurrency identifier
+   * @param {string} interval - Candle interval (see config.candleIntervals)
+   * @param {Date} [from] - Inclusive start of the range
+   * @param {Date} [to] - Inclusive end of the range
+   * @param {string} [currency] - Quote currency to convert to
+   * @returns {Promise<Object[]>} - Candles ordered by bucket start
+   */
+  async getCandles(coin, interval, from, to, currency = 'usd') {
+    try {
+      if (!config.supportedCoins.includes(coin)) {
+        throw new Error(`Unsupported coin: ${coin}`);
+      }
+
+      const query = { coin, interval };
+      if (from || to) {
+        query.bucketStart = {};
+        if (from) query.bucketStart.$gte = from;
+        if (to) query.bucketStart.$lte = to;
+      }
+
+      const candles = await mongoDuration.time({ operation: 'find_candles' }, () => Candle.find(query)
+        .sort({ bucketStart: 1 })
+        .select('bucketStart open high low close marketCapClose volume24h fx -_id')
+        .lean()
+        .exec());
+
+      const rows = candles.map(candle => ({
+        time: candle.bucketStart,
+        open: candle.open,
+        high: candle.high,
+        low: candle.low,
+        close: candle.close,
+        marketCap: candle.marketCapClose,
+        volume24h: candle.volume24h || 0
+      }));
+      return this.convertRows(coin, rows, candles.map(candle => candle.fx), currency, CANDLE_MONEY_FIELDS);
+    } catch (error) {
+      console.error(`Error fetching candles for ${coin}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * Convert USD rows into a quote currency using each row's own FX vector.
+   * Rows stored without one (backfilled history) use the nearest known rate.
+   * @param {string} coin - Cryptocurrency identifier (for the latest-rate fallback)
+   * @param {Object[]} rows - Rows with USD values
+   * @param {Array<Map|Object>} fxVectors - FX vector per row (may be undefined)
+   * @param {string} currency - Target currency
+   * @param {string[]} fields - Monetary fields to convert
+   * @returns {Promise<Object[]>} - Converted rows
+   */
+  async convertRows(coin, rows, fxVectors, currency, fields) {
+    if (currency === 'usd') {
+      return rows;
+    }
+    
+    const rates = fxVectors.map(fx => rateFor(fx, currency));
+    let rate = rates.find(value => value !== null);
+    if (rate === undefined) {
+      rate = rateFor(await this.getLatestFx(coin), currency);
+      if (rate === null) {
+        throw new Error(`No ${currency.toUpperCase()} exchange rate stored yet`);
+      }
+    }
+    
+    return rows.map((row, i) => {
+      if (rates[i] !== null) {
+        rate = rates[i];
+      }
+      return convertFields(row, fields, rate);
+    });
+  }
+
+  /**
+   * Open a cursor over stored records for bulk export
+   * @param {string[]} coins - Cryptocurrency identifiers
+   * @param {Object} options - Export options
+   * @param {Date} [options.from] - Inclusive start of the range
+   * @param {Date} [options.to] - Inclusive end of the range
+   * @param {string} [options.interval] - Export candles of this interval instead of raw ticks
+   * @returns {QueryCursor} - Mongoose cursor yielding lean documents in time order
+   */
+  getExportCursor(coins, { from, to, interval } = {}) {
+    const timeField = interval ? 'bucketStart' : 'timestamp';
+    const query = { coin: { $in: coins } };
+    if (interval) {
+      query.interval = interval;
+    }
+    if (from || to) {
+      query[timeField] = {};
+      if (from) query[timeField].$gte = from;
+      if (to) query[timeField].$lte = to;
+    }
+
+    const model = interval ? Candle : Crypto;
+    return model.find(query)
+      .sort({ coin: 1, [timeField]: 1 })
+      .lean()
+      .cursor({ batchSize: 1000 });
+  }
+
   /**
    * Get the latest statistics for a specific cryptocurrency
    * @param {string} coin - Cryptocurrency identifier
+   * @param {string} [currency] - Quote currency to convert to
    * @returns {Promise<Object>} - Latest cryptocurrency statistics
    */
-  async getLatestStats(coin) {
+  async getLatestStats(coin, currency = 'usd') {
     try {
       if (!config.supportedCoins.includes(coin)) {
         throw new Error(`Unsupported coin: ${coin}`);
       }
       
-      const latestRecord = await Crypto.findOne({ coin })
-        .sort({ timestamp: -1 })
-        .exec();
+      const [latestRecord, sparkline] = await Promise.all([
+        mongoDuration.time({ operation: 'find_latest' }, () => Crypto.findOne({ coin })
+          .sort({ timestamp: -1 })
+          .exec()),
+        mongoDuration.time({ operation: 'find_sparkline' }, () => Sparkline.findOne({ coin }).exec())
+      ]);
       
       if (!latestRecord) {
         throw new Error(`No data found for ${coin}`);
       }
       
-      return {
+      const sourceUpdatedAt = latestRecord.sourceUpdatedAt || latestRecord.timestamp;
+      const [converted] = await this.convertRows(coin, [{
         price: latestRecord.price,
         marketCap: latestRecord.marketCap,
-        "24hChange": latestRecord.change24h
+        "24hVolume": latestRecord.volume24h || 0
+      }], [latestRecord.fx], currency, STATS_MONEY_FIELDS);
+      const stats = {
+        price: converted.price,
+        marketCap: converted.marketCap,
+        "24hChange": latestRecord.change24h,
+        "24hVolume": converted["24hVolume"],
+        currency,
+        timestamp: latestRecord.timestamp,
+        sourceUpdatedAt,
+        dataAgeSeconds: Math.max(0, Math.round((Date.now() - sourceUpdatedAt) / 1000))
       };
+      
+      // USD -> currency rates of this tick, so clients can convert without another request
+      if (latestRecord.fx) {
+        stats.fx = Object.fromEntries(latestRecord.fx);
+      }
+      
+      // 7-day trend as packed float32, scaled by the same rate as the price
+      if (sparkline) {
+        const rate = latestRecord.price ? converted.price / latestRecord.price : 1;
+        stats.sparkline = {
+          startsAt: sparkline.startsAt,
+          endsAt: sparkline.endsAt,
+          prices: rate === 1 ? Buffer.from(sparkline.prices) : scaleFloat32(sparkline.prices, rate)
+        };
+      }
+      
+      const { trace } = latestRecord;
+      if (trace && trace.traceId) {
+        stats.trace = {
+          traceId: trace.traceId,
+          triggeredAt: trace.triggeredAt,
+          queueMs: trace.receivedAt - trace.triggeredAt,
+          fetchMs: trace.fetchedAt - trace.receivedAt
+        };
+      }
+      
+      return stats;
     } catch (error) {
       console.error(`Error fetching latest stats for ${coin}:`, error);
       throw error;
@@ -64,25 +638,34 @@ class DbService {
   /**
    * Calculate the standard deviation of price for a specific cryptocurrency
    * @param {string} coin - Cryptocurrency identifier
+   * @param {string} [currency] - Quote currency to convert to
    * @returns {Promise<number>} - Standard deviation of price
    */
-  async calculatePriceDeviation(coin) {
+  async calculatePriceDeviation(coin, currency = 'usd') {
     try {
       if (!config.supportedCoins.includes(coin)) {
         throw new Error(`Unsupported coin: ${coin}`);
       }
       
-      const records = await Crypto.find({ coin })
+      const records = await mongoDuration.time({ operation: 'find_deviation_window' }, () => Crypto.find({ coin })
         .sort({ timestamp: -1 })
         .limit(100)
-        .select('price')
-        .exec();
+        .select('price fx')
+        .lean()
+        .exec());
       
       if (records.length === 0) {
         throw new Error(`No data found for ${coin}`);
       }
       
-      const prices = records.map(record => record.price);
+      const converted = await this.convertRows(
+        coin,
+        records.map(record => ({ price: record.price })),
+        records.map(record => record.fx),
+        currency,
+        ['price']
+      );
+      const prices = converted.map(record => record.price);
       
       // Calculate standard deviation
       const mean = prices.reduce((sum, price) => sum + price, 0) / prices.length;
@@ -1,11 +1,13 @@
-const { connect, JSONCodec } = require('nats');
+const { connect, JSONCodec, AckPolicy, RetentionPolicy, StorageType, nanos } = require('nats');
 const config = require('../config');
 const dbService = require('./dbService');
+const { natsMessages } = require('../utils/metrics');
 
 class NatsService {
   constructor() {
     this.connection = null;
     this.jsonCodec = JSONCodec();
+    this.messages = null;
   }
 
   /**
@@ -15,7 +17,7 @@ class NatsService {
     try {
       this.connection = await connect({ servers: config.natsUrl });
       console.log(`Connected to NATS at ${config.natsUrl}`);
-      this.setupSubscriptions();
+      await this.setupSubscriptions();
     } catch (error) {
       console.error('Failed to connect to NATS:', error);
       // Retry connection after delay
@@ -24,25 +26,72 @@ class NatsService {
   }
 
   /**
-   * Setup subscriptions to NATS topics
+   * Make sure the ingestion work-queue stream and its durable consumer exist
    */
-  setupSubscriptions() {
-    const subscription = this.connection.subscribe('crypto.update');
-    console.log('Subscribed to crypto.update topic');
+  async ensureConsumer() {
+    const jsm = await this.connection.jetstreamManager();
+    
+    try {
+      await jsm.streams.info(config.ingestStream);
+    } catch (error) {
+      await jsm.streams.add({
+        name: config.ingestStream,
+        subjects: [`${config.ingestSubject}.>`],
+        retention: RetentionPolicy.Workqueue,
+        storage: StorageType.File
+      });
+      console.log(`Created JetStream stream ${config.ingestStream}`);
+    }
+    
+    try {
+      await jsm.consumers.info(config.ingestStream, config.ingestConsumer);
+    } catch (error) {
+      await jsm.consumers.add(config.ingestStream, {
+        durable_name: config.ingestConsumer,
+        ack_policy: AckPolicy.Explicit,
+        ack_wait: nanos(config.ingestAckWaitMs),
+        max_deliver: config.ingestMaxDeliver
+      });
+      console.log(`Created JetStream consumer ${config.ingestConsumer}`);
+    }
+  }
+
+  /**
+   * Setup the durable work-queue consumer for ingestion shards
+   */
+  async setupSubscriptions() {
+    await this.ensureConsumer();
+    
+    const consumer = await this.connection.jetstream().consumers.get(
+      config.ingestStream,
+      config.ingestConsumer
+    );
+    // Pull one shard at a time so concurrent replicas split the work between them
+    this.messages = await consumer.consume({ max_messages: 1 });
+    console.log(`Consuming ${config.ingestSubject} shards from ${config.ingestStream}`);
     
     // Process messages
     (async () => {
-      for await (const message of subscription) {
+      for await (const message of this.messages) {
         try {
           const data = this.jsonCodec.decode(message.data);
           console.log('Received message:', data);
           
           if (data.trigger === 'update') {
-            console.log('Triggering crypto stats update...');
-            await dbService.storeCryptoStats();
+            console.log(`Triggering crypto stats update for shard ${data.shard}...`);
+            await dbService.storeCryptoStats(data.coins, {
+              traceId: data.traceId,
+              triggeredAt: data.timestamp ? new Date(data.timestamp) : undefined,
+              receivedAt: new Date()
+            });
           }
+          message.ack();
+          natsMessages.inc({ subject: message.subject, result: 'ack' });
         } catch (error) {
+          natsMessages.inc({ subject: message.subject, result: 'nak' });
           console.error('Error processing message:', error);
+          // Hand the shard back for redelivery after a short delay
+          message.nak(5000);
         }
       }
     })();
@@ -52,6 +101,9 @@ class NatsService {
    * Close NATS connection
    */
   async close() {
+    if (this.messages) {
+      await this.messages.close();
+    }
     if (this.connection) {
       await this.connection.drain();
       console.log('NATS connection closed');
@@ -59,4 +111,4 @@ class NatsService {
   }
 }
 
-module.exports = new NatsService();
\ No newline at end of file
+module.exports = new NatsService();
@@ -0,0 +1,47 @@
+/**
+ * Utility functions for packing numeric series into compact binary fields
+ */
+
+const FLOAT32_BYTES = 4;
+
+/**
+ * Pack numbers as little-endian float32 values
+ * @param {number[]} values - Values to pack (non-finite values are stored as NaN)
+ * @returns {Buffer} - 4 bytes per value
+ */
+function packFloat32(values) {
+  const buffer = Buffer.alloc(values.length * FLOAT32_BYTES);
+  values.forEach((value, index) => {
+    buffer.writeFloatLE(Number.isFinite(value) ? value : NaN, index * FLOAT32_BYTES);
+  });
+  return buffer;
+}
+
+/**
+ * Unpack little-endian float32 values
+ * @param {Buffer} buffer - Bytes written by packFloat32
+ * @returns {number[]} - Unpacked values
+ */
+function unpackFloat32(buffer) {
+  const values = new Array(Math.floor(buffer.length / FLOAT32_BYTES));
+  for (let index = 0; index < values.length; index++) {
+    values[index] = buffer.readFloatLE(index * FLOAT32_BYTES);
+  }
+  return values;
+}
+
+/**
+ * Multiply every packed float32 value by a factor
+ * @param {Buffer} buffer - Bytes written by packFloat32
+ * @param {number} factor - Multiplier
+ * @returns {Buffer} - New packed buffer
+ */
+function scaleFloat32(buffer, factor) {
+  return packFloat32(unpackFloat32(buffer).map(value => value * factor));
+}
+
+module.exports = {
+  packFloat32,
+  unpackFloat32,
+  scaleFloat32
+};
@@ -0,0 +1,86 @@
+/**
+ * Utility functions for bounded concurrency and rate limiting
+ */
+
+/**
+ * Run async tasks with at most `limit` in flight
+ * @param {Function[]} tasks - Functions returning promises
+ * @param {number} limit - Maximum number of concurrent tasks
+ * @returns {Promise<Object[]>} - Settled results in task order
+ */
+async function runWithConcurrency(tasks, limit) {
+  const results = new Array(tasks.length);
+  let next = 0;
+
+  async function worker() {
+    while (next < tasks.length) {
+      const index = next++;
+      try {
+        results[index] = { status: 'fulfilled', value: await tasks[index]() };
+      } catch (error) {
+        results[index] = { status: 'rejected', reason: error };
+      }
+    }
+  }
+
+  const workers = Array.from({ length: Math.min(limit, tasks.length) }, () => worker());
+  await Promise.all(workers);
+  return results;
+}
+
+/**
+ * Spaces calls evenly so no more than `perMinute` start in any minute
+ */
+class RateLimiter {
+  constructor(perMinute) {
+    this.intervalMs = 60000 / perMinute;
+    this.nextAt = 0;
+    // Bumped by pause() so callers already waiting for a slot notice it
+    this.pauses = 0;
+  }
+
+  /**
+   * Wait until the next call slot is free
+   * @returns {Promise<void>}
+   */
+  async acquire() {
+    for (;;) {
+      const pauses = this.pauses;
+      const now = Date.now();
+      const at = Math.max(now, this.nextAt);
+      this.nextAt = at + this.intervalMs;
+      if (at > now) {
+        await sleep(at - now);
+      }
+      // A pause that began while we waited voids our slot; take a new one after it
+      if (this.pauses === pauses) {
+        return;
+      }
+    }
+  }
+
+  /**
+   * Push every pending and future call back, e.g. after a 429 response.
+   * Callers already waiting for a slot are re-queued behind the pause.
+   * @param {number} ms - Delay in milliseconds
+   */
+  pause(ms) {
+    this.pauses += 1;
+    this.nextAt = Math.max(this.nextAt, Date.now() + ms);
+  }
+}
+
+/**
+ * Resolve after a delay
+ * @param {number} ms - Delay in milliseconds
+ * @returns {Promise<void>}
+ */
+function sleep(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+module.exports = {
+  runWithConcurrency,
+  RateLimiter,
+  sleep
+};
@@ -0,0 +1,70 @@
+/**
+ * Utility functions for converting stored USD values into other quote currencies
+ */
+
+// Monetary fields of API payloads; everything is stored in USD
+const STATS_MONEY_FIELDS = ['price', 'marketCap', '24hVolume'];
+const CANDLE_MONEY_FIELDS = ['open', 'high', 'low', 'close', 'marketCap', 'volume24h'];
+
+/**
+ * Convert CoinGecko's BTC-based exchange rates into USD -> currency multipliers
+ * @param {Object} rates - `rates` object of the /exchange_rates response
+ * @param {string[]} currencies - Currencies to keep
+ * @returns {Object} - Multiplier per currency (usd is always 1)
+ */
+function usdRatesFromExchangeRates(rates, currencies) {
+  const usd = rates.usd && rates.usd.value;
+  if (!usd) {
+    throw new Error('Exchange rates response has no USD rate');
+  }
+  const fx = {};
+  currencies.forEach(currency => {
+    if (rates[currency] && rates[currency].value) {
+      fx[currency] = rates[currency].value / usd;
+    }
+  });
+  fx.usd = 1;
+  return fx;
+}
+
+/**
+ * Look up the USD -> currency multiplier in a stored FX vector
+ * @param {Map|Object} fx - Stored FX vector (a mongoose Map or plain object)
+ * @param {string} currency - Target currency
+ * @returns {number|null} - Multiplier, or null if the vector has no rate for it
+ */
+function rateFor(fx, currency) {
+  if (currency === 'usd') {
+    return 1;
+  }
+  if (!fx) {
+    return null;
+  }
+  const rate = fx instanceof Map ? fx.get(currency) : fx[currency];
+  return Number.isFinite(rate) ? rate : null;
+}
+
+/**
+ * Multiply the monetary fields of a record by a rate
+ * @param {Object} record - Plain object with USD values
+ * @param {string[]} fields - Fields to convert
+ * @param {number} rate - USD -> currency multiplier
+ * @returns {Object} - Converted copy
+ */
+function convertFields(record, fields, rate) {
+  const converted = { ...record };
+  fields.forEach(field => {
+    if (typeof converted[field] === 'number') {
+      converted[field] *= rate;
+    }
+  });
+  return converted;
+}
+
+module.exports = {
+  STATS_MONEY_FIELDS,
+  CANDLE_MONEY_FIELDS,
+  usdRatesFromExchangeRates,
+  rateFor,
+  convertFields
+};
@@ -0,0 +1,76 @@
+/**
+ * Utility functions for serializing exported records
+ */
+
+const EXPORT_FORMATS = {
+  csv: { contentType: 'text/csv; charset=utf-8', extension: 'csv' },
+  ndjson: { contentType: 'application/x-ndjson; charset=utf-8', extension: 'ndjson' }
+};
+
+const EXPORT_FIELDS = {
+  raw: ['coin', 'timestamp', 'price', 'marketCap', 'change24h'],
+  candles: ['coin', 'interval', 'time', 'open', 'high', 'low', 'close', 'marketCap']
+};
+
+/**
+ * Map a stored document to a flat export row
+ * @param {Object} doc - Lean Crypto or Candle document
+ * @param {string} source - 'raw' or 'candles'
+ * @returns {Object} - Export row with the fields of EXPORT_FIELDS[source]
+ */
+function toExportRow(doc, source) {
+  if (source === 'candles') {
+    return {
+      coin: doc.coin,
+      interval: doc.interval,
+      time: doc.bucketStart.toISOString(),
+      open: doc.open,
+      high: doc.high,
+      low: doc.low,
+      close: doc.close,
+      marketCap: doc.marketCapClose
+    };
+  }
+
+  return {
+    coin: doc.coin,
+    timestamp: doc.timestamp.toISOString(),
+    price: doc.price,
+    marketCap: doc.marketCap,
+    change24h: doc.change24h
+  };
+}
+
+/**
+ * Escape a single CSV value
+ * @param {*} value - Value to escape
+ * @returns {string} - CSV-safe representation
+ */
+function escapeCsv(value) {
+  if (value === null || value === undefined) {
+    return '';
+  }
+  const text = String(value);
+  return /[",\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+/**
+ * Serialize an export row as one line in the requested format
+ * @param {Object} row - Export row
+ * @param {string} format - 'csv' or 'ndjson'
+ * @param {string[]} fields - Column order for CSV
+ * @returns {string} - Newline-terminated line
+ */
+function formatRow(row, format, fields) {
+  if (format === 'csv') {
+    return fields.map(field => escapeCsv(row[field])).join(',') + '\n';
+  }
+  return JSON.stringify(row) + '\n';
+}
+
+module.exports = {
+  EXPORT_FORMATS,
+  EXPORT_FIELDS,
+  toExportRow,
+  formatRow
+};
@@ -0,0 +1,84 @@
+/**
+ * HTTP caching helpers for read endpoints
+ */
+const zlib = require('zlib');
+const dbService = require('../services/dbService');
+const msgpack = require('./msgpack');
+
+// Responses smaller than this are sent uncompressed
+const COMPRESSION_THRESHOLD_BYTES = 1024;
+
+/**
+ * Attach ETag/Last-Modified validators derived from the latest ingestion and
+ * answer 304 Not Modified when the client's copy is still current.
+ * Read responses only change when new data is ingested.
+ */
+async function ingestionValidators(req, res, next) {
+  try {
+    const ingestion = await dbService.getLatestIngestion();
+    if (!ingestion) {
+      return next();
+    }
+    
+    res.set({
+      ETag: `W/"${ingestion.id}"`,
+      'Last-Modified': new Date(ingestion.at).toUTCString(),
+      'Cache-Control': 'no-cache'
+    });
+    
+    if (req.fresh) {
+      return res.status(304).end();
+    }
+    next();
+  } catch (error) {
+    // Validators are an optimisation; serve the full response if they fail
+    console.error('Error computing response validators:', error);
+    next();
+  }
+}
+
+/**
+ * JSON.stringify replacer that sends binary fields as base64 strings
+ * instead of Buffer's default array-of-bytes form
+ */
+function binaryAsBase64(key, value) {
+  const raw = this[key];
+  return Buffer.isBuffer(raw) ? raw.toString('base64') : value;
+}
+
+/**
+ * Replace res.json with a version that negotiates the body encoding
+ * (JSON or MessagePack) and compresses large bodies with brotli or gzip.
+ * Buffers become MessagePack bin values, or base64 strings in JSON.
+ */
+function encodedResponses(req, res, next) {
+  res.json = body => {
+    const wantsMsgpack = req.accepts(['application/json', 'application/msgpack']) === 'application/msgpack';
+    let payload = wantsMsgpack ? msgpack.encode(body) : Buffer.from(JSON.stringify(body, binaryAsBase64), 'utf8');
+    
+    res.vary('Accept');
+    res.vary('Accept-Encoding');
+    res.set('Content-Type', wantsMsgpack ? 'application/msgpack' : 'application/json; charset=utf-8');
+    
+    if (payload.length >= COMPRESSION_THRESHOLD_BYTES) {
+      const encoding = req.acceptsEncodings(['br', 'gzip']);
+      if (encoding === 'br') {
+        payload = zlib.brotliCompressSync(payload, {
+          params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 5 }
+        });
+        res.set('Content-Encoding', 'br');
+      } else if (encoding === 'gzip') {
+        payload = zlib.gzipSync(payload, { level: 6 });
+        res.set('Content-Encoding', 'gzip');
+      }
+    }
+    
+    return res.send(payload);
+  };
+  next();
+}
+
+module.exports = {
+  ingestionValidators,
+  encodedResponses
+};
@@ -0,0 +1,59 @@
+/**
+ * Prometheus metrics of the API server
+ */
+const { Registry, Counter, Gauge, Histogram, registerProcessMetrics } = require('koinx-metrics');
+const mongoose = require('mongoose');
+
+const registry = registerProcessMetrics(new Registry());
+
+// API server metrics
+const httpRequests = registry.counter('http_requests_total', 'HTTP requests by route and status');
+const httpDuration = registry.histogram('http_request_duration_seconds', 'HTTP request latency by route');
+const coinGeckoDuration = registry.histogram('coingecko_request_duration_seconds', 'CoinGecko API call latency');
+const coinGeckoErrors = registry.counter('coingecko_errors_total', 'Failed CoinGecko API calls');
+const mongoDuration = registry.histogram('mongo_query_duration_seconds', 'MongoDB operation latency by operation');
+const natsMessages = registry.counter('nats_messages_total', 'NATS messages processed by subject and result');
+const ingestStageDuration = registry.histogram(
+  'ingest_stage_duration_seconds',
+  'Ingestion pipeline stage durations (queue, fetch, write, total)',
+  [0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+);
+
+registry.gauge('mongo_db_size_bytes', 'MongoDB database size from dbStats', async () => {
+  if (mongoose.connection.readyState !== 1) {
+    return [];
+  }
+  const stats = await mongoose.connection.db.stats();
+  return [
+    { labels: { kind: 'data' }, value: stats.dataSize },
+    { labels: { kind: 'storage' }, value: stats.storageSize },
+    { labels: { kind: 'index' }, value: stats.indexSize }
+  ];
+});
+
+/**
+ * Express middleware recording request counts and latency per route
+ */
+function httpMetricsMiddleware(req, res, next) {
+  const start = process.hrtime.bigint();
+  res.on('finish', () => {
+    // Use the route pattern rather than the raw URL to keep label cardinality bounded
+    const route = req.route ? req.route.path : 'unmatched';
+    httpRequests.inc({ method: req.method, route, status: res.statusCode });
+    httpDuration.observe({ method: req.method, route }, Number(process.hrtime.bigint() - start) / 1e9);
+  });
+  next();
+}
+
+module.exports = {
+  registry,
+  Counter,
+  Gauge,
+  Histogram,
+  httpMetricsMiddleware,
+  coinGeckoDuration,
+  coinGeckoErrors,
+  mongoDuration,
+  natsMessages,
+  ingestStageDuration
+};
@@ -0,0 +1,100 @@
+/**
+ * Minimal MessagePack encoder for API responses
+ *
+ * Supports the value types our JSON payloads use: null, booleans, numbers,
+ * strings, arrays, plain objects, Dates (encoded as ISO strings, matching
+ * their JSON representation) and Buffers (encoded as bin).
+ */
+
+/**
+ * Encode a value as MessagePack
+ * @param {*} value - Value to encode
+ * @returns {Buffer} - Encoded bytes
+ */
+function encode(value) {
+  const chunks = [];
+  write(value, chunks);
+  return Buffer.concat(chunks);
+}
+
+function header(type, length, small, fixMask, chunks) {
+  if (small !== null && length < small) {
+    chunks.push(Buffer.from([fixMask | length]));
+  } else if (length < 0x10000) {
+    const buf = Buffer.alloc(3);
+    buf[0] = type.u16;
+    buf.writeUInt16BE(length, 1);
+    chunks.push(buf);
+  } else {
+    const buf = Buffer.alloc(5);
+    buf[0] = type.u32;
+    buf.writeUInt32BE(length, 1);
+    chunks.push(buf);
+  }
+}
+
+function writeNumber(value, chunks) {
+  if (Number.isInteger(value) && value >= 0 && value < 0x80) {
+    chunks.push(Buffer.from([value]));
+  } else if (Number.isInteger(value) && value < 0 && value >= -32) {
+    chunks.push(Buffer.from([0xe0 | (value + 32)]));
+  } else if (Number.isInteger(value) && value >= -0x80000000 && value <= 0xffffffff) {
+    const buf = Buffer.alloc(5);
+    if (value < 0) {
+      buf[0] = 0xd2;
+      buf.writeInt32BE(value, 1);
+    } else {
+      buf[0] = 0xce;
+      buf.writeUInt32BE(value, 1);
+    }
+    chunks.push(buf);
+  } else {
+    const buf = Buffer.alloc(9);
+    buf[0] = 0xcb;
+    buf.writeDoubleBE(value, 1);
+    chunks.push(buf);
+  }
+}
+
+function write(value, chunks) {
+  if (value === null || value === undefined) {
+    chunks.push(Buffer.from([0xc0]));
+  } else if (typeof value === 'boolean') {
+    chunks.push(Buffer.from([value ? 0xc3 : 0xc2]));
+  } else if (typeof value === 'number') {
+    writeNumber(value, chunks);
+  } else if (typeof value === 'string') {
+    const bytes = Buffer.from(value, 'utf8');
+    if (bytes.length < 32) {
+      chunks.push(Buffer.from([0xa0 | bytes.length]));
+    } else if (bytes.length < 0x100) {
+      chunks.push(Buffer.from([0xd9, bytes.length]));
+    } else {
+      header({ u16: 0xda, u32: 0xdb }, bytes.length, null, 0, chunks);
+    }
+    chunks.push(bytes);
+  } else if (Buffer.isBuffer(value)) {
+    if (value.length < 0x100) {
+      chunks.push(Buffer.from([0xc4, value.length]));
+    } else {
+      header({ u16: 0xc5, u32: 0xc6 }, value.length, null, 0, chunks);
+    }
+    chunks.push(value);
+  } else if (Array.isArray(value)) {
+    header({ u16: 0xdc, u32: 0xdd }, value.length, 16, 0x90, chunks);
+    value.forEach(item => write(item, chunks));
+  } else if (typeof value.toJSON === 'function') {
+    write(value.toJSON(), chunks);
+  } else {
+    const entries = Object.entries(value).filter(([, item]) => item !== undefined);
+    header({ u16: 0xde, u32: 0xdf }, entries.length, 16, 0x80, chunks);
+    entries.forEach(([key, item]) => {
+      write(key, chunks);
+      write(item, chunks);
+    });
+  }
+}
+
+module.exports = {
+  encode
+};
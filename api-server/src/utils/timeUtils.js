@@ -0,0 +1,18 @@
+/**
+ * Utility functions for time bucketing
+ */
+
+/**
+ * Floor a date to the start of its bucket
+ * @param {Date} date - Date to floor
+ * @param {number} intervalMs - Bucket size in milliseconds
+ * @returns {Date} - Start of the bucket containing the date
+ */
+function floorToInterval(date, intervalMs) {
+  const time = date.getTime();
+  return new Date(time - (time % intervalMs));
+}
+
+module.exports = {
+  floorToInterval
+};
@@ -0,0 +1,203 @@
+"""Client-side load balancing across API server instances.
+
+Requests go to the healthy endpoint with the fewest requests in flight.
+Endpoints that keep failing are ejected for a cool-down period and then
+tried again, so the dashboard keeps working while a single instance is down.
+
+JSON reads are made conditional: the last ETag/Last-Modified seen for each
+URL is sent back and a 304 reuses the cached body.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+try:
+    import msgpack
+except ImportError:  # Optional: fall back to JSON bodies
+    msgpack = None
+
+# Consecutive failures before an endpoint is ejected
+EJECT_AFTER_FAILURES = 2
+# How long an ejected endpoint is skipped before it is tried again
+EJECT_SECONDS = 30
+# Statuses that mean the endpoint itself (or the proxy in front of it) is unavailable;
+# other errors, such as a 500 for a coin without data, come from the application
+ENDPOINT_FAILURE_STATUSES = frozenset({502, 503, 504})
+# Number of URLs whose validators and bodies are kept for conditional requests
+VALIDATOR_CACHE_SIZE = 256
+
+
+class ApiResult:
+    """Decoded response of a conditional JSON read"""
+
+    def __init__(self, status_code, data=None, text="", from_cache=False, etag=None):
+        self.status_code = status_code
+        self.data = data
+        self.text = text
+        self.from_cache = from_cache
+        # Identifies the data version (the API derives it from the latest ingestion)
+        self.etag = etag
+
+
+class ApiEndpoint:
+    """Bookkeeping for a single API server instance"""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def is_available(self, now):
+        return now >= self.ejected_until
+
+
+class ApiPool:
+    """Least-outstanding-requests balancer with passive ejection"""
+
+    def __init__(self, urls):
+        if not urls:
+            raise ValueError("At least one API URL is required")
+        self.endpoints = [ApiEndpoint(url) for url in urls]
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._validators = OrderedDict()
+
+    def _acquire(self, exclude=()):
+        """Pick the least loaded healthy endpoint and mark a request in flight"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [ep for ep in self.endpoints if ep not in exclude and ep.is_available(now)]
+            if not candidates:
+                # Everything is ejected: fall back to the endpoint due back soonest
+                candidates = sorted(
+                    (ep for ep in self.endpoints if ep not in exclude),
+                    key=lambda ep: ep.ejected_until
+                )[:1]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda ep: ep.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def _release(self, endpoint, ok):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok:
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+            else:
+                endpoint.failures += 1
+                if endpoint.failures >= EJECT_AFTER_FAILURES:
+                    endpoint.ejected_until = time.monotonic() + EJECT_SECONDS
+
+    def request(self, method, path, retry=None, **kwargs):
+        """Send a request to the best endpoint, failing over to others for idempotent calls
+
+        Only connection errors, timeouts and 502/503/504 count against an endpoint
+        and move on to the next one; any other response, including a 500 from
+        the application, is returned as is. Re-raises the last connection error
+        when no endpoint answered.
+        """
+        if retry is None:
+            retry = method.upper() == "GET"
+        attempts = len(self.endpoints) if retry else 1
+        tried = []
+        last_error = None
+        response = None
+
+        for _ in range(attempts):
+            endpoint = self._acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            try:
+                response = self.session.request(method, f"{endpoint.url}{path}", **kwargs)
+            except requests.RequestException as e:
+                self._release(endpoint, ok=False)
+                last_error = e
+                continue
+            ok = response.status_code not in ENDPOINT_FAILURE_STATUSES
+            self._release(endpoint, ok=ok)
+            if ok:
+                return response
+
+        if response is not None:
+            return response
+        raise last_error or requests.ConnectionError("No API endpoints available")
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def get_json(self, path, params=None, **kwargs):
+        """Conditional GET of a JSON (or MessagePack) resource
+
+        Sends the validators from the previous response for the same URL and
+        returns the cached body when the server answers 304 Not Modified.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._validators.get(key)
+
+        headers = dict(kwargs.pop("headers", {}) or {})
+        if msgpack is not None:
+            headers["Accept"] = "application/msgpack, application/json;q=0.9"
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self.get(path, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self._validators.move_to_end(key)
+            return ApiResult(200, cached["data"], from_cache=True, etag=cached["etag"])
+        if response.status_code != 200:
+            return ApiResult(response.status_code, text=response.text)
+
+        if response.headers.get("Content-Type", "").startswith("application/msgpack"):
+            data = msgpack.unpackb(response.content, raw=False)
+        else:
+            data = response.json()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._validators[key] = {"etag": etag, "last_modified": last_modified, "data": data}
+                self._validators.move_to_end(key)
+                while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                    self._validators.popitem(last=False)
+        return ApiResult(200, data, etag=etag)
+
+    def pick_url(self):
+        """Return the base URL of the endpoint a new request would go to"""
+        endpoint = self._acquire()
+        with self._lock:
+            endpoint.outstanding -= 1
+        return endpoint.url
+
+    def check_health(self, timeout=2):
+        """Probe every endpoint's /health and return True if any is up"""
+        healthy = False
+        for endpoint in self.endpoints:
+            try:
+                ok = self.session.get(f"{endpoint.url}/health", timeout=timeout).status_code == 200
+            except requests.RequestException:
+                ok = False
+            with self._lock:
+                if ok:
+                    endpoint.failures = 0
+                    endpoint.ejected_until = 0.0
+                else:
+                    endpoint.failures = max(endpoint.failures, EJECT_AFTER_FAILURES)
+                    endpoint.ejected_until = time.monotonic() + EJECT_SECONDS
+            healthy = healthy or ok
+        return healthy
@@ -1,26 +1,75 @@
+import sys
+
+import server_control
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in server_control.COMMANDS + ("-h", "--help"):
+    # Headless supervisor commands (python app.py serve|stop|status|logs|trigger)
+    # exit before the Streamlit, pandas and plotly imports below
+    sys.exit(server_control.main(sys.argv[1:]))
+
 import streamlit as st
 import requests
 import pandas as pd
 import numpy as np
 import time
 import json
-import subprocess
 import os
-import threading
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import altair as alt
 import matplotlib.pyplot as plt
 import seaborn as sns
 from PIL import Image
 from io import BytesIO
 import base64
+import sqlite3
+import tempfile
+
+from api_client import ApiPool
+from backtest import backtest
+from charts import FigureCache, line_trace
+from indicators import IndicatorEngine
+from market_snapshot import InvalidPayload, MarketSnapshot, SnapshotStore, parse_stats
+from snapshot_cache import SnapshotCache
 
 # Global variables
-API_URL = "http://localhost:3000"
+API_URL = server_control.API_URL
+API_URLS = server_control.API_URLS
+WORKER_URL = server_control.WORKER_URL
+METRICS_HISTORY_POINTS = 120
+FRESHNESS_SAMPLES = 500
+# Data age thresholds (seconds) for the freshness badge colours
+FRESH_AGE_SECONDS = 20 * 60
+STALE_AGE_SECONDS = 60 * 60
+CACHE_DIR = server_control.CACHE_DIR
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_PARQUET_ROWS = 50_000
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+# Exports are streamed to disk at any size, but st.download_button holds the file in memory,
+# so larger files are left on disk (csv/ndjson can be streamed from the API directly instead)
+EXPORT_DOWNLOAD_MAX_BYTES = 100 * 1024 * 1024
+# Export files older than this are removed when a new export is prepared
+EXPORT_MAX_AGE_SECONDS = 60 * 60
+# Points drawn in the 7-day sparklines of the price cards
+SPARKLINE_POINTS = 48
+# History windows offered for alert backtests, in days
+BACKTEST_DAYS = [7, 30, 90, 180, 365]
 SUPPORTED_COINS = ["bitcoin", "ethereum", "matic-network"]
+# Display currencies; prices are stored in USD and converted with the FX vector of each tick
+CURRENCY_SYMBOLS = {
+    "usd": "$",
+    "eur": "€",
+    "gbp": "£",
+    "jpy": "¥",
+    "inr": "₹",
+    "cny": "CN¥",
+    "aud": "A$",
+    "cad": "C$",
+    "chf": "CHF "
+}
 COIN_NAMES = {
     "bitcoin": "Bitcoin", 
     "ethereum": "Ethereum", 
@@ -40,124 +89,255 @@ COIN_COLORS = {
 # Initialize session state
 def init_session_state():
     """Initialize session state variables"""
-    if "api_process" not in st.session_state:
-        st.session_state.api_process = None
-    if "worker_process" not in st.session_state:
-        st.session_state.worker_process = None
-    if "api_output" not in st.session_state:
-        st.session_state.api_output = ""
-    if "worker_output" not in st.session_state:
-        st.session_state.worker_output = ""
     if "last_update" not in st.session_state:
         st.session_state.last_update = None
     if "selected_coins" not in st.session_state:
         st.session_state.selected_coins = ["bitcoin", "ethereum"]
     if "price_history" not in st.session_state:
-        st.session_state.price_history = {}
+        # Seed from the on-disk cache so new sessions start with the last known history
+        st.session_state.price_history = {
+            key.split(":", 1)[1]: payload
+            for key, (payload, _) in cached_items("candles:").items()
+        }
+    if "candle_versions" not in st.session_state:
+        st.session_state.candle_versions = {}
+    if "cold_start" not in st.session_state:
+        st.session_state.cold_start = True
+    if "metrics_history" not in st.session_state:
+        st.session_state.metrics_history = []
+    if "freshness_samples" not in st.session_state:
+        st.session_state.freshness_samples = []
     if "time_range" not in st.session_state:
         st.session_state.time_range = "24h"
     if "notifications" not in st.session_state:
         st.session_state.notifications = []
     if "alert_thresholds" not in st.session_state:
         st.session_state.alert_thresholds = {coin: {"upper": None, "lower": None} for coin in SUPPORTED_COINS}
+    if "backtest_history" not in st.session_state:
+        st.session_state.backtest_history = {}
+    if "currency" not in st.session_state:
+        st.session_state.currency = "usd"
     if "display_mode" not in st.session_state:
         st.session_state.display_mode = "cards"  # Options: cards, table, minimal
 
-import subprocess
-import threading
-import streamlit as st
-
 def run_server_process(server_type):
     """Run API or Worker server in background"""
     try:
-        if server_type == "api":
-            st.session_state.api_output = ""
-            cmd = "npm install && npm start"
-            process = subprocess.Popen(
-                cmd,
-                cwd="./api-server",
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            st.session_state.api_process = process
-            
-        elif server_type == "worker":
-            st.session_state.worker_output = ""
-            cmd = "npm install && npm start"
-            process = subprocess.Popen(
-                cmd,
-                cwd="./worker-server",
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            st.session_state.worker_process = process
-        
-        # Start a thread to capture process output
-        threading.Thread(
-            target=capture_process_output,
-            args=(process, server_type),
-            daemon=True
-        ).start()
-        
+        server_control.start_server(server_type)
         return True
-
     except Exception as e:
         st.error(f"Failed to start {server_type} server: {str(e)}")
         return False
 
-def capture_process_output(process, server_type):
-    """Capture and store process output for display"""
-    output_key = f"{server_type}_output"
-    
-    for line in process.stdout:
-        if server_type == "api":
-            st.session_state.api_output += line
-        else:
-            st.session_state.worker_output += line
-            
 def stop_server_process(server_type):
     """Stop API or Worker server process"""
-    if server_type == "api" and hasattr(st.session_state, "api_process"):
-        if st.session_state.api_process != None:
-            st.session_state.api_process.terminate()
-            st.session_state.api_process = None
-    elif server_type == "worker" and hasattr(st.session_state, "worker_process"):
-        if st.session_state.worker_process != None:
-            st.session_state.worker_process.terminate()
-            st.session_state.worker_process = None
+    return server_control.stop_server(server_type)
+
+def server_log(server_type, lines=200):
+    """Recent output of a server started from the dashboard or the CLI"""
+    return "\n".join(server_control.tail_log(server_type, lines))
+
+# Local snapshot cache
+@st.cache_resource
+def get_snapshot_cache():
+    """Process-wide on-disk cache of API payloads"""
+    return SnapshotCache(os.path.join(CACHE_DIR, "snapshots.sqlite3"), max_bytes=CACHE_MAX_BYTES)
+
+def remember_payload(key, payload):
+    """Persist a freshly fetched payload; the cache is best-effort"""
+    try:
+        get_snapshot_cache().put(key, payload)
+    except sqlite3.Error:
+        pass
+
+def recall_payload(key):
+    """Return the cached payload for key marked as stale, or None"""
+    try:
+        entry = get_snapshot_cache().get(key)
+    except sqlite3.Error:
+        return None
+    if entry is None:
+        return None
+    payload, fetched_at = entry
+    if isinstance(payload, dict):
+        payload = {**payload, "stale": True, "cachedAt": fetched_at}
+    return payload
+
+@st.cache_resource
+def get_snapshot_store():
+    """Process-wide latest stats per coin, shared by every session"""
+    return SnapshotStore()
+
+def cached_items(prefix):
+    """Return every cached payload whose key starts with prefix"""
+    try:
+        return get_snapshot_cache().items(prefix)
+    except sqlite3.Error:
+        return {}
+
+# Technical indicators
+@st.cache_resource
+def get_indicator_engine():
+    """Process-wide indicator cache shared by every session"""
+    return IndicatorEngine()
+
+def add_indicator_traces(fig, coin, interval, candle_df, selected, settings, currency="usd"):
+    """Overlay the selected indicators on a candle chart; RSI goes in row 2"""
+    series_key = currency_key(f"{coin}:{interval}", currency)
+    version = st.session_state.candle_versions.get(series_key)
+    frame = pd.DataFrame({
+        "close": candle_df["close"].to_numpy(),
+        "volume": candle_df.get("volume24h", pd.Series(0, index=candle_df.index)).fillna(0).to_numpy()
+    }, index=candle_df["time"])
+    engine = get_indicator_engine()
+    
+    def compute(indicator, **params):
+        return engine.compute(series_key, version, frame, indicator, **params)
+    
+    if "SMA" in selected:
+        sma = compute("sma", window=settings["sma_window"])
+        fig.add_trace(go.Scatter(x=sma.index, y=sma["sma"], mode="lines", name=f"SMA {settings['sma_window']}",
+                                 line=dict(color="#FF9800", width=1.5)), row=1, col=1)
+    if "EMA" in selected:
+        ema = compute("ema", span=settings["ema_span"])
+        fig.add_trace(go.Scatter(x=ema.index, y=ema["ema"], mode="lines", name=f"EMA {settings['ema_span']}",
+                                 line=dict(color="#00BCD4", width=1.5)), row=1, col=1)
+    if "Bollinger Bands" in selected:
+        bands = compute("bollinger", window=settings["bollinger_window"], width=settings["bollinger_width"])
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["upper"], mode="lines", name="Bollinger Upper",
+                                 line=dict(color="rgba(156,39,176,0.8)", width=1)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["lower"], mode="lines", name="Bollinger Lower",
+                                 line=dict(color="rgba(156,39,176,0.8)", width=1),
+                                 fill="tonexty", fillcolor="rgba(156,39,176,0.08)"), row=1, col=1)
+    if "VWAP" in selected:
+        vwap = compute("vwap", window=settings["vwap_window"])
+        fig.add_trace(go.Scatter(x=vwap.index, y=vwap["vwap"], mode="lines", name=f"VWAP {settings['vwap_window']}",
+                                 line=dict(color="#FFC107", width=1.5, dash="dot")), row=1, col=1)
+    if "RSI" in selected:
+        rsi = compute("rsi", period=settings["rsi_period"])
+        fig.add_trace(go.Scatter(x=rsi.index, y=rsi["rsi"], mode="lines", name=f"RSI {settings['rsi_period']}",
+                                 line=dict(color="#2196F3", width=1.5)), row=2, col=1)
+        for level in (30, 70):
+            fig.add_hline(y=level, line=dict(color="#888", width=1, dash="dash"), row=2, col=1)
+        fig.update_yaxes(title_text="RSI", range=[0, 100], row=2, col=1)
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of built chart figures, shared by every session"""
+    return FigureCache()
+
+def candle_range_start(interval, span):
+    """Start of a candle range ending now, or None for all history
+
+    Aligned to the candle boundary so the URL (and its cache validators) is stable between reruns.
+    """
+    if span is None:
+        return None
+    start = (datetime.utcnow() - span).replace(minute=0, second=0, microsecond=0)
+    if interval == "1d":
+        start = start.replace(hour=0)
+    return start
+
+def build_volume_figure(volume_series, zoom, currency):
+    """Line chart of each coin's rolling 24h volume within zoom, downsampled with LTTB"""
+    fig = go.Figure()
+    for coin, candles in volume_series.items():
+        times, volumes = candles
+        visible = (times >= zoom[0]) & (times <= zoom[1])
+        fig.add_trace(line_trace(
+            times[visible],
+            volumes[visible],
+            name=COIN_NAMES[coin],
+            line=dict(color=COIN_COLORS[coin], width=2)
+        ))
+    
+    fig.update_layout(
+        title="Trading Volume Trends",
+        xaxis_title="",
+        yaxis_title=f"24h Trading Volume ({currency.upper()})",
+        height=500,
+        template="plotly_dark",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    # Format y-axis to show billions
+    fig.update_yaxes(tickformat=".2s", tickprefix=CURRENCY_SYMBOLS.get(currency, ""))
+    return fig
 
 # API interaction functions
+@st.cache_resource
+def get_api_pool():
+    """Process-wide load balancer over the configured API instances"""
+    return ApiPool(API_URLS)
+
 def check_api_health():
-    """Check if API server is running"""
-    try:
-        response = requests.get(f"{API_URL}/health", timeout=2)
-        return response.status_code == 200
-    except:
-        return False
+    """Check if any API server instance is running"""
+    return get_api_pool().check_health(timeout=2)
 
 def get_coin_stats(coin):
-    """Get statistics for a specific coin"""
+    """Get statistics for a specific coin as a shared CoinStats record"""
     try:
-        response = requests.get(f"{API_URL}/stats", params={"coin": coin}, timeout=5)
+        request_start = time.perf_counter()
+        response = get_api_pool().get_json("/stats", params={"coin": coin}, timeout=5)
         if response.status_code == 200:
-            return response.json()
+            store = get_snapshot_store()
+            # Unchanged data is already parsed in the process-wide store
+            stats = store.get(coin, response.etag) if response.etag else None
+            if stats is None:
+                stats = store.put(parse_stats(coin, response.data), response.etag)
+            if not response.from_cache:
+                remember_payload(f"stats:{coin}", response.data)
+            record_freshness(coin, stats, (time.perf_counter() - request_start) * 1000)
+            return stats
         else:
             st.error(f"Error fetching stats: {response.text}")
             return None
+    except InvalidPayload as e:
+        st.error(f"Invalid stats from API: {str(e)}")
+        return None
     except Exception as e:
         st.error(f"Error connecting to API: {str(e)}")
         return None
 
-def get_coin_deviation(coin):
+def get_market_snapshot(coins):
+    """Fetch the latest stats of coins and return the shared snapshot over them
+
+    A coin whose fetch failed on this rerun keeps the last record any session
+    stored for it, marked stale so the cached-data banner is shown.
+    """
+    failed = [coin for coin in coins if get_coin_stats(coin) is None]
+    return get_snapshot_store().snapshot(coins, stale=failed)
+
+def record_freshness(coin, stats, request_ms):
+    """Keep per-stage ingestion lag samples for the freshness percentiles"""
+    st.session_state.freshness_samples.append({
+        "coin": coin,
+        "queue_ms": stats.queue_ms,
+        "fetch_ms": stats.fetch_ms,
+        "request_ms": request_ms,
+        "age_s": stats.age_seconds()
+    })
+    st.session_state.freshness_samples = st.session_state.freshness_samples[-FRESHNESS_SAMPLES:]
+
+def currency_key(key, currency):
+    """Suffix a cache key with the currency for anything but USD"""
+    return key if currency == "usd" else f"{key}:{currency}"
+
+def get_coin_deviation(coin, currency="usd"):
     """Get price deviation for a specific coin"""
     try:
-        response = requests.get(f"{API_URL}/deviation", params={"coin": coin}, timeout=5)
+        response = get_api_pool().get_json("/deviation", params={"coin": coin, "currency": currency}, timeout=5)
         if response.status_code == 200:
-            return response.json()
+            deviation = response.data
+            if not response.from_cache:
+                remember_payload(currency_key(f"deviation:{coin}", currency), deviation)
+            return deviation
         else:
             st.error(f"Error fetching deviation: {response.text}")
             return None
@@ -165,10 +345,438 @@ def get_coin_deviation(coin):
         st.error(f"Error connecting to API: {str(e)}")
         return None
 
+def candle_params(coin, interval, start=None, end=None, currency="usd"):
+    """Query parameters of a /candles request"""
+    params = {"coin": coin, "interval": interval, "currency": currency}
+    if start:
+        params["from"] = start.isoformat()
+    if end:
+        params["to"] = end.isoformat()
+    return params
+
+def get_coin_candles(coin, interval="1h", start=None, end=None, currency="usd"):
+    """Get OHLC candles for a specific coin from the rollup collections"""
+    try:
+        params = candle_params(coin, interval, start=start, end=end, currency=currency)
+        response = get_api_pool().get_json("/candles", params=params, timeout=10)
+        if response.status_code == 200:
+            candles = response.data.get("candles", [])
+            history_key = currency_key(f"{coin}:{interval}", currency)
+            if not response.from_cache:
+                remember_payload(f"candles:{history_key}", candles)
+            st.session_state.price_history[history_key] = candles
+            st.session_state.candle_versions[history_key] = response.etag
+            return candles
+        else:
+            st.error(f"Error fetching candles: {response.text}")
+            return None
+    except Exception as e:
+        st.error(f"Error connecting to API: {str(e)}")
+        return None
+
+def get_volume_candles(coin, interval, start=None, currency="usd"):
+    """Candles of a volume chart range as (candles, data version), or (None, None)
+
+    Kept apart from get_coin_candles: the volume ranges differ from the price
+    chart's, so they must not replace its session history, cached payloads or
+    the candle versions its indicators are keyed on.
+    """
+    try:
+        response = get_api_pool().get_json(
+            "/candles", params=candle_params(coin, interval, start=start, currency=currency), timeout=10
+        )
+    except Exception as e:
+        st.error(f"Error connecting to API: {str(e)}")
+        return None, None
+    if response.status_code != 200:
+        st.error(f"Error fetching volume history: {response.text}")
+        return None, None
+    return response.data.get("candles", []), response.etag
+
+def export_schema(interval=None):
+    """Arrow schema of the rows /export streams for raw ticks, or for candles with an interval"""
+    import pyarrow as pa
+    
+    timestamp = pa.timestamp("ms", tz="UTC")
+    if interval:
+        return pa.schema([
+            ("coin", pa.string()),
+            ("interval", pa.string()),
+            ("time", timestamp),
+            ("open", pa.float64()),
+            ("high", pa.float64()),
+            ("low", pa.float64()),
+            ("close", pa.float64()),
+            ("marketCap", pa.float64())
+        ])
+    return pa.schema([
+        ("coin", pa.string()),
+        ("timestamp", timestamp),
+        ("price", pa.float64()),
+        ("marketCap", pa.float64()),
+        ("change24h", pa.float64())
+    ])
+
+def write_parquet_stream(lines, path, interval=None):
+    """Write an NDJSON line stream to Parquet one row group at a time
+    
+    The schema is fixed up front, so a column whose first rows happen to be
+    whole numbers still holds floats in later row groups.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = export_schema(interval)
+    writer = None
+    rows = []
+    
+    def flush():
+        nonlocal writer
+        df = pd.DataFrame(rows, columns=schema.names)
+        for field in schema:
+            if pa.types.is_timestamp(field.type):
+                df[field.name] = pd.to_datetime(df[field.name], utc=True)
+            elif pa.types.is_floating(field.type):
+                df[field.name] = pd.to_numeric(df[field.name], errors="coerce").astype("float64")
+        if writer is None:
+            writer = pq.ParquetWriter(path, schema)
+        writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        rows.clear()
+    
+    try:
+        for line in lines:
+            if line:
+                rows.append(json.loads(line))
+            if len(rows) >= EXPORT_PARQUET_ROWS:
+                flush()
+        if rows:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    return writer is not None
+
+def remove_export(path):
+    """Delete an export file, ignoring files that are already gone"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def prune_exports(max_age=EXPORT_MAX_AGE_SECONDS):
+    """Delete export files older than max_age seconds"""
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(EXPORT_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                remove_export(entry.path)
+        except OSError:
+            pass
+
+def export_params(coins, export_format, start=None, end=None, interval=None):
+    """Query parameters of an /export request"""
+    params = {
+        "coin": ",".join(coins),
+        # Parquet is assembled locally from the NDJSON stream
+        "format": "ndjson" if export_format == "parquet" else export_format
+    }
+    if start:
+        params["from"] = start.isoformat()
+    if end:
+        params["to"] = end.isoformat()
+    if interval:
+        params["interval"] = interval
+    return params
+
+def download_export(coins, export_format, start=None, end=None, interval=None):
+    """Stream a history export from the API into a local file without holding it in memory
+    
+    Every export gets its own file, so concurrent sessions never write to the
+    same path. The caller deletes it with remove_export() when it is replaced.
+    """
+    params = export_params(coins, export_format, start=start, end=end, interval=interval)
+    
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    prune_exports()
+    with tempfile.NamedTemporaryFile(dir=EXPORT_DIR, prefix="koinx-export-", suffix=f".{export_format}", delete=False) as f:
+        path = f.name
+    
+    try:
+        with requests.get(f"{get_api_pool().pick_url()}/export", params=params, stream=True, timeout=(5, 60)) as response:
+            if response.status_code != 200:
+                st.error(f"Error exporting history: {response.text}")
+                remove_export(path)
+                return None
+            
+            if export_format == "parquet":
+                if not write_parquet_stream(response.iter_lines(), path, interval=interval):
+                    st.info("No history matched the selected range.")
+                    remove_export(path)
+                    return None
+            else:
+                with open(path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=EXPORT_CHUNK_BYTES):
+                        f.write(chunk)
+        return path
+    except ImportError:
+        st.error("Parquet export requires pyarrow. Install it with `pip install pyarrow`.")
+        remove_export(path)
+        return None
+    except Exception as e:
+        st.error(f"Error connecting to API: {str(e)}")
+        remove_export(path)
+        return None
+
+def get_price_history(coin, start, interval=None):
+    """Load stored price history as (times in epoch seconds, prices) arrays
+
+    Raw ticks are used by default; with an interval the candle closes are used,
+    which reach further back than the raw retention window.
+    """
+    params = {"coin": coin, "format": "csv", "from": start.isoformat()}
+    if interval:
+        params["interval"] = interval
+    time_column, price_column = ("time", "close") if interval else ("timestamp", "price")
+    
+    try:
+        with requests.get(f"{get_api_pool().pick_url()}/export", params=params, stream=True, timeout=(5, 60)) as response:
+            if response.status_code != 200:
+                st.error(f"Error loading price history: {response.text}")
+                return None
+            response.raw.decode_content = True
+            df = pd.read_csv(response.raw, usecols=[time_column, price_column])
+    except Exception as e:
+        st.error(f"Error connecting to API: {str(e)}")
+        return None
+    
+    times = pd.to_datetime(df[time_column], utc=True)
+    seconds = (times - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
+    return seconds, df[price_column].to_numpy(dtype=float)
+
+def parse_prometheus_text(text):
+    """Parse Prometheus text exposition into {metric name: [(labels, value), ...]}"""
+    metrics = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name_part, _, value = line.rpartition(" ")
+        labels = {}
+        if "{" in name_part:
+            name, _, label_part = name_part.partition("{")
+            for pair in label_part.rstrip("}").split('",'):
+                if "=" in pair:
+                    key, _, label_value = pair.partition("=")
+                    labels[key] = label_value.strip('"')
+        else:
+            name = name_part
+        try:
+            metrics.setdefault(name, []).append((labels, float(value)))
+        except ValueError:
+            continue
+    return metrics
+
+def histogram_quantile(metrics, name, quantile, match=None):
+    """Estimate a quantile from cumulative histogram buckets, optionally filtered by labels"""
+    buckets = {}
+    for labels, value in metrics.get(f"{name}_bucket", []):
+        if match and any(labels.get(k) != v for k, v in match.items()):
+            continue
+        bound = float("inf") if labels["le"] == "+Inf" else float(labels["le"])
+        buckets[bound] = buckets.get(bound, 0) + value
+    if not buckets:
+        return None
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]]
+    if total == 0:
+        return None
+    rank = quantile * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            # Linear interpolation inside the bucket, as Prometheus does
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / max(count - prev_count, 1e-12)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+def metric_sum(metrics, name, match=None):
+    """Sum every sample of a metric, optionally filtered by labels"""
+    return sum(
+        value for labels, value in metrics.get(name, [])
+        if not match or all(labels.get(k) == v for k, v in match.items())
+    )
+
+def get_server_metrics(server_type):
+    """Scrape the /metrics endpoint of the API or worker server"""
+    try:
+        if server_type == "api":
+            response = get_api_pool().get("/metrics", timeout=5)
+        else:
+            response = requests.get(f"{WORKER_URL}/metrics", timeout=5)
+        if response.status_code == 200:
+            return parse_prometheus_text(response.text)
+        return None
+    except Exception:
+        return None
+
+def format_duration(seconds):
+    """Format a number of seconds as e.g. 12h 34m"""
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h"
+    return f"{hours}h {minutes}m"
+
+def display_system_metrics():
+    """Show live operational metrics scraped from the API and worker servers"""
+    api_metrics = get_server_metrics("api")
+    worker_metrics = get_server_metrics("worker")
+    
+    if api_metrics is None and worker_metrics is None:
+        st.info("Metrics are unavailable. Start the API and worker servers to see live system metrics.")
+        return
+    
+    if api_metrics is not None:
+        total_requests = metric_sum(api_metrics, "http_requests_total")
+        db_size = metric_sum(api_metrics, "mongo_db_size_bytes", {"kind": "storage"})
+        uptime = metric_sum(api_metrics, "process_uptime_seconds")
+        lag_p99 = metric_sum(api_metrics, "nodejs_eventloop_lag_seconds", {"quantile": "0.99"})
+        coingecko_p95 = histogram_quantile(api_metrics, "coingecko_request_duration_seconds", 0.95)
+        coingecko_errors = metric_sum(api_metrics, "coingecko_errors_total")
+        nats_messages = metric_sum(api_metrics, "nats_messages_total")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(label="API Uptime", value=format_duration(uptime))
+        with col2:
+            st.metric(label="DB Size", value=f"{db_size / (1024 * 1024):,.1f} MB")
+        with col3:
+            st.metric(label="API Requests", value=f"{total_requests:,.0f}")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                label="CoinGecko p95 Latency",
+                value=f"{coingecko_p95 * 1000:,.0f} ms" if coingecko_p95 is not None else "N/A",
+                delta=f"{coingecko_errors:,.0f} errors",
+                delta_color="inverse"
+            )
+        with col2:
+            st.metric(label="NATS Messages Processed", value=f"{nats_messages:,.0f}")
+        with col3:
+            st.metric(label="Event Loop Lag (p99)", value=f"{lag_p99 * 1000:,.1f} ms")
+        
+        # Keep a short rolling history in the session for the live charts
+        st.session_state.metrics_history.append({
+            "time": datetime.now(),
+            "requests": total_requests,
+            "lag_ms": lag_p99 * 1000
+        })
+        st.session_state.metrics_history = st.session_state.metrics_history[-METRICS_HISTORY_POINTS:]
+        
+        # Per-route traffic and latency
+        routes = sorted({labels["route"] for labels, _ in api_metrics.get("http_requests_total", [])})
+        if routes:
+            route_df = pd.DataFrame([
+                {
+                    "Route": route,
+                    "Requests": metric_sum(api_metrics, "http_requests_total", {"route": route}),
+                    "p50 (ms)": (histogram_quantile(api_metrics, "http_request_duration_seconds", 0.5, {"route": route}) or 0) * 1000,
+                    "p95 (ms)": (histogram_quantile(api_metrics, "http_request_duration_seconds", 0.95, {"route": route}) or 0) * 1000
+                }
+                for route in routes
+            ])
+            
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=route_df["Route"], y=route_df["p50 (ms)"], name="p50"))
+            fig.add_trace(go.Bar(x=route_df["Route"], y=route_df["p95 (ms)"], name="p95"))
+            fig.update_layout(
+                title="API Latency by Route",
+                yaxis_title="Latency (ms)",
+                barmode="group",
+                height=350,
+                template="plotly_dark"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(route_df, use_container_width=True, hide_index=True)
+        
+        # MongoDB operation timings
+        operations = sorted({labels["operation"] for labels, _ in api_metrics.get("mongo_query_duration_seconds_count", [])})
+        if operations:
+            mongo_df = pd.DataFrame([
+                {
+                    "Operation": op,
+                    "Calls": metric_sum(api_metrics, "mongo_query_duration_seconds_count", {"operation": op}),
+                    "p95 (ms)": (histogram_quantile(api_metrics, "mongo_query_duration_seconds", 0.95, {"operation": op}) or 0) * 1000
+                }
+                for op in operations
+            ])
+            st.dataframe(mongo_df, use_container_width=True, hide_index=True)
+        
+        if len(st.session_state.metrics_history) > 1:
+            history_df = pd.DataFrame(st.session_state.metrics_history)
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(go.Scatter(x=history_df["time"], y=history_df["requests"], name="Total Requests"), secondary_y=False)
+            fig.add_trace(go.Scatter(x=history_df["time"], y=history_df["lag_ms"], name="Event Loop Lag p99 (ms)"), secondary_y=True)
+            fig.update_layout(title="API Activity", height=350, template="plotly_dark")
+            st.plotly_chart(fig, use_container_width=True)
+    
+    display_freshness_metrics(api_metrics)
+    
+    if worker_metrics is not None:
+        st.subheader("Worker")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(label="Worker Uptime", value=format_duration(metric_sum(worker_metrics, "process_uptime_seconds")))
+        with col2:
+            st.metric(label="Messages Published", value=f"{metric_sum(worker_metrics, 'nats_messages_published_total'):,.0f}")
+        with col3:
+            lateness = histogram_quantile(worker_metrics, "scheduler_slot_lateness_seconds", 0.99)
+            st.metric(label="Scheduler Lateness (p99)", value=f"{lateness * 1000:,.1f} ms" if lateness is not None else "N/A")
+
+def display_freshness_metrics(api_metrics):
+    """Show ingestion lag percentiles per pipeline stage"""
+    st.subheader("Data Freshness")
+    
+    percentiles = [50, 95, 99]
+    rows = []
+    
+    if api_metrics is not None:
+        # Server-side stages come from the API's ingestion histogram
+        for stage in ["queue", "fetch", "write", "total"]:
+            values = [histogram_quantile(api_metrics, "ingest_stage_duration_seconds", p / 100, {"stage": stage}) for p in percentiles]
+            if all(v is not None for v in values):
+                rows.append({"Stage": f"Ingest: {stage}", **{f"p{p}": format_age(v) for p, v in zip(percentiles, values)}})
+    
+    samples = pd.DataFrame(st.session_state.freshness_samples)
+    if not samples.empty:
+        # Client-side stages observed by this session
+        for column, label, scale in [("request_ms", "API request", 1000), ("age_s", "Data age at render", 1)]:
+            values = samples[column].dropna()
+            if not values.empty:
+                rows.append({
+                    "Stage": label,
+                    **{f"p{p}": format_age(np.percentile(values, p) / scale) for p in percentiles}
+                })
+    
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("No ingestion traces recorded yet.")
+
 def get_market_dominance():
     """Get market dominance data for top cryptocurrencies"""
     try:
-        response = requests.get(f"{API_URL}/market-dominance", timeout=5)
+        response = get_api_pool().get("/market-dominance", timeout=5)
         if response.status_code == 200:
             return response.json()
         else:
@@ -181,7 +789,7 @@ def get_market_dominance():
 def trigger_update():
     """Manually trigger crypto stats update"""
     try:
-        response = requests.post(f"{API_URL}/trigger-update")
+        response = get_api_pool().post("/trigger-update")
         if response.status_code == 200:
             st.success("Cryptocurrency stats updated successfully!")
             return True
@@ -192,6 +800,76 @@ def trigger_update():
         st.error(f"Error connecting to API: {str(e)}")
         return False
 
+def start_backfill(coins, days, concurrency):
+    """Start a historical backfill on the API server"""
+    try:
+        response = get_api_pool().post(
+            "/backfill", json={"coins": coins, "days": days, "concurrency": concurrency}, timeout=10
+        )
+        if response.status_code == 202:
+            st.success("Backfill started")
+            return response.json()
+        st.error(f"Failed to start backfill: {response.json().get('error', response.text)}")
+        return None
+    except Exception as e:
+        st.error(f"Error connecting to API: {str(e)}")
+        return None
+
+def get_backfill_status():
+    """Get the status of the most recent backfill, or None if there is none"""
+    try:
+        response = get_api_pool().get("/backfill", timeout=5)
+        if response.status_code == 200:
+            return response.json()
+        return None
+    except Exception:
+        return None
+
+def display_backfill_section():
+    """Form to start a historical backfill and its progress"""
+    st.header("Historical Backfill")
+    st.caption(
+        "Fetches past prices from CoinGecko in parallel fixed 30-day windows and builds candles from them. "
+        "Completed windows are remembered, so re-running a backfill only fetches what is missing."
+    )
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        coins = st.multiselect(
+            "Coins",
+            options=SUPPORTED_COINS,
+            default=SUPPORTED_COINS,
+            format_func=lambda x: COIN_NAMES.get(x, x),
+            key="backfill_coins"
+        )
+    with col2:
+        days = st.number_input("Days", min_value=1, max_value=3650, value=365, key="backfill_days")
+    with col3:
+        concurrency = st.number_input("Parallel windows", min_value=1, max_value=10, value=3, key="backfill_concurrency")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Start Backfill", disabled=not coins):
+            start_backfill(coins, int(days), int(concurrency))
+    with col2:
+        st.button("Refresh Backfill Status")
+
+    job = get_backfill_status()
+    if not job:
+        st.info("No backfill has been run yet.")
+        return
+
+    finished = job["completedWindows"] + job["skippedWindows"] + job["failedWindows"]
+    total = job["totalWindows"] or 1
+    st.progress(min(finished / total, 1.0), text=f"{job['status'].capitalize()}: {finished}/{job['totalWindows']} windows")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Stored", job["completedWindows"])
+    col2.metric("Already Done", job["skippedWindows"])
+    col3.metric("Failed", job["failedWindows"])
+    col4.metric("Points", f"{job['points']:,}")
+    if job.get("error"):
+        st.error(job["error"])
+
 def set_price_alert(coin, upper=None, lower=None):
     """Set price alerts for a specific coin"""
     try:
@@ -200,7 +878,7 @@ def set_price_alert(coin, upper=None, lower=None):
             "upperThreshold": upper,
             "lowerThreshold": lower
         }
-        response = requests.post(f"{API_URL}/set-alert", json=data, timeout=5)
+        response = get_api_pool().post("/set-alert", json=data, timeout=5)
         if response.status_code == 200:
             st.success(f"Price alert set for {COIN_NAMES[coin]}")
             # Update session state
@@ -216,7 +894,7 @@ def set_price_alert(coin, upper=None, lower=None):
 def check_price_alerts():
     """Check if any price alerts have been triggered"""
     try:
-        response = requests.get(f"{API_URL}/check-alerts", timeout=5)
+        response = get_api_pool().get("/check-alerts", timeout=5)
         if response.status_code == 200:
             alerts = response.json()
             if alerts and len(alerts) > 0:
@@ -232,20 +910,71 @@ def check_price_alerts():
         return []
 
 # UI Component functions
+def format_money(value, currency="usd", decimals=2):
+    """Format an amount with the currency's symbol, e.g. €1,234.50"""
+    return f"{CURRENCY_SYMBOLS.get(currency, currency.upper() + ' ')}{value:,.{decimals}f}"
+
+def format_age(seconds):
+    """Format a data age as e.g. 120ms, 45s, 12m or 3.5h"""
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+def create_freshness_badge(age):
+    """Small coloured badge showing how old the displayed price is"""
+    if age is None or np.isnan(age):
+        return ""
+    if age < FRESH_AGE_SECONDS:
+        color = "#4CAF50"
+    elif age < STALE_AGE_SECONDS:
+        color = "#FFC107"
+    else:
+        color = "#F44336"
+    return f'<span style="color: {color}; font-size: 12px;" title="Time since CoinGecko updated this price">● {format_age(age)} ago</span>'
+
+def create_sparkline_svg(prices, width=120, height=32):
+    """Inline SVG trend line of a sparkline price series, green when up and red when down"""
+    if prices is None:
+        return ""
+    prices = prices[np.isfinite(prices)]
+    if len(prices) < 2:
+        return ""
+    # Average into evenly sized buckets so the markup stays a few hundred bytes
+    starts = np.linspace(0, len(prices), min(SPARKLINE_POINTS, len(prices)), endpoint=False).astype(int)
+    values = np.add.reduceat(prices.astype(float), starts) / np.diff(np.append(starts, len(prices)))
+    low, high = values.min(), values.max()
+    x = np.linspace(1, width - 1, len(values))
+    if high > low:
+        y = (height - 2) - (values - low) / (high - low) * (height - 4)
+    else:
+        y = np.full(len(values), height / 2)
+    points = " ".join(f"{px:.0f},{py:.1f}" for px, py in zip(x, y))
+    color = "#4CAF50" if values[-1] >= values[0] else "#F44336"
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img">'
+        f'<title>7-day trend</title><polyline points="{points}" fill="none" stroke="{color}" '
+        f'stroke-width="1.5" stroke-linejoin="round"/></svg>'
+    )
+
 def create_price_card(coin, stats):
     """Create a styled card for coin price data"""
     if not stats:
         return
     
-    price = stats.get("price", 0)
-    market_cap = stats.get("marketCap", 0)
-    change_24h = stats.get("24hChange", 0)
-    volume_24h = stats.get("24hVolume", 0)
+    price = stats.price
+    market_cap = stats.market_cap
+    change_24h = stats.change_24h
+    volume_24h = stats.volume_24h
     
     # Format values
-    price_formatted = f"${price:,.2f}"
-    market_cap_formatted = f"${market_cap:,.0f}"
-    volume_formatted = f"${volume_24h:,.0f}"
+    currency = stats.currency
+    price_formatted = format_money(price, currency)
+    market_cap_formatted = format_money(market_cap, currency, 0)
+    volume_formatted = format_money(volume_24h, currency, 0)
     
     # Set color based on 24h change
     color = "green" if change_24h >= 0 else "red"
@@ -269,44 +998,42 @@ def create_price_card(coin, stats):
                 </div>
                 <div style="flex-grow: 1;">
                     <h3 style="margin: 0; font-size: 24px; color: white;">{COIN_NAMES[coin]}</h3>
-                    <div style="font-size: 28px; font-weight: bold; margin: 8px 0;">{price_formatted}</div>
+                    <div style="display: flex; justify-content: space-between; align-items: center; margin: 8px 0;">
+                        <span style="font-size: 28px; font-weight: bold;">{price_formatted}</span>
+                        {create_sparkline_svg(stats.sparkline)}
+                    </div>
                     <div style="display: flex; justify-content: space-between; margin-top: 10px;">
                         <span style="color: #ccc;">Market Cap: {market_cap_formatted}</span>
                         <span style="color: {color}; font-weight: bold;">{change_icon} {abs(change_24h):.2f}%</span>
                     </div>
                     <div style="display: flex; justify-content: space-between; margin-top: 10px;">
                         <span style="color: #ccc;">24h Volume: {volume_formatted}</span>
-                        <span style="color: #ccc;">Rank: #{stats.get('marketCapRank', 'N/A')}</span>
+                        <span style="color: #ccc;">Rank: #{stats.rank or 'N/A'}</span>
                     </div>
+                    <div style="text-align: right; margin-top: 6px;">{create_freshness_badge(stats.age_seconds())}</div>
                 </div>
             </div>
         </div>
         """, unsafe_allow_html=True)
 
-def create_price_table(coins_data):
+def create_price_table(snapshot):
     """Create a table view of all coin data"""
-    if not coins_data:
+    if not snapshot:
         return
         
-    # Prepare data for table
-    data = []
-    for coin, stats in coins_data.items():
-        if stats:
-            data.append({
-                "Coin": COIN_NAMES[coin],
-                "Icon": COIN_ICONS[coin],
-                "Price (USD)": stats.get("price", 0),
-                "24h Change": stats.get("24hChange", 0),
-                "Market Cap": stats.get("marketCap", 0),
-                "24h Volume": stats.get("24hVolume", 0),
-                "Rank": stats.get("marketCapRank", "N/A")
-            })
-    
-    if not data:
-        return
-        
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
+    # Build the table straight from the snapshot's columns
+    currency = snapshot.currency
+    price_column = f"Price ({currency.upper()})"
+    df = pd.DataFrame({
+        "Coin": [COIN_NAMES[coin] for coin in snapshot.coins],
+        "Icon": [COIN_ICONS[coin] for coin in snapshot.coins],
+        price_column: snapshot.price,
+        "24h Change": snapshot.change_24h,
+        "Market Cap": snapshot.market_cap,
+        "24h Volume": snapshot.volume_24h,
+        "Rank": [f"{rank:.0f}" if not np.isnan(rank) else "N/A" for rank in snapshot.rank],
+        "Data Age": [format_age(age) if not np.isnan(age) else "N/A" for age in snapshot.ages()]
+    })
     
     # Style function for the dataframe
     def style_negative_red(v):
@@ -314,57 +1041,111 @@ def create_price_table(coins_data):
         
     # Apply styling
     styled_df = df.style.format({
-        "Price (USD)": "${:.2f}",
+        price_column: lambda v: format_money(v, currency),
         "24h Change": "{:.2f}%",
-        "Market Cap": "${:,.0f}",
-        "24h Volume": "${:,.0f}"
-    }).applymap(style_negative_red, subset=["24h Change"])
+        "Market Cap": lambda v: format_money(v, currency, 0),
+        "24h Volume": lambda v: format_money(v, currency, 0)
+    }).map(style_negative_red, subset=["24h Change"])
     
     # Display table with custom styling
     st.markdown('<div class="styled-table-container">', unsafe_allow_html=True)
     st.dataframe(styled_df, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-def create_minimal_view(coins_data):
+def create_minimal_view(snapshot):
     """Create a minimal ticker-style view of coin prices"""
-    if not coins_data:
+    if not snapshot:
         return
         
     # Create a horizontal list of coins with minimal info
-    col_count = min(len(coins_data), 3)  # Use at most 3 columns
+    col_count = min(len(snapshot), 3)  # Use at most 3 columns
     cols = st.columns(col_count)
     
-    idx = 0
-    for coin, stats in coins_data.items():
-        if stats:
-            price = stats.get("price", 0)
-            change_24h = stats.get("24hChange", 0)
-            
-            color = "green" if change_24h >= 0 else "red"
-            change_icon = "↑" if change_24h >= 0 else "↓"
-            
-            with cols[idx % col_count]:
-                st.markdown(f"""
-                <div class="minimal-coin-card" style="
-                    background: linear-gradient(135deg, rgba(30,30,30,0.9), rgba(20,20,20,0.95));
-                    border-radius: 10px; 
-                    padding: 12px; 
-                    margin: 8px 0; 
-                    text-align: center;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                    border-top: 2px solid {COIN_COLORS[coin]};
-                    position: relative;
-                    overflow: hidden;">
-                    <div style="position: absolute; top: 0; left: 0; right: 0; height: 2px; 
-                        background: linear-gradient(90deg, {COIN_COLORS[coin]}, transparent);"></div>
-                    <span style="color: {COIN_COLORS[coin]}; font-size: 24px; display: block; margin-bottom: 5px;">{COIN_ICONS[coin]}</span>
-                    <span style="font-weight: bold; font-size: 16px; color: white;">{COIN_NAMES[coin]}</span>
-                    <div style="font-size: 18px; margin: 8px 0; font-weight: bold;">${price:,.2f}</div>
-                    <div style="color: {color}; font-size: 15px; font-weight: bold;">{change_icon} {abs(change_24h):.2f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            idx += 1
+    for idx, (stats, age) in enumerate(zip(snapshot, snapshot.ages())):
+        coin = stats.coin
+        price = stats.price
+        change_24h = stats.change_24h
+        
+        color = "green" if change_24h >= 0 else "red"
+        change_icon = "↑" if change_24h >= 0 else "↓"
+        
+        with cols[idx % col_count]:
+            st.markdown(f"""
+            <div class="minimal-coin-card" style="
+                background: linear-gradient(135deg, rgba(30,30,30,0.9), rgba(20,20,20,0.95));
+                border-radius: 10px; 
+                padding: 12px; 
+                margin: 8px 0; 
+                text-align: center;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+                border-top: 2px solid {COIN_COLORS[coin]};
+                position: relative;
+                overflow: hidden;">
+                <div style="position: absolute; top: 0; left: 0; right: 0; height: 2px; 
+                    background: linear-gradient(90deg, {COIN_COLORS[coin]}, transparent);"></div>
+                <span style="color: {COIN_COLORS[coin]}; font-size: 24px; display: block; margin-bottom: 5px;">{COIN_ICONS[coin]}</span>
+                <span style="font-weight: bold; font-size: 16px; color: white;">{COIN_NAMES[coin]}</span>
+                <div style="font-size: 18px; margin: 8px 0; font-weight: bold;">{format_money(price, stats.currency)}</div>
+                <div style="color: {color}; font-size: 15px; font-weight: bold;">{change_icon} {abs(change_24h):.2f}%</div>
+                <div style="margin-top: 4px;">{create_sparkline_svg(stats.sparkline, width=100, height=24)}</div>
+                <div style="margin-top: 4px;">{create_freshness_badge(age)}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+def create_stale_banner(snapshot):
+    """Show a notice when the displayed data comes from the local cache"""
+    if snapshot.stale.any():
+        cached_at = datetime.fromtimestamp(np.nanmin(snapshot.cached_at[snapshot.stale])).strftime("%Y-%m-%d %H:%M:%S")
+        st.caption(f"⏳ Showing cached data from {cached_at}. Values may be out of date.")
+
+def render_coins_data(snapshot, selected_coins, display_mode):
+    """Render coin stats in the selected display mode"""
+    create_stale_banner(snapshot)
+    snapshot = snapshot.in_currency(st.session_state.get("currency", "usd"))
+    
+    if display_mode == "cards":
+        for coin in selected_coins:
+            if coin in snapshot:
+                create_price_card(coin, snapshot[coin])
+    
+    elif display_mode == "table":
+        create_price_table(snapshot)
+    
+    else:  # minimal view
+        create_minimal_view(snapshot)
+
+def load_cached_coins_data(coins):
+    """Load the last known stats for each coin from the local cache"""
+    records = []
+    for coin in coins:
+        payload = recall_payload(f"stats:{coin}")
+        if payload:
+            try:
+                records.append(parse_stats(coin, payload, stale=True, cached_at=payload["cachedAt"]))
+            except InvalidPayload:
+                continue
+    return MarketSnapshot(records)
+
+def create_deviation_chart(deviation_data, currency="usd"):
+    """Create a bar chart comparing price deviation across coins"""
+    fig = px.bar(
+        x=[COIN_NAMES[coin] for coin in deviation_data.keys()],
+        y=list(deviation_data.values()),
+        color=list(deviation_data.values()),
+        labels={"x": "Cryptocurrency", "y": f"Standard Deviation ({currency.upper()})"},
+        text=[format_money(val, currency) for val in deviation_data.values()],
+        color_continuous_scale="Viridis"
+    )
+    fig.update_layout(
+        title="Price Volatility Comparison",
+        xaxis_title="",
+        yaxis_title=f"Standard Deviation ({currency.upper()})",
+        showlegend=False,
+        height=400,
+        template="plotly_dark"
+    )
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return fig
 
 def display_price_alerts_section():
     """Display and manage price alerts"""
@@ -384,7 +1165,7 @@ def display_price_alerts_section():
             current_price = None
             stats = get_coin_stats(alert_coin)
             if stats:
-                current_price = stats.get("price", 0)
+                current_price = stats.price
                 st.info(f"Current price: ${current_price:,.2f}")
         
         if current_price:
@@ -410,6 +1191,8 @@ def display_price_alerts_section():
             
             if st.button("Set Alert", key="set_alert_btn", help="Set price alert for selected cryptocurrency"):
                 set_price_alert(alert_coin, upper_threshold, lower_threshold)
+            
+            display_alert_backtest(alert_coin, current_price, upper_threshold, lower_threshold)
     
     # Display active alerts
     active_alerts = {coin: thresholds for coin, thresholds in st.session_state.alert_thresholds.items() 
@@ -489,6 +1272,85 @@ def display_price_alerts_section():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def display_alert_backtest(coin, current_price, upper, lower):
+    """Backtest the chosen and nearby thresholds against stored history"""
+    st.markdown("**Backtest against history**")
+    st.caption(
+        "Shows how often alerts at these and nearby thresholds would have fired. "
+        "An alert fires when the price crosses its threshold and then stays quiet for the cooldown."
+    )
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        days = st.selectbox("History", options=BACKTEST_DAYS, index=2, format_func=lambda d: f"{d} days", key="backtest_days")
+    with col2:
+        resolution = st.selectbox("Resolution", options=["Raw ticks", "Hourly candles"], key="backtest_resolution")
+    with col3:
+        cooldown_minutes = st.number_input("Cooldown (minutes)", min_value=0, max_value=7 * 24 * 60, value=60, key="backtest_cooldown")
+    with col4:
+        spread = st.number_input("Candidate range (±%)", min_value=1, max_value=100, value=20, key="backtest_spread")
+    
+    history_key = (coin, days, resolution)
+    if st.button("Run Backtest", key="run_backtest_btn"):
+        start = datetime.now(timezone.utc) - timedelta(days=days)
+        with st.spinner("Loading price history..."):
+            history = get_price_history(coin, start, "1h" if resolution == "Hourly candles" else None)
+        if history is not None:
+            st.session_state.backtest_history[history_key] = history
+    
+    history = st.session_state.backtest_history.get(history_key)
+    if history is None:
+        return
+    times, prices = history
+    if len(prices) < 2:
+        st.info("Not enough stored history for this coin and range. Try a backfill or a shorter range.")
+        return
+    
+    # The chosen threshold goes first, followed by a grid of candidates around the current price
+    steps = np.linspace(0, spread / 100, 1001)[1:]
+    upper_candidates = np.concatenate([[upper], current_price * (1 + steps)])
+    lower_candidates = np.concatenate([[lower], current_price * (1 - steps)])
+    cooldown = cooldown_minutes * 60
+    
+    started = time.perf_counter()
+    upper_result = backtest(times, prices, upper_candidates, "upper", cooldown)
+    lower_result = backtest(times, prices, lower_candidates, "lower", cooldown)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    def last_fired(result):
+        fires = result.fires(0)
+        if len(fires) == 0:
+            return "never"
+        return datetime.fromtimestamp(times[fires[-1]], tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    
+    col1, col2 = st.columns(2)
+    col1.metric(f"Upper ${upper:,.2f} fired", f"{upper_result.counts[0]}×", f"last: {last_fired(upper_result)}", delta_color="off")
+    col2.metric(f"Lower ${lower:,.2f} fired", f"{lower_result.counts[0]}×", f"last: {last_fired(lower_result)}", delta_color="off")
+    
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Price with alert firings", "Firings by threshold"))
+    fig.add_trace(go.Scatter(
+        x=pd.to_datetime(times, unit="s"), y=prices, mode="lines", name="Price",
+        line=dict(color=COIN_COLORS.get(coin, "#4CAF50"), width=1)
+    ), row=1, col=1)
+    for result, color, symbol in ((upper_result, "#4CAF50", "triangle-up"), (lower_result, "#ff5252", "triangle-down")):
+        fires = result.fires(0)
+        fig.add_trace(go.Scatter(
+            x=pd.to_datetime(times[fires], unit="s"), y=prices[fires], mode="markers",
+            name=f"{result.direction.capitalize()} fired", marker=dict(color=color, symbol=symbol, size=9)
+        ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=(result.thresholds[1:] / current_price - 1) * 100, y=result.counts[1:], mode="lines",
+            name=f"{result.direction.capitalize()} candidates", line=dict(color=color)
+        ), row=1, col=2)
+    fig.update_xaxes(title_text="Threshold vs current price (%)", row=1, col=2)
+    fig.update_yaxes(title_text="Firings", row=1, col=2)
+    fig.update_layout(height=380, template="plotly_dark", legend=dict(orientation="h", y=-0.2))
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{len(upper_candidates) + len(lower_candidates):,} thresholds over {len(prices):,} samples "
+        f"backtested in {elapsed_ms:.0f} ms"
+    )
+
 def display_readme():
     """Display project README information"""
     st.markdown("""
@@ -592,8 +1454,12 @@ def display_readme():
     
     - `/health` - API health check
     - `/stats` - Get current statistics for a specific coin
+    - `/candles` - Get hourly/daily OHLC candles for a specific coin
+    - `/export` - Stream price history as CSV or NDJSON
+    - `/backfill` - Start (POST) or check (GET) a historical backfill
     - `/set-alert` - Set price alerts
     - `/trigger-update` - Manually trigger a data update
+    - `/metrics` - Prometheus metrics (API and worker servers)
     """)
 
 def main():
@@ -833,6 +1699,10 @@ def main():
         
         if not api_available:
             st.warning("API server is not available. Please go to Server Management tab to start the servers.")
+            
+            cached_data = load_cached_coins_data(st.session_state.selected_coins)
+            if cached_data:
+                render_coins_data(cached_data, st.session_state.selected_coins, st.session_state.display_mode)
         else:
             # Add refresh button and last update time
             col1, col2, col3 = st.columns([1, 1, 1])
@@ -843,6 +1713,15 @@ def main():
                         # Check for any price alerts
                         check_price_alerts()
             
+            with col2:
+                st.selectbox(
+                    "Currency",
+                    options=list(CURRENCY_SYMBOLS.keys()),
+                    format_func=lambda x: x.upper(),
+                    key="currency",
+                    label_visibility="collapsed"
+                )
+            
             with col3:
                 if st.session_state.last_update:
                     st.text(f"Last updated: {st.session_state.last_update.strftime('%H:%M:%S')}")
@@ -877,24 +1756,22 @@ def main():
             
             # Display coin data based on selected display mode
             if st.session_state.selected_coins:
-                # Fetch data for selected coins
-                coins_data = {}
-                for coin in st.session_state.selected_coins:
-                    stats = get_coin_stats(coin)
-                    if stats:
-                        coins_data[coin] = stats
+                coins_placeholder = st.empty()
                 
-                # Display according to selected mode
-                if st.session_state.display_mode == "cards":
-                    for coin in st.session_state.selected_coins:
-                        if coin in coins_data:
-                            create_price_card(coin, coins_data[coin])
+                # On a new session paint the cached snapshot first, then replace it once fresh data arrives
+                if st.session_state.cold_start:
+                    cached_data = load_cached_coins_data(st.session_state.selected_coins)
+                    if cached_data:
+                        with coins_placeholder.container():
+                            render_coins_data(cached_data, st.session_state.selected_coins, st.session_state.display_mode)
                 
-                elif st.session_state.display_mode == "table":
-                    create_price_table(coins_data)
+                # Fetch data for selected coins
+                snapshot = get_market_snapshot(st.session_state.selected_coins)
                 
-                else:  # minimal view
-                    create_minimal_view(coins_data)
+                with coins_placeholder.container():
+                    render_coins_data(snapshot, st.session_state.selected_coins, st.session_state.display_mode)
+            
+            st.session_state.cold_start = False
             
             # Display price alerts section
             display_price_alerts_section()
@@ -903,6 +1780,17 @@ def main():
     with tab2:
         if not api_available:
             st.warning("API server is not available. Please go to Server Management tab to start the servers.")
+            
+            cached_deviation = {}
+            for coin in SUPPORTED_COINS:
+                deviation_result = recall_payload(currency_key(f"deviation:{coin}", st.session_state.currency))
+                if deviation_result:
+                    cached_deviation[coin] = deviation_result.get("deviation", 0)
+            
+            if cached_deviation:
+                st.subheader("Price Volatility Analysis")
+                st.caption("⏳ Showing cached data. Values may be out of date.")
+                st.plotly_chart(create_deviation_chart(cached_deviation, st.session_state.currency), use_container_width=True)
         else:
             st.header("Cryptocurrency Market Analysis")
             
@@ -910,77 +1798,238 @@ def main():
             st.subheader("Price Volatility Analysis")
             deviation_data = {}
             for coin in SUPPORTED_COINS:
-                deviation_result = get_coin_deviation(coin)
+                deviation_result = get_coin_deviation(coin, st.session_state.currency)
                 if deviation_result:
                     deviation_data[coin] = deviation_result.get("deviation", 0)
             
             if deviation_data:
                 # Create bar chart for deviations
-                fig = px.bar(
-                    x=[COIN_NAMES[coin] for coin in deviation_data.keys()],
-                    y=list(deviation_data.values()),
-                    color=list(deviation_data.values()),
-                    labels={"x": "Cryptocurrency", "y": "Standard Deviation (USD)"},
-                    text=[f"${val:.2f}" for val in deviation_data.values()],
-                    color_continuous_scale="Viridis"
+                st.plotly_chart(create_deviation_chart(deviation_data, st.session_state.currency), use_container_width=True)
+            
+            # Candlestick charts built from the hourly/daily rollups
+            st.subheader("Price Candles")
+            
+            candle_ranges = {
+                "7 Days (1h candles)": ("1h", timedelta(days=7)),
+                "30 Days (1h candles)": ("1h", timedelta(days=30)),
+                "1 Year (1d candles)": ("1d", timedelta(days=365)),
+                "All Time (1d candles)": ("1d", None)
+            }
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                candle_coin = st.selectbox(
+                    "Cryptocurrency",
+                    options=SUPPORTED_COINS,
+                    format_func=lambda x: COIN_NAMES[x],
+                    key="candle_coin"
                 )
+            with col2:
+                candle_range = st.selectbox(
+                    "Range",
+                    options=list(candle_ranges.keys()),
+                    key="candle_range"
+                )
+            
+            interval, span = candle_ranges[candle_range]
+            start = candle_range_start(interval, span)
+            candles = get_coin_candles(candle_coin, interval, start=start, currency=st.session_state.currency)
+            
+            indicator_options = ["SMA", "EMA", "Bollinger Bands", "VWAP", "RSI"]
+            selected_indicators = st.multiselect(
+                "Indicators",
+                options=indicator_options,
+                default=["SMA", "Bollinger Bands"],
+                key="candle_indicators"
+            )
+            with st.expander("Indicator Settings", expanded=False):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    sma_window = st.number_input("SMA window", min_value=2, max_value=500, value=20, key="sma_window")
+                    ema_span = st.number_input("EMA span", min_value=2, max_value=500, value=50, key="ema_span")
+                with col2:
+                    bollinger_window = st.number_input("Bollinger window", min_value=2, max_value=500, value=20, key="bollinger_window")
+                    bollinger_width = st.number_input("Bollinger width (σ)", min_value=0.5, max_value=5.0, value=2.0, step=0.5, key="bollinger_width")
+                with col3:
+                    vwap_window = st.number_input("VWAP window", min_value=2, max_value=500, value=24, key="vwap_window")
+                    rsi_period = st.number_input("RSI period", min_value=2, max_value=100, value=14, key="rsi_period")
+                st.caption("Windows are in candles. VWAP weights closes by the rolling 24h volume reported at each candle.")
+            indicator_settings = {
+                "sma_window": int(sma_window),
+                "ema_span": int(ema_span),
+                "bollinger_window": int(bollinger_window),
+                "bollinger_width": float(bollinger_width),
+                "vwap_window": int(vwap_window),
+                "rsi_period": int(rsi_period)
+            }
+            
+            if candles:
+                candle_df = pd.DataFrame(candles)
+                candle_df["time"] = pd.to_datetime(candle_df["time"])
+                
+                show_rsi = "RSI" in selected_indicators
+                fig = make_subplots(
+                    rows=2 if show_rsi else 1, cols=1, shared_xaxes=True,
+                    row_heights=[0.75, 0.25] if show_rsi else None, vertical_spacing=0.05
+                )
+                fig.add_trace(go.Candlestick(
+                    x=candle_df["time"],
+                    open=candle_df["open"],
+                    high=candle_df["high"],
+                    low=candle_df["low"],
+                    close=candle_df["close"],
+                    name=COIN_NAMES[candle_coin]
+                ), row=1, col=1)
+                add_indicator_traces(fig, candle_coin, interval, candle_df, selected_indicators, indicator_settings,
+                                     currency=st.session_state.currency)
                 fig.update_layout(
-                    title="Price Volatility Comparison",
-                    xaxis_title="",
-                    yaxis_title="Standard Deviation (USD)",
-                    showlegend=False,
-                    height=400,
+                    title=f"{COIN_NAMES[candle_coin]} Price ({interval} candles)",
+                    yaxis_title=f"Price ({st.session_state.currency.upper()})",
+                    xaxis_rangeslider_visible=False,
+                    height=650 if show_rsi else 500,
                     template="plotly_dark"
                 )
-                fig.update_traces(texttemplate='%{text}', textposition='outside')
                 
                 st.plotly_chart(fig, use_container_width=True)
+            elif candles is not None:
+                st.info(f"No candle data available yet for {COIN_NAMES[candle_coin]}.")
             
+            # Bulk history export
+            st.subheader("Export Price History")
             
+            export_sources = {
+                "Raw ticks (15 min)": None,
+                "Hourly candles": "1h",
+                "Daily candles": "1d"
+            }
             
+            col1, col2 = st.columns(2)
+            with col1:
+                export_coins = st.multiselect(
+                    "Cryptocurrencies",
+                    options=SUPPORTED_COINS,
+                    default=SUPPORTED_COINS,
+                    format_func=lambda x: COIN_NAMES[x],
+                    key="export_coins"
+                )
+                export_source = st.selectbox("Data", options=list(export_sources.keys()), key="export_source")
+            with col2:
+                export_range = st.date_input(
+                    "Date range",
+                    value=(datetime.now().date() - timedelta(days=30), datetime.now().date()),
+                    key="export_range"
+                )
+                export_format = st.selectbox("Format", options=["csv", "parquet", "ndjson"], key="export_format")
             
-            # Trading volume trends
-            st.subheader("Trading Volume Trends")
+            # The date picker yields a partial tuple while a range is being selected
+            export_dates = export_range if isinstance(export_range, tuple) else (export_range,)
             
-            # Mock volume trend data (in a real app, this would come from the API)
-            trend_data = {}
-            for coin in SUPPORTED_COINS:
-                # Generate some mock data for visualization
-                base_volume = {"bitcoin": 30, "ethereum": 20, "matic-network": 8, 
-                               "solana": 15, "cardano": 5, "ripple": 10}[coin] * 1e9
-                trend_data[coin] = [base_volume * (0.8 + 0.4 * np.random.random()) for _ in range(30)]
+            if st.button("Prepare Export", key="prepare_export_btn") and export_coins and export_dates:
+                start, end = export_dates[0], export_dates[-1]
+                export_args = dict(
+                    start=datetime.combine(start, datetime.min.time()),
+                    end=datetime.combine(end, datetime.max.time()),
+                    interval=export_sources[export_source]
+                )
+                # The previous export of this session is replaced, so its file can go
+                if st.session_state.get("export_path"):
+                    remove_export(st.session_state.export_path)
+                with st.spinner("Streaming export from API..."):
+                    st.session_state.export_path = download_export(export_coins, export_format, **export_args)
+                st.session_state.export_format = export_format
+                st.session_state.export_params = export_params(export_coins, export_format, **export_args)
             
-            # Create figure
-            fig = go.Figure()
+            export_path = st.session_state.get("export_path")
+            if export_path and os.path.exists(export_path):
+                export_size = os.path.getsize(export_path)
+                file_name = f"koinx-export.{st.session_state.export_format}"
+                if export_size <= EXPORT_DOWNLOAD_MAX_BYTES:
+                    with open(export_path, "rb") as f:
+                        st.download_button(
+                            "⬇️ Download Export",
+                            data=f,
+                            file_name=file_name,
+                            key="download_export_btn"
+                        )
+                else:
+                    st.warning(
+                        f"The export is {export_size / 1024 / 1024:,.0f} MB, more than the "
+                        f"{EXPORT_DOWNLOAD_MAX_BYTES / 1024 / 1024:,.0f} MB the dashboard serves through the browser. "
+                        f"It was saved to `{export_path}`."
+                    )
+                    if st.session_state.export_format != "parquet":
+                        # The API streams csv/ndjson exports itself, at any size
+                        export_url = requests.Request(
+                            "GET", f"{get_api_pool().pick_url()}/export", params=st.session_state.export_params
+                        ).prepare().url
+                        st.link_button("⬇️ Download from the API", export_url)
             
-            for coin in SUPPORTED_COINS:
-                fig.add_trace(go.Scatter(
-                    x=list(range(1, 31)),
-                    y=trend_data[coin],
-                    mode='lines',
-                    name=COIN_NAMES[coin],
-                    line=dict(color=COIN_COLORS[coin], width=2)
-                ))
+            # Trading volume trends from the stored candles
+            st.subheader("Trading Volume Trends")
             
-            fig.update_layout(
-                title="30-Day Trading Volume Trends",
-                xaxis_title="Day",
-                yaxis_title="Trading Volume (USD)",
-                height=500,
-                template="plotly_dark",
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
+            volume_ranges = {
+                "30 Days (1h candles)": ("1h", timedelta(days=30)),
+                "90 Days (1h candles)": ("1h", timedelta(days=90)),
+                "1 Year (1d candles)": ("1d", timedelta(days=365)),
+                "All Time (1d candles)": ("1d", None)
+            }
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                volume_coins = st.multiselect(
+                    "Cryptocurrencies",
+                    options=SUPPORTED_COINS,
+                    default=SUPPORTED_COINS,
+                    format_func=lambda x: COIN_NAMES[x],
+                    key="volume_coins"
+                )
+            with col2:
+                volume_range = st.selectbox(
+                    "Range",
+                    options=list(volume_ranges.keys()),
+                    key="volume_range"
                 )
-            )
             
-            # Format y-axis to show billions
-            fig.update_yaxes(tickformat="$.2s")
+            interval, span = volume_ranges[volume_range]
+            start = candle_range_start(interval, span)
+            currency = st.session_state.currency
+            volume_series = {}
+            versions = []
+            for coin in volume_coins:
+                candles, version = get_volume_candles(coin, interval, start=start, currency=currency)
+                if candles:
+                    candle_df = pd.DataFrame(candles)
+                    times = pd.to_datetime(candle_df["time"], utc=True).dt.tz_localize(None).to_numpy()
+                    volumes = candle_df.get("volume24h", pd.Series(np.nan, index=candle_df.index)).to_numpy(dtype=float)
+                    volume_series[coin] = (times, volumes)
+                    versions.append(version)
             
-            st.plotly_chart(fig, use_container_width=True)
+            if volume_series:
+                first = min(times[0] for times, _ in volume_series.values())
+                last = max(times[-1] for times, _ in volume_series.values())
+                zoom = (pd.Timestamp(first).to_pydatetime(), pd.Timestamp(last).to_pydatetime())
+                if last > first:
+                    zoom = st.slider(
+                        "Zoom",
+                        min_value=zoom[0],
+                        max_value=zoom[1],
+                        value=zoom,
+                        step=timedelta(hours=1) if interval == "1h" else timedelta(days=1),
+                        format="YYYY-MM-DD HH:mm"
+                    )
+                zoom = (np.datetime64(zoom[0]), np.datetime64(zoom[1]))
+                
+                # Without a data version for every series there is nothing safe to key the figure on
+                figure_key = None
+                if all(versions):
+                    figure_key = ("volume", tuple(volume_series), interval, start, zoom, currency, tuple(versions))
+                fig = get_figure_cache().get_or_build(
+                    figure_key,
+                    lambda: build_volume_figure(volume_series, zoom, currency)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            elif volume_coins:
+                st.info("No volume history available yet. Run a backfill from the Server Management tab to load past data.")
             
     # Server Management tab
     with tab3:
@@ -990,18 +2039,22 @@ def main():
             st.header("API Server")
             coll1,coll2=st.columns(2)
             with coll1:
-                api_status = "online" if check_api_health() else "offline"
+                api_running = check_api_health()
+                api_status = "online" if api_running else "offline"
                 st.markdown(f"""
                 <div>Status: <span class="server-status {api_status}">{api_status.upper()}</span></div>
                 """, unsafe_allow_html=True)
             with coll2:
                 st.markdown('<div class="button-row">', unsafe_allow_html=True)
-                if not check_api_health():
+                if not api_running:
                     if st.button("Start API Server"):
                         run_server_process("api")
                         st.success("Starting API server... Please wait")
                         time.sleep(3)
                         st.rerun()
+                elif server_control.server_pid("api") is None:
+                    # Healthy without a pid file: started outside the dashboard and the CLI, so not ours to stop
+                    st.caption("Externally managed")
                 else:
                     if st.button("Stop API Server"):
                         stop_server_process("api")
@@ -1009,12 +2062,15 @@ def main():
                         time.sleep(3)
                         st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
+            with st.expander("API Server Log", expanded=False):
+                st.code(server_log("api") or "No output yet", language=None)
 
         with col2:
             st.header("Worker Server")
             coll1,coll2=st.columns(2)
             with coll1:
-                worker_running = hasattr(st.session_state, "worker_process") and st.session_state.worker_process is not None
+                worker_pid = server_control.server_pid("worker")
+                worker_running = worker_pid is not None or server_control.check_worker_health()
                 worker_status = "online" if worker_running else "offline"
 
                 st.markdown(f"""
@@ -1029,6 +2085,9 @@ def main():
                         st.success("Starting Worker server... Please wait")
                         time.sleep(3)
                         st.rerun()
+                elif worker_pid is None:
+                    # Healthy without a pid file: started outside the dashboard and the CLI, so not ours to stop
+                    st.caption("Externally managed")
                 else:
                     if st.button("Stop Worker Server"):
                         stop_server_process("worker")
@@ -1036,8 +2095,14 @@ def main():
                         time.sleep(3)
                         st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
+            with st.expander("Worker Server Log", expanded=False):
+                st.code(server_log("worker") or "No output yet", language=None)
 
         st.divider()
+
+        if check_api_health():
+            display_backfill_section()
+            st.divider()
                 
         # Server configuration section
         st.header("Server Configuration")
@@ -1077,15 +2142,10 @@ def main():
         # System metrics
         st.header("System Metrics")
         
-        # Mock metrics for demo
-        col1, col2, col3 = st.columns(3)
+        if st.button("🔄 Refresh Metrics", key="refresh_metrics_btn"):
+            st.rerun()
         
-        with col1:
-            st.metric(label="API Uptime", value="12h 34m")
-        with col2:
-            st.metric(label="DB Size", value="154 MB")
-        with col3:
-            st.metric(label="API Requests", value="1,254")
+        display_system_metrics()
         
         # Team/Contributors section
         st.header("Development Team")
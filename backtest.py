@@ -0,0 +1,154 @@
+"""Vectorized backtesting of price alert thresholds against stored history.
+
+An alert fires when the price crosses its threshold: an upper alert when the
+price moves from below the threshold to at or above it, a lower alert when it
+moves from above to at or below it. After firing, an alert stays quiet for the
+cooldown period and fires again on the next crossing after that.
+
+Crossings for every candidate threshold are found in one pass: thresholds are
+sorted once and each price step is mapped to the contiguous range of
+thresholds it crosses with np.searchsorted, so the cost grows with the number
+of crossings rather than with thresholds x samples. Only NumPy is used so this
+module stays cheap to import.
+"""
+import numpy as np
+
+DIRECTIONS = ("upper", "lower")
+
+
+class BacktestResult:
+    """Alert firings for a set of candidate thresholds
+
+    fire_threshold and fire_sample are parallel arrays of (index into
+    thresholds, index into the price series) for every firing, ordered by
+    threshold and then time.
+    """
+
+    def __init__(self, thresholds, direction, fire_threshold, fire_sample):
+        self.thresholds = thresholds
+        self.direction = direction
+        self.fire_threshold = fire_threshold
+        self.fire_sample = fire_sample
+        self.counts = np.bincount(fire_threshold, minlength=len(thresholds))
+
+    def fires(self, i):
+        """Sample indices at which threshold i fired"""
+        start, end = np.searchsorted(self.fire_threshold, [i, i + 1])
+        return self.fire_sample[start:end]
+
+    def first_fire(self):
+        """Sample index of each threshold's first firing, -1 where it never fired"""
+        first = np.full(len(self.thresholds), -1, dtype=np.int64)
+        starts = np.searchsorted(self.fire_threshold, np.arange(len(self.thresholds)))
+        fired = self.counts > 0
+        first[fired] = self.fire_sample[starts[fired]]
+        return first
+
+    def last_fire(self):
+        """Sample index of each threshold's last firing, -1 where it never fired"""
+        last = np.full(len(self.thresholds), -1, dtype=np.int64)
+        ends = np.searchsorted(self.fire_threshold, np.arange(len(self.thresholds)), side="right")
+        fired = self.counts > 0
+        last[fired] = self.fire_sample[ends[fired] - 1]
+        return last
+
+
+def detect_crossings(prices, thresholds, direction):
+    """Find every crossing of every threshold
+
+    Returns (threshold_index, sample_index) arrays ordered by threshold and then
+    time; sample_index is the first sample at or beyond the threshold.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}")
+    prices = np.asarray(prices, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    empty = np.empty(0, dtype=np.int64)
+    if len(prices) < 2 or len(thresholds) == 0:
+        return empty, empty
+
+    order = np.argsort(thresholds, kind="stable")
+    sorted_thresholds = thresholds[order]
+    previous, current = prices[:-1], prices[1:]
+
+    # Each step crosses a contiguous run [lo, hi) of the sorted thresholds
+    if direction == "upper":
+        # previous < threshold <= current
+        lo = np.searchsorted(sorted_thresholds, previous, side="right")
+        hi = np.searchsorted(sorted_thresholds, current, side="right")
+    else:
+        # current <= threshold < previous
+        lo = np.searchsorted(sorted_thresholds, current, side="left")
+        hi = np.searchsorted(sorted_thresholds, previous, side="left")
+
+    counts = hi - lo
+    steps = np.flatnonzero(counts > 0)
+    if len(steps) == 0:
+        return empty, empty
+    counts = counts[steps]
+
+    # Expand every run into one entry per crossed threshold
+    run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    offsets = np.arange(run_starts.size) - run_starts
+    threshold_index = order[np.repeat(lo[steps], counts) + offsets]
+    sample_index = np.repeat(steps + 1, counts)
+
+    # Entries are generated in time order, so a stable sort on threshold keeps time order within each
+    by_threshold = np.argsort(threshold_index, kind="stable")
+    return threshold_index[by_threshold], sample_index[by_threshold]
+
+
+def apply_cooldown(threshold_index, sample_index, times, cooldown):
+    """Drop crossings that happen within `cooldown` of the previous firing
+
+    threshold_index/sample_index must be ordered by threshold and then time (as
+    returned by detect_crossings); times are sample times in seconds.
+    """
+    n = len(threshold_index)
+    if n == 0 or cooldown <= 0:
+        return threshold_index, sample_index
+
+    event_times = np.asarray(times, dtype=np.float64)[sample_index]
+    event_times = event_times - event_times.min()
+    # Lay the groups out end to end on one axis so a single searchsorted can
+    # find, for every crossing, the first crossing of the same threshold that
+    # is out of its cooldown
+    span = event_times.max() + cooldown + 1
+    keys = threshold_index * span + event_times
+    next_event = np.searchsorted(keys, keys + cooldown, side="left")
+    next_event = np.maximum(next_event, np.arange(n) + 1)
+    # n marks "no further firing"; it maps to itself so chains stop there
+    same_threshold = next_event < n
+    same_threshold[same_threshold] = threshold_index[next_event[same_threshold]] == threshold_index[same_threshold]
+    next_event = np.append(np.where(same_threshold, next_event, n), n)
+
+    # Every threshold's first crossing fires; follow the chains for all
+    # thresholds at once, dropping each chain as it ends
+    fired = np.zeros(n + 1, dtype=bool)
+    current = np.flatnonzero(np.r_[True, threshold_index[1:] != threshold_index[:-1]])
+    while current.size:
+        fired[current] = True
+        current = next_event[current]
+        current = current[current < n]
+
+    fired = fired[:n]
+    return threshold_index[fired], sample_index[fired]
+
+
+def backtest(times, prices, thresholds, direction, cooldown=0):
+    """Backtest candidate thresholds in one direction against a price series
+
+    times: sample times in seconds (any epoch), ascending
+    prices: prices at those times; non-finite samples are ignored
+    thresholds: candidate threshold prices
+    direction: "upper" or "lower"
+    cooldown: seconds an alert stays quiet after firing
+    """
+    times = np.asarray(times, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    valid = np.flatnonzero(np.isfinite(prices) & np.isfinite(times))
+    threshold_index, sample_index = detect_crossings(prices[valid], thresholds, direction)
+    threshold_index, sample_index = apply_cooldown(threshold_index, sample_index, times[valid], cooldown)
+    return BacktestResult(thresholds, direction, threshold_index, valid[sample_index])
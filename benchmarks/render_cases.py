@@ -0,0 +1,157 @@
+"""Synthetic render cases for the dashboard render benchmarks (test_render.py).
+
+Each case renders one of create_price_card, create_minimal_view,
+create_price_table or display_price_alerts_section for a synthetic set of
+coins inside a Streamlit AppTest script. The script records the render
+call's own wall time (and, when traced, its tracemalloc peak) in session
+state, so harness overhead stays out of the budget checks.
+"""
+import base64
+import json
+import os
+import random
+import struct
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BUDGETS_PATH = os.path.join(BENCH_DIR, "budgets.json")
+
+FUNCTIONS = [
+    "create_price_card",
+    "create_minimal_view",
+    "create_price_table",
+    "display_price_alerts_section",
+]
+SIZES = [10, 100, 1000]
+
+SCRIPT_TEMPLATE = """
+import sys
+import time
+import tracemalloc
+
+sys.path[:0] = [{root!r}, {bench_dir!r}]
+
+import streamlit as st
+import app
+import render_cases
+
+render = render_cases.build_case(app, {function!r}, {size})
+if {trace}:
+    tracemalloc.start()
+start = time.perf_counter()
+render()
+st.session_state["bench_wall_ms"] = (time.perf_counter() - start) * 1000
+if {trace}:
+    st.session_state["bench_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+"""
+
+
+def synthetic_sparkline(rng, price, points=168):
+    """Base64 packed float32 7-day random walk ending near price, as /stats sends it in JSON"""
+    values = [price]
+    for _ in range(points - 1):
+        values.append(values[-1] * (1 + rng.gauss(0, 0.01)))
+    return base64.b64encode(struct.pack(f"<{points}f", *reversed(values))).decode("ascii")
+
+
+def synthetic_coins(size, seed=0):
+    """Generate deterministic coin ids and stats payloads shaped like /stats responses"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    coins = [f"synthetic-{i:04d}" for i in range(size)]
+    stats = {}
+    for rank, coin in enumerate(coins, start=1):
+        price = 10 ** rng.uniform(-3, 5)
+        stats[coin] = {
+            "price": price,
+            "marketCap": price * 10 ** rng.uniform(6, 9),
+            "24hChange": rng.uniform(-15, 15),
+            "24hVolume": 10 ** rng.uniform(5, 10),
+            "marketCapRank": rank,
+            "sparkline": {"prices": synthetic_sparkline(rng, price)},
+            "sourceUpdatedAt": (now - timedelta(seconds=rng.uniform(0, 7200))).isoformat(),
+        }
+    return coins, stats
+
+
+def install_coins(app, coins):
+    """Register synthetic coins in the dashboard's display lookups"""
+    for i, coin in enumerate(coins):
+        app.COIN_NAMES.setdefault(coin, f"Synthetic {i}")
+        app.COIN_ICONS.setdefault(coin, "◆")
+        app.COIN_COLORS.setdefault(coin, f"#{(i * 2654435761) & 0xFFFFFF:06x}")
+
+
+def build_case(app, function, size):
+    """Prepare app state for one benchmark case and return the render callable"""
+    import streamlit as st
+
+    coins, payloads = synthetic_coins(size)
+    install_coins(app, coins)
+    snapshot = app.MarketSnapshot(app.parse_stats(coin, payloads[coin]) for coin in coins)
+
+    if function == "create_price_card":
+        return lambda: [app.create_price_card(coin, snapshot[coin]) for coin in coins]
+    if function == "create_minimal_view":
+        return lambda: app.create_minimal_view(snapshot)
+    if function == "create_price_table":
+        return lambda: app.create_price_table(snapshot)
+    if function == "display_price_alerts_section":
+        rng = random.Random(1)
+        app.SUPPORTED_COINS = coins
+        # The alert form looks up the live price; serve it from the synthetic set instead of the API
+        app.get_coin_stats = lambda coin: snapshot[coin]
+        st.session_state.alert_thresholds = {
+            coin: {"upper": snapshot[coin].price * 1.05, "lower": snapshot[coin].price * 0.95}
+            for coin in coins
+        }
+        st.session_state.backtest_history = {}
+        st.session_state.notifications = [
+            {
+                "coin": coin,
+                "price": snapshot[coin].price,
+                "threshold": snapshot[coin].price,
+                "type": rng.choice(["upper", "lower"]),
+            }
+            for coin in coins
+        ]
+        return app.display_price_alerts_section
+    raise ValueError(f"Unknown render function: {function}")
+
+
+def app_test(function, size, trace=False):
+    """AppTest whose every run renders one case"""
+    from streamlit.testing.v1 import AppTest
+
+    script = SCRIPT_TEMPLATE.format(
+        root=ROOT_DIR, bench_dir=BENCH_DIR, function=function, size=size, trace=trace
+    )
+    return AppTest.from_string(script, default_timeout=300)
+
+
+def run_case(at):
+    """Run a case's script and fail on any exception it raised"""
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Render case raised: {at.exception[0].message}")
+    return at
+
+
+def markdown_bytes(at):
+    """Bytes of markdown/HTML the last run generated"""
+    return sum(len(md.value.encode("utf-8")) for md in at.markdown)
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def budget_limit(budgets, function, metric, size):
+    """Limit for one metric of one case: base + per_item * size, or None without a budget"""
+    budget = budgets.get(function, {}).get(metric)
+    if budget is None:
+        return None
+    return budget["base"] + budget["per_item"] * size
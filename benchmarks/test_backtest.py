@@ -0,0 +1,48 @@
+"""Throughput benchmarks for the alert backtester.
+
+Backtests upper and lower candidate thresholds spread across the price range
+of a synthetic one-minute random walk (10k to 300k points, 100 to 5,000
+thresholds per direction). The best round of each case must stay within
+BUDGET_MS.
+
+    python -m pytest benchmarks/test_backtest.py
+"""
+import numpy as np
+import pytest
+
+from backtest import backtest
+
+POINTS = [10_000, 100_000, 300_000]
+THRESHOLDS = [100, 1000, 5000]
+# Cooldown between firings, in seconds
+COOLDOWN = 3600
+# Maximum wall time per case (both directions)
+BUDGET_MS = 500
+
+
+def synthetic_history(points, seed=0):
+    """One-minute random-walk price series as (times in seconds, prices)"""
+    rng = np.random.default_rng(seed)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, points)))
+    return np.arange(points) * 60.0, prices
+
+
+@pytest.mark.parametrize("count", THRESHOLDS)
+@pytest.mark.parametrize("points", POINTS)
+def test_backtest(benchmark, points, count):
+    times, prices = synthetic_history(points)
+    thresholds = np.linspace(prices.min(), prices.max(), count)
+
+    def both_directions():
+        return (
+            backtest(times, prices, thresholds, "upper", COOLDOWN),
+            backtest(times, prices, thresholds, "lower", COOLDOWN),
+        )
+
+    upper, lower = benchmark(both_directions)
+    benchmark.extra_info["firings"] = int(upper.counts.sum() + lower.counts.sum())
+
+    # With --benchmark-disable the case runs once untimed, as a plain test
+    if not benchmark.disabled:
+        wall_ms = benchmark.stats.stats.min * 1000
+        assert wall_ms <= BUDGET_MS, f"{points} points x {count} thresholds {wall_ms:,.1f} ms > {BUDGET_MS:,} ms"
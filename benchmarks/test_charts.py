@@ -0,0 +1,95 @@
+"""Benchmarks for the downsampled chart pipeline.
+
+Builds a multi-coin line chart from synthetic hourly series (30 days to
+3 years of points) three ways and times building plus serializing the
+figure JSON Streamlit would send:
+
+- full: every point as go.Scatter (what the dashboard would do without LTTB)
+- lttb: charts.line_trace (LTTB to MAX_POINTS, Scattergl when dense)
+- cached: a FigureCache hit, i.e. only the serialization Streamlit does on a rerun
+
+The LTTB build must stay within LTTB_BUDGET_MS and send less JSON than the
+full figure.
+
+    python -m pytest benchmarks/test_charts.py
+"""
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from charts import FigureCache, line_trace
+
+# Hourly points per coin: 30 days, 90 days, 1 year, 3 years
+POINTS = [720, 2160, 8760, 26280]
+COINS = 3
+# LTTB points per line
+MAX_POINTS = 1500
+# Maximum LTTB build + serialize time
+LTTB_BUDGET_MS = 250
+
+
+def synthetic_series(coins, points, seed=0):
+    """Hourly random-walk volume series per coin as (times, values)"""
+    rng = np.random.default_rng(seed)
+    times = np.datetime64("2020-01-01T00:00") + np.arange(points).astype("timedelta64[h]")
+    return {
+        f"coin-{i}": (times, 1e9 * np.exp(np.cumsum(rng.normal(0, 0.02, points))))
+        for i in range(coins)
+    }
+
+
+def build_full(series):
+    fig = go.Figure()
+    for name, (times, values) in series.items():
+        fig.add_trace(go.Scatter(x=times, y=values, mode="lines", name=name))
+    fig.update_layout(template="plotly_dark")
+    return fig
+
+
+def build_lttb(series, max_points):
+    fig = go.Figure()
+    for name, (times, values) in series.items():
+        fig.add_trace(line_trace(times, values, max_points=max_points, name=name))
+    fig.update_layout(template="plotly_dark")
+    return fig
+
+
+def serialize(fig):
+    """What st.plotly_chart does with a Figure"""
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def plotly_templates():
+    # Plotly loads its templates on first use; keep that out of the first case
+    serialize(build_full(synthetic_series(1, 10)))
+
+
+@pytest.mark.parametrize("points", POINTS)
+def test_full(benchmark, points):
+    series = synthetic_series(COINS, points)
+    full_json = benchmark(lambda: serialize(build_full(series)))
+    benchmark.extra_info["json_kb"] = len(full_json) / 1024
+
+
+@pytest.mark.parametrize("points", POINTS)
+def test_lttb(benchmark, points):
+    series = synthetic_series(COINS, points)
+    lttb_json = benchmark(lambda: serialize(build_lttb(series, MAX_POINTS)))
+    benchmark.extra_info["json_kb"] = len(lttb_json) / 1024
+
+    # With --benchmark-disable the case runs once untimed, as a plain test
+    if not benchmark.disabled:
+        lttb_ms = benchmark.stats.stats.min * 1000
+        assert lttb_ms <= LTTB_BUDGET_MS, f"LTTB build {lttb_ms:,.1f} ms > {LTTB_BUDGET_MS:,} ms"
+    if points > MAX_POINTS:
+        assert len(lttb_json) < len(serialize(build_full(series)))
+
+
+@pytest.mark.parametrize("points", POINTS)
+def test_cached(benchmark, points):
+    series = synthetic_series(COINS, points)
+    cache = FigureCache()
+    cache.get_or_build(points, lambda: build_lttb(series, MAX_POINTS))
+    benchmark(lambda: serialize(cache.get_or_build(points, lambda: None)))
@@ -0,0 +1,63 @@
+"""Render-path benchmarks for the dashboard components.
+
+Renders create_price_card, create_minimal_view, create_price_table and
+display_price_alerts_section against synthetic datasets of 10/100/1,000
+coins under Streamlit's AppTest. The benchmark fixture times whole script
+runs, one render per run as on a real rerun; each case then asserts against
+benchmarks/budgets.json:
+
+- wall time of the render call itself (best round, measured inside the script)
+- bytes of markdown/HTML the call generated
+- peak Python memory during the call (tracemalloc, measured in a separate run)
+
+    python -m pytest benchmarks/test_render.py
+    python -m pytest benchmarks/test_render.py -k "create_price_card and 100"
+"""
+import pytest
+
+from render_cases import (
+    FUNCTIONS,
+    SIZES,
+    app_test,
+    budget_limit,
+    load_budgets,
+    markdown_bytes,
+    run_case,
+)
+
+ROUNDS = 3
+
+BUDGETS = load_budgets()
+
+
+def assert_within_budget(function, metric, size, value):
+    limit = budget_limit(BUDGETS, function, metric, size)
+    if limit is not None:
+        assert value <= limit, f"{function}[{size}] {metric} {value:,.1f} > {limit:,.1f}"
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("function", FUNCTIONS)
+def test_render(benchmark, function, size):
+    at = app_test(function, size)
+    wall_times = []
+
+    def rerun():
+        run_case(at)
+        wall_times.append(at.session_state["bench_wall_ms"])
+
+    benchmark.pedantic(rerun, rounds=ROUNDS, iterations=1, warmup_rounds=1)
+    size_bytes = markdown_bytes(at)
+
+    # tracemalloc slows allocation-heavy code down, so memory gets its own run
+    peak_kb = run_case(app_test(function, size, trace=True)).session_state["bench_peak_kb"]
+
+    benchmark.extra_info.update(markdown_bytes=size_bytes, peak_kb=peak_kb)
+    # With --benchmark-disable the script runs once untimed, so only the size budgets apply
+    if not benchmark.disabled:
+        # The warmup round pays for importing the app; only timed rounds count
+        wall_ms = min(wall_times[1:])
+        benchmark.extra_info["wall_ms"] = wall_ms
+        assert_within_budget(function, "wall_ms", size, wall_ms)
+    assert_within_budget(function, "markdown_bytes", size, size_bytes)
+    assert_within_budget(function, "peak_kb", size, peak_kb)
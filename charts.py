@@ -0,0 +1,119 @@
+"""Chart helpers for long price and volume series.
+
+Long series are reduced with Largest-Triangle-Three-Buckets (LTTB) before they
+are plotted. LTTB keeps the first and last points, splits the rest into equal
+buckets and keeps, from each bucket, the point that forms the largest
+triangle with the point kept from the previous bucket and the average of the
+next bucket. Peaks and dips survive, so a few thousand points look like the
+full series. Series that are still dense afterwards are drawn with WebGL
+(Scattergl).
+
+Built figures are kept in a process-wide LRU keyed by everything they were
+built from, so reruns and other sessions reuse them instead of downsampling
+and validating the same traces again.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Points kept per line after downsampling
+MAX_POINTS = 1500
+# Lines with at least this many points are drawn with WebGL
+WEBGL_MIN_POINTS = 1000
+# Figures kept before the least recently used is dropped
+MAX_FIGURES = 32
+
+
+def lttb(x, y, threshold):
+    """Indices of at most `threshold` points of (x, y) that preserve its shape
+
+    x: ascending numbers (e.g. epoch nanoseconds)
+    y: values; points where x or y is not finite are dropped first
+    Returns indices into the original arrays, ascending.
+    """
+    if threshold < 3:
+        raise ValueError("threshold must be at least 3")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    n = len(finite)
+    if n <= threshold:
+        return finite
+    xs, ys = x[finite], y[finite]
+
+    # threshold - 2 buckets over the interior points, with the reference
+    # implementation's edges floor(i * every) + 1; the range after the last
+    # edge runs to the end of the series
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype(np.int64) + 1
+    counts = np.diff(np.append(edges, n))
+    # Average of the bucket after each bucket
+    next_x = (np.add.reduceat(xs, edges) / counts)[1:]
+    next_y = (np.add.reduceat(ys, edges) / counts)[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs(
+            (xs[previous] - next_x[i]) * (ys[lo:hi] - ys[previous])
+            - (xs[previous] - xs[lo:hi]) * (next_y[i] - ys[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return finite[selected]
+
+
+def line_trace(x, y, max_points=MAX_POINTS, webgl_min_points=WEBGL_MIN_POINTS, **kwargs):
+    """Line trace of (x, y) downsampled with LTTB, as Scattergl when still dense
+
+    x may be numbers or datetimes; extra keyword arguments go to the trace.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if np.issubdtype(x.dtype, np.datetime64):
+        numeric_x = x.astype("datetime64[ns]").astype(np.int64)
+    else:
+        numeric_x = x.astype(np.float64)
+    keep = lttb(numeric_x, y, max_points)
+    trace_type = go.Scattergl if len(keep) >= webgl_min_points else go.Scatter
+    return trace_type(x=x[keep], y=y[keep], mode="lines", **kwargs)
+
+
+class FigureCache:
+    """Thread-safe LRU of built figures
+
+    Cached figures are shared and must not be modified after they are built.
+    """
+
+    def __init__(self, max_figures=MAX_FIGURES):
+        self.max_figures = max_figures
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Return the figure cached under key, building it with build() on a miss
+
+        A key of None means the inputs have no version to key on, so the figure
+        is always rebuilt and not stored.
+        """
+        if key is None:
+            return build()
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                return figure
+
+        # Built outside the lock; two sessions racing on one key just build it twice
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_figures:
+                self._figures.popitem(last=False)
+        return figure
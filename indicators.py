@@ -0,0 +1,156 @@
+"""Technical indicators over candle series with an incremental cache.
+
+Indicators are computed with vectorized pandas rolling/ewm kernels. Results
+are cached per (series, indicator, params) together with the ingestion
+version they were computed at. A request at the same version is answered from
+the cache. When new candles arrive and the rows already cached are unchanged,
+only the new rows (plus the still-open latest bucket) are computed: rolling indicators get the few preceding rows
+they need as context, and recursive ones (EMA, RSI) resume from their last
+cached state.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Rows kept per cached series; older rows are dropped from the front
+MAX_ROWS = 20_000
+# Cached (series, indicator, params) entries kept before the least recently used is evicted
+MAX_ENTRIES = 256
+
+
+def _sma(frame, offset, seed, window):
+    return pd.DataFrame({"sma": frame["close"].rolling(window).mean()}).iloc[offset:]
+
+
+def _bollinger(frame, offset, seed, window, width):
+    rolling = frame["close"].rolling(window)
+    middle = rolling.mean()
+    band = rolling.std(ddof=0) * width
+    return pd.DataFrame({"middle": middle, "upper": middle + band, "lower": middle - band}).iloc[offset:]
+
+
+def _vwap(frame, offset, seed, window):
+    weighted = (frame["close"] * frame["volume"]).rolling(window).sum()
+    volume = frame["volume"].rolling(window).sum()
+    return pd.DataFrame({"vwap": weighted / volume.where(volume > 0)}).iloc[offset:]
+
+
+def _ewm_from(values, alpha, seed=None):
+    """Exponential moving average of values, continuing from seed when given"""
+    if seed is None or not np.isfinite(seed):
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    # With adjust=False the first element is taken as the starting average
+    seeded = np.concatenate([[seed], values.to_numpy(dtype=float)])
+    averaged = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(averaged[1:], index=values.index)
+
+
+def _ema(frame, offset, seed, span):
+    close = frame["close"].iloc[offset:]
+    return pd.DataFrame({"ema": _ewm_from(close, 2 / (span + 1), None if seed is None else seed["ema"])})
+
+
+def _rsi(frame, offset, seed, period):
+    # Wilder's smoothing; the averages are kept as private state for the next extension
+    change = frame["close"].diff().iloc[offset:]
+    alpha = 1 / period
+    avg_gain = _ewm_from(change.clip(lower=0), alpha, None if seed is None else seed["_avg_gain"])
+    avg_loss = _ewm_from(-change.clip(upper=0), alpha, None if seed is None else seed["_avg_loss"])
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi = rsi.where(avg_loss > 0, 100.0).where(avg_gain.notna())
+    if seed is None:
+        # Not enough history for a meaningful average yet
+        rsi.iloc[:period] = np.nan
+    return pd.DataFrame({"rsi": rsi, "_avg_gain": avg_gain, "_avg_loss": avg_loss})
+
+
+# name: (kernel, rows of preceding input each new row depends on)
+INDICATORS = {
+    "sma": (_sma, lambda p: p["window"] - 1),
+    "ema": (_ema, lambda p: 0),
+    "rsi": (_rsi, lambda p: 1),
+    "bollinger": (_bollinger, lambda p: p["window"] - 1),
+    "vwap": (_vwap, lambda p: p["window"] - 1),
+}
+
+
+class IndicatorEngine:
+    """Thread-safe cache of indicator results that are extended as candles arrive"""
+
+    def __init__(self, max_rows=MAX_ROWS, max_entries=MAX_ENTRIES):
+        self.max_rows = max_rows
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compute(self, series_key, version, frame, indicator, **params):
+        """Return the indicator for every row of frame
+
+        series_key: identifies the candle series, e.g. "bitcoin:1h"
+        version: ingestion marker of the data (e.g. the response ETag); None disables the shortcut
+        frame: DataFrame indexed by ascending candle time with "close" and "volume" columns
+        """
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {indicator}")
+        key = (series_key, indicator, tuple(sorted(params.items())))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if not self._is_cached(entry, version, frame):
+                entry = self._extend(entry, frame, indicator, params)
+                entry["version"] = version
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            output = entry["output"]
+
+        if frame.empty:
+            return output.iloc[:0]
+        visible = output.loc[frame.index[0]:frame.index[-1]]
+        return visible[[column for column in visible.columns if not column.startswith("_")]]
+
+    def _is_cached(self, entry, version, frame):
+        if entry is None or version is None or entry["version"] != version or frame.empty:
+            return False
+        cached = entry["input"].index
+        return cached[0] <= frame.index[0] and frame.index[-1] <= cached[-1]
+
+    def _extend(self, entry, frame, indicator, params):
+        kernel, lookback = INDICATORS[indicator]
+        frame = frame[["close", "volume"]]
+
+        if entry is not None and not frame.empty:
+            cached_input, cached_output = entry["input"], entry["output"]
+            # The latest cached bucket may still have been filling up, so it is recomputed
+            resume = cached_input.index[-1]
+            head = cached_input.loc[cached_input.index < resume]
+            overlap = frame.index[frame.index < resume]
+            # Anything that rewrote or prepended history (a new range, a backfill) needs a full pass;
+            # rows under the same timestamps are compared by value, since a backfill can change them in place
+            if (len(head) > 0 and frame.index[0] >= cached_input.index[0] and overlap.isin(head.index).all()
+                    and self._same_rows(head.loc[overlap], frame.loc[overlap])):
+                tail = frame.loc[frame.index >= resume]
+                context = head.iloc[max(0, len(head) - lookback(params)):]
+                seed = cached_output.loc[cached_output.index < resume].iloc[-1]
+                computed = kernel(pd.concat([context, tail]), len(context), seed, **params)
+                return self._trimmed(
+                    pd.concat([head, tail]),
+                    pd.concat([cached_output.loc[cached_output.index < resume], computed])
+                )
+
+        return self._trimmed(frame, kernel(frame, 0, None, **params))
+
+    @staticmethod
+    def _same_rows(cached, fresh):
+        """Whether two input frames over the same index hold the same close and volume values"""
+        return all(
+            np.array_equal(cached[column].to_numpy(dtype=float), fresh[column].to_numpy(dtype=float), equal_nan=True)
+            for column in ("close", "volume")
+        )
+
+    def _trimmed(self, input_frame, output_frame):
+        return {"input": input_frame.iloc[-self.max_rows:], "output": output_frame.iloc[-self.max_rows:]}
@@ -0,0 +1,336 @@
+"""Compact, immutable models of /stats payloads shared by every session.
+
+A /stats payload is validated once, when it comes off the wire, by
+parse_stats() into a CoinStats record: a __slots__ object with typed fields,
+so render code reads `stats.price` instead of `stats.get("price", 0)`.
+
+A MarketSnapshot is the struct-of-arrays view over the records of several
+coins at one tick: each field is a read-only NumPy column, so tables,
+freshness and currency conversion work on whole columns. Converted snapshots
+are memoized on the snapshot itself.
+
+SnapshotStore keeps the latest record per coin for the whole process and
+returns the same MarketSnapshot object to every session that asks for the
+same coins at the same data versions. Sessions only hold references, so
+each extra viewer adds almost no memory.
+"""
+import base64
+import binascii
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+import numpy as np
+
+# Snapshots (distinct coin selections x data versions) kept before the least recently used is dropped
+MAX_SNAPSHOTS = 64
+_EMPTY_FX = MappingProxyType({})
+
+
+class InvalidPayload(ValueError):
+    """A /stats payload that is missing fields or has values of the wrong type"""
+
+
+def _number(payload, field, default=None):
+    value = payload.get(field)
+    if value is None:
+        if default is None:
+            raise InvalidPayload(f"{field} is required")
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise InvalidPayload(f"{field} must be a number, got {type(value).__name__}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise InvalidPayload(f"{field} must be finite")
+    return value
+
+
+def _epoch(value):
+    """Epoch seconds of an ISO-8601 timestamp, or None if it can't be parsed"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _sparkline(payload):
+    """Packed little-endian float32 prices of the sparkline field as a read-only array, or None"""
+    sparkline = payload.get("sparkline")
+    if sparkline is None:
+        return None
+    prices = sparkline.get("prices") if isinstance(sparkline, dict) else None
+    # MessagePack bodies carry the bytes as-is, JSON bodies as base64
+    if isinstance(prices, str):
+        try:
+            prices = base64.b64decode(prices, validate=True)
+        except binascii.Error:
+            raise InvalidPayload("sparkline.prices is not valid base64") from None
+    if not isinstance(prices, (bytes, bytearray)) or len(prices) % 4:
+        raise InvalidPayload("sparkline.prices must be packed float32 values")
+    return np.frombuffer(bytes(prices), dtype="<f4")
+
+
+def _optional_ms(trace, field):
+    value = trace.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return float(value)
+
+
+class CoinStats:
+    """Validated stats of one coin at one tick; immutable"""
+
+    __slots__ = (
+        "coin", "price", "market_cap", "change_24h", "volume_24h", "rank", "currency",
+        "timestamp", "updated_at", "fx", "sparkline", "queue_ms", "fetch_ms", "stale", "cached_at",
+    )
+
+    def __init__(self, coin, price, market_cap=0.0, change_24h=0.0, volume_24h=0.0, rank=None,
+                 currency="usd", timestamp=None, updated_at=None, fx=_EMPTY_FX, sparkline=None,
+                 queue_ms=None, fetch_ms=None, stale=False, cached_at=None):
+        values = locals()
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"CoinStats({self.coin!r}, price={self.price!r}, currency={self.currency!r})"
+
+    def age_seconds(self, now=None):
+        """Seconds since CoinGecko last updated the price, or None if unknown"""
+        if self.updated_at is None:
+            return None
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        return max(0.0, now - self.updated_at)
+
+    def replace(self, **changes):
+        """Copy of this record with some fields changed"""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return CoinStats(**values)
+
+
+def parse_stats(coin, payload, stale=False, cached_at=None):
+    """Validate a /stats payload and build its CoinStats record
+
+    Raises InvalidPayload when the payload is not usable.
+    """
+    if not isinstance(payload, dict):
+        raise InvalidPayload(f"stats payload for {coin} must be an object, got {type(payload).__name__}")
+    try:
+        price = _number(payload, "price")
+        market_cap = _number(payload, "marketCap", 0.0)
+        change_24h = _number(payload, "24hChange", 0.0)
+        volume_24h = _number(payload, "24hVolume", 0.0)
+        rank = payload.get("marketCapRank")
+        if rank is not None:
+            rank = int(_number(payload, "marketCapRank"))
+        sparkline = _sparkline(payload)
+    except InvalidPayload as e:
+        raise InvalidPayload(f"stats payload for {coin}: {e}") from None
+
+    currency = payload.get("currency") or "usd"
+    if not isinstance(currency, str):
+        raise InvalidPayload(f"stats payload for {coin}: currency must be a string")
+
+    fx = payload.get("fx") or {}
+    if not isinstance(fx, dict):
+        raise InvalidPayload(f"stats payload for {coin}: fx must be an object")
+    fx = {
+        str(code): float(rate) for code, rate in fx.items()
+        if isinstance(rate, (int, float)) and not isinstance(rate, bool) and math.isfinite(rate) and rate > 0
+    }
+
+    trace = payload.get("trace") if isinstance(payload.get("trace"), dict) else {}
+    timestamp = _epoch(payload.get("timestamp"))
+    updated_at = _epoch(payload.get("sourceUpdatedAt"))
+    return CoinStats(
+        coin=coin,
+        price=price,
+        market_cap=market_cap,
+        change_24h=change_24h,
+        volume_24h=volume_24h,
+        rank=rank,
+        currency=currency.lower(),
+        timestamp=timestamp,
+        updated_at=updated_at if updated_at is not None else timestamp,
+        fx=MappingProxyType(fx) if fx else _EMPTY_FX,
+        sparkline=sparkline,
+        queue_ms=_optional_ms(trace, "queueMs"),
+        fetch_ms=_optional_ms(trace, "fetchMs"),
+        stale=bool(stale),
+        cached_at=cached_at,
+    )
+
+
+def _column(values, dtype=np.float64):
+    column = np.array(values, dtype=dtype)
+    column.flags.writeable = False
+    return column
+
+
+class MarketSnapshot:
+    """Struct-of-arrays view over the stats of several coins; immutable
+
+    Columns (read-only NumPy arrays, one entry per coin in `coins` order):
+    price, market_cap, change_24h, volume_24h, rank (NaN when unknown),
+    updated_at (epoch seconds, NaN when unknown), stale and cached_at.
+    """
+
+    __slots__ = (
+        "coins", "records", "_index", "currency", "price", "market_cap", "change_24h",
+        "volume_24h", "rank", "updated_at", "stale", "cached_at", "_converted", "_lock",
+    )
+
+    def __init__(self, records):
+        records = tuple(records)
+        nan = float("nan")
+        values = {
+            "coins": tuple(record.coin for record in records),
+            "records": records,
+            "_index": MappingProxyType({record.coin: i for i, record in enumerate(records)}),
+            "currency": records[0].currency if records else "usd",
+            "price": _column([record.price for record in records]),
+            "market_cap": _column([record.market_cap for record in records]),
+            "change_24h": _column([record.change_24h for record in records]),
+            "volume_24h": _column([record.volume_24h for record in records]),
+            "rank": _column([nan if record.rank is None else record.rank for record in records]),
+            "updated_at": _column([nan if record.updated_at is None else record.updated_at for record in records]),
+            "stale": _column([record.stale for record in records], dtype=bool),
+            "cached_at": _column([nan if record.cached_at is None else record.cached_at for record in records]),
+            "_converted": {},
+            "_lock": threading.Lock(),
+        }
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __len__(self):
+        return len(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __contains__(self, coin):
+        return coin in self._index
+
+    def __getitem__(self, coin):
+        return self.records[self._index[coin]]
+
+    def get(self, coin, default=None):
+        index = self._index.get(coin)
+        return default if index is None else self.records[index]
+
+    def ages(self, now=None):
+        """Seconds since CoinGecko last updated each price (NaN when unknown)"""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        return np.maximum(0.0, now - self.updated_at)
+
+    def in_currency(self, currency):
+        """This snapshot with money fields converted from USD using each tick's FX vector
+
+        All coins are multiplied in one vectorized step. A coin whose tick has
+        no rate borrows the newest rate seen on another coin; if no tick has
+        one the snapshot is returned unconverted. Results are memoized, so
+        every session viewing the same currency shares one converted snapshot.
+        """
+        if currency == self.currency or not self.records:
+            return self
+        with self._lock:
+            converted = self._converted.get(currency)
+            if converted is None:
+                converted = self._convert(currency)
+                self._converted[currency] = converted
+        return converted
+
+    def _convert(self, currency):
+        rates = np.array([record.fx.get(currency, np.nan) for record in self.records], dtype=float)
+        known = ~np.isnan(rates)
+        if not known.any():
+            return self
+        ticks = [record.timestamp or 0.0 for record in self.records]
+        newest = max(np.flatnonzero(known), key=lambda i: ticks[i])
+        rates[~known] = rates[newest]
+
+        money = np.column_stack([self.price, self.market_cap, self.volume_24h]) * rates[:, None]
+        return MarketSnapshot(
+            record.replace(price=row[0], market_cap=row[1], volume_24h=row[2], currency=currency)
+            for record, row in zip(self.records, money.tolist())
+        )
+
+
+class SnapshotStore:
+    """Process-wide latest CoinStats per coin and the snapshots built from them
+
+    Thread-safe; meant to be created once per process and shared by every session.
+    """
+
+    def __init__(self, max_snapshots=MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._records = {}
+        self._versions = {}
+        self._generations = {}
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, coin, version=None):
+        """The stored record for coin, or None; with a version only if it matches"""
+        with self._lock:
+            record = self._records.get(coin)
+            if record is None or (version is not None and self._versions.get(coin) != version):
+                return None
+            return record
+
+    def put(self, record, version=None):
+        """Store the latest record of a coin; version is the data version it came with (e.g. its ETag)"""
+        with self._lock:
+            self._records[record.coin] = record
+            self._versions[record.coin] = version
+            self._generations[record.coin] = self._generations.get(record.coin, 0) + 1
+        return record
+
+    def snapshot(self, coins, stale=()):
+        """Snapshot of the stored records of coins (in that order, unknown coins skipped)
+
+        Coins in stale (e.g. those whose latest fetch failed) are marked stale,
+        with their tick time as cached_at, so callers can tell the stored record
+        may be out of date. Asking again for the same coins and stale coins
+        before any of them changed returns the same object.
+        """
+        coins = tuple(coins)
+        stale = frozenset(stale).intersection(coins)
+        with self._lock:
+            key = (coins, tuple(self._generations.get(coin, 0) for coin in coins), tuple(sorted(stale)))
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+                return snapshot
+            snapshot = MarketSnapshot(
+                self._stale(self._records[coin]) if coin in stale else self._records[coin]
+                for coin in coins if coin in self._records
+            )
+            self._snapshots[key] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+    @staticmethod
+    def _stale(record):
+        if record.stale:
+            return record
+        cached_at = record.timestamp if record.timestamp is not None else datetime.now(timezone.utc).timestamp()
+        return record.replace(stale=True, cached_at=cached_at)
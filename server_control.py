@@ -0,0 +1,314 @@
+"""Process management for the Node servers, shared by the dashboard and the CLI.
+
+Each server runs `npm start` in its own process group with output appended
+to a log file; its pid is recorded in a pid file. Any process (a Streamlit
+session, a cron job, a systemd unit) can therefore see, stop or tail a
+server started by another one.
+
+This module is also the headless command line behind `python app.py`:
+
+    python app.py serve [api|worker] [--no-install] [--foreground]
+    python app.py stop [api|worker]
+    python app.py status [--json]
+    python app.py logs api|worker [-n LINES] [-f]
+    python app.py trigger
+
+Only the standard library is imported at module level (requests is loaded
+for the commands that talk to the API), so the CLI starts quickly.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+API_URL = "http://localhost:3000"
+# Comma-separated list of API instances to balance reads across
+API_URLS = [url.strip() for url in os.environ.get("KOINX_API_URLS", API_URL).split(",") if url.strip()]
+WORKER_URL = os.environ.get("KOINX_WORKER_URL", "http://localhost:3001")
+CACHE_DIR = os.environ.get("KOINX_CACHE_DIR", os.path.join(ROOT_DIR, ".cache"))
+RUN_DIR = os.path.join(CACHE_DIR, "run")
+
+# server name: directory of its Node project
+SERVERS = {"api": "api-server", "worker": "worker-server"}
+COMMANDS = ("serve", "stop", "status", "logs", "trigger")
+# Seconds a server gets to shut down after SIGINT before it is killed
+STOP_TIMEOUT = 10
+HEALTH_TIMEOUT = 2
+
+# Processes started by this interpreter, so they can be reaped instead of lingering as zombies
+_children = {}
+
+
+def pid_path(name):
+    return os.path.join(RUN_DIR, f"{name}.pid")
+
+
+def log_path(name):
+    return os.path.join(RUN_DIR, f"{name}.log")
+
+
+def _is_alive(pid):
+    child = _children.get(pid)
+    if child is not None and child.poll() is None:
+        return True
+    if os.name == "nt":
+        # Signal 0 is CTRL_C_EVENT on Windows, so only our own children can be checked
+        return False
+    try:
+        # The pid is the group leader; the group lives as long as any member does
+        os.killpg(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _signal(pid, sig):
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def server_pid(name):
+    """Pid of the running server's process group, or None (stale pid files are removed)"""
+    try:
+        with open(pid_path(name)) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+    if _is_alive(pid):
+        return pid
+    try:
+        os.remove(pid_path(name))
+    except OSError:
+        pass
+    return None
+
+
+def start_server(name, install=True):
+    """Start a server in the background unless it is already running; returns its pid"""
+    pid = server_pid(name)
+    if pid is not None:
+        return pid
+
+    os.makedirs(RUN_DIR, exist_ok=True)
+    cmd = "npm install && npm start" if install else "npm start"
+    with open(log_path(name), "ab") as log:
+        log.write(f"\n--- {time.strftime('%Y-%m-%d %H:%M:%S')} {cmd} ---\n".encode())
+        log.flush()
+        process = subprocess.Popen(
+            cmd,
+            cwd=os.path.join(ROOT_DIR, SERVERS[name]),
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            # Own process group: npm's children are stopped with it and survive the caller exiting
+            start_new_session=True
+        )
+    _children[process.pid] = process
+    with open(pid_path(name), "w") as f:
+        f.write(str(process.pid))
+    return process.pid
+
+
+def stop_server(name, timeout=STOP_TIMEOUT):
+    """Stop a server and wait for it to exit; returns False if it wasn't running"""
+    pid = server_pid(name)
+    if pid is None:
+        return False
+
+    # Both servers shut down gracefully on SIGINT (Ctrl+C)
+    _signal(pid, signal.SIGINT)
+    deadline = time.monotonic() + timeout
+    while _is_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if _is_alive(pid):
+        _signal(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    _children.pop(pid, None)
+    try:
+        os.remove(pid_path(name))
+    except OSError:
+        pass
+    return True
+
+
+def tail_log(name, lines=50):
+    """Last lines of a server's log file"""
+    try:
+        with open(log_path(name), "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            # Read backwards in blocks until enough newlines have been seen
+            block = 8192
+            data = b""
+            while size > 0 and data.count(b"\n") <= lines:
+                step = min(block, size)
+                size -= step
+                f.seek(size)
+                data = f.read(step) + data
+    except OSError:
+        return []
+    return data.decode("utf-8", errors="replace").splitlines()[-lines:]
+
+
+def check_worker_health(timeout=HEALTH_TIMEOUT):
+    """Check if the worker server answers its /health endpoint"""
+    import requests
+
+    try:
+        return requests.get(f"{WORKER_URL}/health", timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def server_status():
+    """Process and health status of both servers"""
+    from api_client import ApiPool
+
+    pool = ApiPool(API_URLS)
+    pool.check_health(timeout=HEALTH_TIMEOUT)
+    api_healthy = {endpoint.url: endpoint.failures == 0 for endpoint in pool.endpoints}
+    worker_healthy = check_worker_health()
+    return {
+        "api": {"pid": server_pid("api"), "healthy": any(api_healthy.values()), "endpoints": api_healthy},
+        "worker": {"pid": server_pid("worker"), "healthy": worker_healthy, "endpoints": {WORKER_URL: worker_healthy}},
+    }
+
+
+def _selected(name):
+    return [name] if name else list(SERVERS)
+
+
+def _serve(args):
+    names = _selected(args.server)
+    for name in names:
+        running = server_pid(name)
+        pid = start_server(name, install=not args.no_install)
+        state = "already running" if running else "started"
+        print(f"{name}: {state} (pid {pid}, log {log_path(name)})")
+    if not args.foreground:
+        return 0
+
+    # Supervise until signalled or until a server exits, so a service manager can restart us
+    stopping = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: stopping.append(signum))
+    exit_code = 0
+    while not stopping:
+        exited = [name for name in names if server_pid(name) is None]
+        if exited:
+            print(f"{', '.join(exited)} exited", file=sys.stderr)
+            exit_code = 1
+            break
+        time.sleep(1)
+    for name in names:
+        stop_server(name)
+    return exit_code
+
+
+def _stop(args):
+    for name in _selected(args.server):
+        print(f"{name}: {'stopped' if stop_server(name) else 'not running'}")
+    return 0
+
+
+def _status(args):
+    status = server_status()
+    if args.json:
+        print(json.dumps(status, indent=2))
+    else:
+        for name, info in status.items():
+            process = f"pid {info['pid']}" if info["pid"] else "no managed process"
+            print(f"{name:<7} {'healthy' if info['healthy'] else 'down':<8} {process}")
+            for url, ok in info["endpoints"].items():
+                if len(info["endpoints"]) > 1:
+                    print(f"        {url} {'up' if ok else 'down'}")
+    # Non-zero exit when anything is down, for health checks
+    return 0 if all(info["healthy"] for info in status.values()) else 1
+
+
+def _logs(args):
+    path = log_path(args.server)
+    if not os.path.exists(path):
+        print(f"No log for {args.server} at {path}", file=sys.stderr)
+        return 1
+    for line in tail_log(args.server, args.lines):
+        print(line)
+    if not args.follow:
+        return 0
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        try:
+            while True:
+                chunk = f.read()
+                if chunk:
+                    sys.stdout.write(chunk.decode("utf-8", errors="replace"))
+                    sys.stdout.flush()
+                else:
+                    time.sleep(0.5)
+        except KeyboardInterrupt:
+            return 0
+
+
+def _trigger(args):
+    import requests
+    from api_client import ApiPool
+
+    try:
+        response = ApiPool(API_URLS).post("/trigger-update", timeout=args.timeout)
+    except requests.RequestException as e:
+        print(f"Error connecting to API: {e}", file=sys.stderr)
+        return 1
+    if response.status_code != 200:
+        print(f"Failed to update stats: {response.text}", file=sys.stderr)
+        return 1
+    print("Cryptocurrency stats updated successfully!")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python app.py", description="Manage the KoinX servers without the dashboard")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Start the servers in the background")
+    serve.add_argument("server", nargs="?", choices=SERVERS, help="Only this server (default: both)")
+    serve.add_argument("--no-install", action="store_true", help="Skip npm install")
+    serve.add_argument("--foreground", action="store_true",
+                       help="Stay attached and stop the servers on SIGTERM/SIGINT (for systemd)")
+    serve.set_defaults(handler=_serve)
+
+    stop = commands.add_parser("stop", help="Stop the servers")
+    stop.add_argument("server", nargs="?", choices=SERVERS, help="Only this server (default: both)")
+    stop.set_defaults(handler=_stop)
+
+    status = commands.add_parser("status", help="Show process and health status; exits 1 if anything is down")
+    status.add_argument("--json", action="store_true", help="Print machine-readable status")
+    status.set_defaults(handler=_status)
+
+    logs = commands.add_parser("logs", help="Print a server's log")
+    logs.add_argument("server", choices=SERVERS)
+    logs.add_argument("-n", "--lines", type=int, default=50, help="Lines to show (default 50)")
+    logs.add_argument("-f", "--follow", action="store_true", help="Keep printing new output")
+    logs.set_defaults(handler=_logs)
+
+    trigger = commands.add_parser("trigger", help="Fetch and store fresh stats now")
+    trigger.add_argument("--timeout", type=float, default=30, help="Seconds to wait for the API")
+    trigger.set_defaults(handler=_trigger)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
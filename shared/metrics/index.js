@@ -0,0 +1,237 @@
+/**
+ * Minimal Prometheus metrics registry rendered in the text exposition format,
+ * shared by the API server and the worker server
+ */
+const { createHistogram, performance } = require('perf_hooks');
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+/**
+ * Render a label set as {key="value",...}
+ * @param {Object} labels - Label names and values
+ * @returns {string} - Prometheus label string (empty when there are no labels)
+ */
+function formatLabels(labels) {
+  const entries = Object.entries(labels);
+  if (entries.length === 0) {
+    return '';
+  }
+  const body = entries
+    .map(([key, value]) => `${key}="${String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n')}"`)
+    .join(',');
+  return `{${body}}`;
+}
+
+class Counter {
+  constructor(name, help) {
+    this.name = name;
+    this.help = help;
+    this.type = 'counter';
+    this.values = new Map();
+  }
+
+  inc(labels = {}, amount = 1) {
+    const key = formatLabels(labels);
+    this.values.set(key, (this.values.get(key) || 0) + amount);
+  }
+
+  render() {
+    return [...this.values].map(([labels, value]) => `${this.name}${labels} ${value}`);
+  }
+}
+
+class Gauge {
+  /**
+   * @param {string} name - Metric name
+   * @param {string} help - Help text
+   * @param {Function} [collect] - Optional (async) callback returning [{ labels, value }] at scrape time
+   */
+  constructor(name, help, collect) {
+    this.name = name;
+    this.help = help;
+    this.type = 'gauge';
+    this.values = new Map();
+    this.collect = collect;
+  }
+
+  set(labels, value) {
+    this.values.set(formatLabels(labels), value);
+  }
+
+  async refresh() {
+    if (!this.collect) {
+      return;
+    }
+    const samples = await this.collect();
+    this.values.clear();
+    samples.forEach(({ labels = {}, value }) => this.set(labels, value));
+  }
+
+  render() {
+    return [...this.values].map(([labels, value]) => `${this.name}${labels} ${value}`);
+  }
+}
+
+class Histogram {
+  constructor(name, help, buckets = DEFAULT_BUCKETS) {
+    this.name = name;
+    this.help = help;
+    this.type = 'histogram';
+    this.buckets = buckets;
+    this.series = new Map();
+  }
+
+  observe(labels, value) {
+    const key = JSON.stringify(labels);
+    let series = this.series.get(key);
+    if (!series) {
+      series = { labels, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 };
+      this.series.set(key, series);
+    }
+    this.buckets.forEach((bound, i) => {
+      if (value <= bound) series.counts[i] += 1;
+    });
+    series.sum += value;
+    series.count += 1;
+  }
+
+  /**
+   * Time an async operation and record its duration in seconds
+   * @param {Object} labels - Label set
+   * @param {Function} fn - Async function to time
+   * @returns {Promise<*>} - Result of fn
+   */
+  async time(labels, fn) {
+    const start = process.hrtime.bigint();
+    try {
+      return await fn();
+    } finally {
+      this.observe(labels, Number(process.hrtime.bigint() - start) / 1e9);
+    }
+  }
+
+  render() {
+    const lines = [];
+    this.series.forEach(({ labels, counts, sum, count }) => {
+      this.buckets.forEach((bound, i) => {
+        lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: bound })} ${counts[i]}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`);
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${sum}`);
+      lines.push(`${this.name}_count${formatLabels(labels)} ${count}`);
+    });
+    return lines;
+  }
+}
+
+class Registry {
+  constructor() {
+    this.metrics = [];
+  }
+
+  register(metric) {
+    this.metrics.push(metric);
+    return metric;
+  }
+
+  counter(name, help) {
+    return this.register(new Counter(name, help));
+  }
+
+  gauge(name, help, collect) {
+    return this.register(new Gauge(name, help, collect));
+  }
+
+  histogram(name, help, buckets) {
+    return this.register(new Histogram(name, help, buckets));
+  }
+
+  /**
+   * Render every metric in the Prometheus text format
+   * @returns {Promise<string>}
+   */
+  async render() {
+    await Promise.all(this.metrics.map(metric => (metric.refresh ? metric.refresh().catch(() => {}) : null)));
+    const lines = [];
+    this.metrics.forEach(metric => {
+      lines.push(`# HELP ${metric.name} ${metric.help}`);
+      lines.push(`# TYPE ${metric.name} ${metric.type}`);
+      lines.push(...metric.render());
+    });
+    return lines.join('\n') + '\n';
+  }
+}
+
+// Event loop lag is sampled every LAG_RESOLUTION_MS and reported over a rolling
+// window of LAG_SLICES slices, so scrapes (from Prometheus or the dashboard) read
+// it without resetting what the next scraper sees
+const LAG_RESOLUTION_MS = 20;
+const LAG_SLICE_MS = 10 * 1000;
+const LAG_SLICES = 6;
+
+/**
+ * Track event loop delay over the last LAG_SLICES * LAG_SLICE_MS milliseconds
+ * @returns {Function} - Returns a histogram (nanoseconds) merged over the window
+ */
+function trackEventLoopLag() {
+  const slices = [createHistogram()];
+  let expected = performance.now() + LAG_RESOLUTION_MS;
+
+  const sampler = setInterval(() => {
+    const now = performance.now();
+    // Histograms only take positive integers
+    slices[slices.length - 1].record(Math.max(1, Math.round((now - expected) * 1e6)));
+    expected = now + LAG_RESOLUTION_MS;
+  }, LAG_RESOLUTION_MS);
+  const rotator = setInterval(() => {
+    slices.push(createHistogram());
+    if (slices.length > LAG_SLICES) {
+      slices.shift();
+    }
+  }, LAG_SLICE_MS);
+  // Never keep the process alive just to measure it
+  sampler.unref();
+  rotator.unref();
+
+  return () => {
+    const window = createHistogram();
+    slices.forEach(slice => window.add(slice));
+    return window;
+  };
+}
+
+/**
+ * Register the process-level metrics every server exposes
+ * @param {Registry} registry - Registry to add them to
+ * @returns {Registry}
+ */
+function registerProcessMetrics(registry) {
+  const eventLoopLag = trackEventLoopLag();
+
+  registry.gauge('process_uptime_seconds', 'Seconds since the process started', () => [
+    { value: process.uptime() }
+  ]);
+  registry.gauge('process_resident_memory_bytes', 'Resident memory size in bytes', () => [
+    { value: process.memoryUsage().rss }
+  ]);
+  registry.gauge('nodejs_eventloop_lag_seconds', 'Event loop delay over the last minute', () => {
+    const window = eventLoopLag();
+    if (window.count === 0) {
+      return [];
+    }
+    return [
+      { labels: { quantile: '0.5' }, value: window.percentile(50) / 1e9 },
+      { labels: { quantile: '0.99' }, value: window.percentile(99) / 1e9 },
+      { labels: { quantile: 'max' }, value: window.max / 1e9 }
+    ];
+  });
+  return registry;
+}
+
+module.exports = {
+  Registry,
+  Counter,
+  Gauge,
+  Histogram,
+  registerProcessMetrics
+};
@@ -0,0 +1,115 @@
+"""Local persistent cache for API payloads.
+
+Every payload the dashboard fetches is written to a small SQLite store so a new
+session can render immediately and an API outage can fall back to the last
+known values. Only the standard library is used so this module stays cheap to
+import.
+"""
+import base64
+import contextlib
+import json
+import os
+import sqlite3
+import time
+
+# Bump whenever the table layout or payload encoding changes; older stores are
+# discarded rather than migrated since everything in them can be refetched.
+SCHEMA_VERSION = 1
+
+
+class SnapshotCache:
+    """Size-bounded key/value store of JSON payloads backed by SQLite"""
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps this safe to share between
+        # Streamlit script threads. The connection's own context manager only
+        # commits or rolls back, so it is closed explicitly once that is done.
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS snapshots")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_accessed ON snapshots (accessed_at)")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def put(self, key, payload):
+        """Store a payload under key, evicting least recently used entries if needed"""
+        encoded = json.dumps(payload, separators=(",", ":"), default=_json_default)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, payload, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now)
+            )
+            self._evict(conn)
+
+    def get(self, key):
+        """Return (payload, fetched_at) for key, or None if it is not cached"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM snapshots WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE snapshots SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0]), row[1]
+
+    def items(self, prefix=""):
+        """Return {key: (payload, fetched_at)} for every key starting with prefix"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, payload, fetched_at FROM snapshots WHERE key LIKE ? ESCAPE '\\'",
+                (_escape_like(prefix) + "%",)
+            ).fetchall()
+        return {key: (json.loads(payload), fetched_at) for key, payload, fetched_at in rows}
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM snapshots").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM snapshots ORDER BY accessed_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM snapshots WHERE key = ?", doomed)
+
+
+def _json_default(value):
+    # Binary fields of MessagePack bodies are kept as base64, the way JSON bodies carry them
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -2,15 +2,26 @@ const http = require('http');
 const natsService = require('./services/natsService');
 const scheduler = require('./utils/scheduler');
 const config = require('./config');
+const { registry } = require('./utils/metrics');
 
-// Create a simple HTTP server for health checks
-const server = http.createServer((req, res) => {
+// Create a simple HTTP server for health checks and metrics
+const server = http.createServer(async (req, res) => {
   if (req.url === '/health') {
     res.writeHead(200, { 'Content-Type': 'application/json' });
     res.end(JSON.stringify({ 
       status: 'OK', 
       timestamp: new Date().toISOString() 
     }));
+  } else if (req.url === '/metrics') {
+    try {
+      const body = await registry.render();
+      res.writeHead(200, { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' });
+      res.end(body);
+    } catch (error) {
+      console.error('Error rendering metrics:', error);
+      res.writeHead(500);
+      res.end();
+    }
   } else {
     res.writeHead(404);
     res.end();
@@ -27,10 +38,7 @@ async function initialize() {
     scheduler.initialize();
     
     // Send initial update event
-    await natsService.publish('crypto.update', { 
-      trigger: 'update',
-      timestamp: new Date().toISOString() 
-    });
+    await scheduler.publishUpdate();
     
     console.log('Worker server initialized successfully');
   } catch (error) {
@@ -1,7 +1,30 @@
 require('dotenv').config();
 
+const MINUTE = 60 * 1000;
+
+const coins = (process.env.COINS || 'bitcoin,ethereum,matic-network').split(',').map(coin => coin.trim()).filter(Boolean);
+const shardSize = Number(process.env.SHARD_SIZE) || 50;
+const baseIntervalMs = (Number(process.env.BASE_INTERVAL_MINUTES) || 15) * MINUTE;
+
 module.exports = {
   port: process.env.PORT || 3001,
   natsUrl: process.env.NATS_URL || 'nats://localhost:4222',
-  cronSchedule: process.env.CRON_SCHEDULE || '*/15 * * * *'  // Default: every 15 minutes
-};
\ No newline at end of file
+  apiUrl: process.env.API_URL || 'http://localhost:3000',
+  // 'adaptive' (volatility-driven timer wheel) or 'cron' (fixed CRON_SCHEDULE)
+  schedulerMode: process.env.SCHEDULER_MODE || 'adaptive',
+  cronSchedule: process.env.CRON_SCHEDULE || '*/15 * * * *',  // Default: every 15 minutes
+  // Coin universe split into shards; one work-queue message is published per shard
+  coins,
+  shardSize,
+  ingestStream: process.env.INGEST_STREAM || 'CRYPTO_UPDATES',
+  ingestSubject: 'crypto.update',
+  // Adaptive scheduling: per-coin intervals are picked from this ladder. Every step
+  // divides an hour, so the timer wheel runs at the smallest step.
+  intervalLadderMs: [1, 2, 3, 5, 10, 15, 30, 60].map(minutes => minutes * MINUTE),
+  baseIntervalMs,
+  volatilityRefreshMs: 15 * MINUTE,
+  // CoinGecko calls allowed per hour. Defaults to BUDGET_HEADROOM times what the fixed
+  // base-interval schedule costs, so volatile coins can actually be refreshed faster
+  requestBudgetPerHour: Number(process.env.COINGECKO_BUDGET_PER_HOUR) ||
+    (Number(process.env.BUDGET_HEADROOM) || 3) * (60 * MINUTE / baseIntervalMs) * Math.ceil(coins.length / shardSize)
+};
@@ -0,0 +1,66 @@
+const http = require('http');
+const https = require('https');
+const config = require('../config');
+
+/**
+ * Service to read statistics back from the API server
+ */
+class ApiService {
+  constructor() {
+    this.apiUrl = config.apiUrl;
+  }
+
+  /**
+   * GET a JSON document from the API server
+   * @param {string} path - Request path
+   * @param {Object} [params] - Query parameters
+   * @returns {Promise<Object>} - Parsed response body
+   */
+  getJson(path, params = {}) {
+    const url = new URL(path, this.apiUrl);
+    Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value));
+    const client = url.protocol === 'https:' ? https : http;
+
+    return new Promise((resolve, reject) => {
+      const req = client.get(url, { timeout: 5000 }, res => {
+        let body = '';
+        res.setEncoding('utf8');
+        res.on('data', chunk => {
+          body += chunk;
+        });
+        res.on('end', () => {
+          if (res.statusCode !== 200) {
+            reject(new Error(`GET ${url.pathname} failed with ${res.statusCode}: ${body}`));
+            return;
+          }
+          try {
+            resolve(JSON.parse(body));
+          } catch (error) {
+            reject(error);
+          }
+        });
+      });
+      req.on('timeout', () => req.destroy(new Error(`GET ${url.pathname} timed out`)));
+      req.on('error', reject);
+    });
+  }
+
+  /**
+   * Get the relative volatility of a coin (price standard deviation / latest price)
+   * @param {string} coin - Cryptocurrency identifier
+   * @returns {Promise<number>} - Coefficient of variation of recent prices
+   */
+  async getVolatility(coin) {
+    const [stats, { deviation }] = await Promise.all([
+      this.getJson('/stats', { coin }),
+      this.getJson('/deviation', { coin })
+    ]);
+
+    if (!stats.price) {
+      throw new Error(`No price available for ${coin}`);
+    }
+    return deviation / stats.price;
+  }
+}
+
+module.exports = new ApiService();
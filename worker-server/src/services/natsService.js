@@ -1,9 +1,11 @@
-const { connect, JSONCodec } = require('nats');
+const { connect, JSONCodec, RetentionPolicy, StorageType } = require('nats');
 const config = require('../config');
+const { natsPublished, natsPublishErrors } = require('../utils/metrics');
 
 class NatsService {
   constructor() {
     this.connection = null;
+    this.jetstream = null;
     this.jsonCodec = JSONCodec();
   }
 
@@ -14,6 +16,8 @@ class NatsService {
     try {
       this.connection = await connect({ servers: config.natsUrl });
       console.log(`Connected to NATS at ${config.natsUrl}`);
+      await this.ensureStream();
+      this.jetstream = this.connection.jetstream();
       return this.connection;
     } catch (error) {
       console.error('Failed to connect to NATS:', error);
@@ -21,6 +25,25 @@ class NatsService {
     }
   }
 
+  /**
+   * Make sure the ingestion work-queue stream exists so ticks survive API downtime
+   */
+  async ensureStream() {
+    const jsm = await this.connection.jetstreamManager();
+    
+    try {
+      await jsm.streams.info(config.ingestStream);
+    } catch (error) {
+      await jsm.streams.add({
+        name: config.ingestStream,
+        subjects: [`${config.ingestSubject}.>`],
+        retention: RetentionPolicy.Workqueue,
+        storage: StorageType.File
+      });
+      console.log(`Created JetStream stream ${config.ingestStream}`);
+    }
+  }
+
   /**
    * Publish a message to a NATS subject
    * @param {string} subject - NATS subject/topic
@@ -33,8 +56,33 @@ class NatsService {
       }
       
       this.connection.publish(subject, this.jsonCodec.encode(data));
+      natsPublished.inc({ subject });
       console.log(`Published message to ${subject}:`, data);
     } catch (error) {
+      natsPublishErrors.inc({ subject });
+      console.error(`Error publishing message to ${subject}:`, error);
+      throw error;
+    }
+  }
+
+  /**
+   * Persist a message on a JetStream subject and wait for the server ack
+   * @param {string} subject - JetStream subject
+   * @param {Object} data - Message data
+   * @param {string} msgID - JetStream message id (publishes reusing an id within the duplicate window are dropped)
+   */
+  async publishDurable(subject, data, msgID) {
+    try {
+      if (!this.connection) {
+        await this.connect();
+      }
+      
+      const ack = await this.jetstream.publish(subject, this.jsonCodec.encode(data), { msgID });
+      natsPublished.inc({ subject: config.ingestSubject });
+      console.log(`Published message to ${subject} (seq ${ack.seq}${ack.duplicate ? ', duplicate' : ''}):`, data);
+      return ack;
+    } catch (error) {
+      natsPublishErrors.inc({ subject: config.ingestSubject });
       console.error(`Error publishing message to ${subject}:`, error);
       throw error;
     }
@@ -51,4 +99,4 @@ class NatsService {
   }
 }
 
-module.exports = new NatsService();
\ No newline at end of file
+module.exports = new NatsService();
@@ -0,0 +1,253 @@
+const { performance } = require('perf_hooks');
+const apiService = require('../services/apiService');
+const config = require('../config');
+const { schedulerRuns, schedulerLateness } = require('./metrics');
+
+/**
+ * Timer wheel that refreshes volatile coins more often than quiet ones.
+ *
+ * Slots are laid out on the monotonic clock relative to a fixed origin, so
+ * timer jitter never accumulates. Each coin is assigned an interval from
+ * config.intervalLadderMs and fires on slots aligned to that interval; coins
+ * that come due on the same slot share CoinGecko calls.
+ */
+class AdaptiveScheduler {
+  /**
+   * @param {Function} publish - Async callback receiving the coins due on a slot
+   */
+  constructor(publish) {
+    this.publish = publish;
+    this.slotMs = config.intervalLadderMs[0];
+    this.ladder = config.intervalLadderMs.map(ms => Math.round(ms / this.slotMs));
+    this.intervals = new Map();
+    this.nextDue = new Map();
+    this.origin = 0;
+    this.timer = null;
+    this.lastRefreshSlot = null;
+
+    // The worker publishes an initial update on start-up, so the first run is one interval out
+    const baseInterval = this.ladder[this.nearestLevel(config.baseIntervalMs / this.slotMs)];
+    config.coins.forEach(coin => {
+      this.intervals.set(coin, baseInterval);
+      this.nextDue.set(coin, baseInterval);
+    });
+  }
+
+  /**
+   * Start firing slots from now
+   */
+  start() {
+    this.origin = performance.now();
+    this.scheduleSlot(0);
+  }
+
+  /**
+   * Stop the timer wheel
+   */
+  stop() {
+    clearTimeout(this.timer);
+    this.timer = null;
+  }
+
+  /**
+   * Current slot index on the monotonic clock
+   * @returns {number}
+   */
+  currentSlot() {
+    return Math.floor((performance.now() - this.origin) / this.slotMs);
+  }
+
+  /**
+   * Arm the timer for an absolute slot so delays never drift
+   * @param {number} slot - Slot index to fire
+   */
+  scheduleSlot(slot) {
+    const delay = Math.max(0, this.origin + slot * this.slotMs - performance.now());
+    this.timer = setTimeout(() => this.runSlot(slot), delay);
+  }
+
+  /**
+   * Publish every coin that is due on this slot, then arm the next slot
+   * @param {number} slot - Slot index being fired
+   */
+  async runSlot(slot) {
+    schedulerLateness.observe({}, Math.max(0, performance.now() - (this.origin + slot * this.slotMs)) / 1000);
+
+    const refreshSlots = Math.round(config.volatilityRefreshMs / this.slotMs);
+    if (this.lastRefreshSlot === null || slot - this.lastRefreshSlot >= refreshSlots) {
+      this.lastRefreshSlot = slot;
+      // Runs alongside the slot; the new plan applies from the next slot on
+      this.refreshPlan(slot).catch(error => console.error('Error refreshing update plan:', error));
+    }
+
+    const due = config.coins.filter(coin => this.nextDue.get(coin) <= slot);
+    due.forEach(coin => {
+      this.nextDue.set(coin, this.alignedNext(slot, this.intervals.get(coin)));
+    });
+
+    if (due.length > 0) {
+      try {
+        console.log(`Running adaptive update slot ${slot} for ${due.length} coins`);
+        schedulerRuns.inc({ mode: 'adaptive' });
+        await this.publish(due);
+      } catch (error) {
+        console.error('Error executing adaptive update slot:', error);
+      }
+    }
+
+    if (this.timer === null) {
+      return;
+    }
+    // Slots that elapsed while publishing are skipped rather than replayed back to back
+    this.scheduleSlot(Math.max(slot + 1, this.currentSlot() + 1));
+  }
+
+  /**
+   * First slot after the given one that is a multiple of the interval
+   * @param {number} slot - Reference slot
+   * @param {number} interval - Interval in slots
+   * @returns {number}
+   */
+  alignedNext(slot, interval) {
+    return (Math.floor(slot / interval) + 1) * interval;
+  }
+
+  /**
+   * Ladder level whose interval is closest (in log space) to the target
+   * @param {number} targetSlots - Desired interval in slots
+   * @returns {number} - Index into this.ladder
+   */
+  nearestLevel(targetSlots) {
+    let best = 0;
+    this.ladder.forEach((interval, level) => {
+      if (Math.abs(Math.log(interval / targetSlots)) < Math.abs(Math.log(this.ladder[best] / targetSlots))) {
+        best = level;
+      }
+    });
+    return best;
+  }
+
+  /**
+   * Refetch volatility from the API server and recompute per-coin intervals
+   * @param {number} slot - Slot the refresh was started on
+   */
+  async refreshPlan(slot) {
+    const results = await Promise.allSettled(config.coins.map(coin => apiService.getVolatility(coin)));
+    const volatility = new Map();
+    results.forEach((result, i) => {
+      if (result.status === 'fulfilled' && Number.isFinite(result.value)) {
+        volatility.set(config.coins[i], result.value);
+      }
+    });
+
+    if (volatility.size === 0) {
+      console.log('No volatility data available, keeping current update plan');
+      return;
+    }
+
+    const plan = this.planIntervals(volatility);
+    plan.forEach((interval, coin) => {
+      this.intervals.set(coin, interval);
+      // Pull a coin forward if its new interval is shorter than what is left of the old one
+      this.nextDue.set(coin, Math.min(this.nextDue.get(coin), this.alignedNext(slot, interval)));
+    });
+
+    const summary = [...plan].map(([coin, interval]) => `${coin}=${interval * this.slotMs / 60000}m`).join(', ');
+    console.log(`Adaptive update plan: ${summary} (~${this.hourlyCost(plan)} calls/hour)`);
+  }
+
+  /**
+   * Choose an interval per coin: shorter for volatile coins, longer for quiet
+   * ones, then fit the plan into config.requestBudgetPerHour.
+   *
+   * Budget model: the budget is a cap on CoinGecko calls per hour (by default
+   * a multiple of what the fixed base-interval schedule costs, see config).
+   * While the plan is over budget, calls are first reclaimed from quiet coins
+   * (those at or slower than the base interval), quietest first, by slowing
+   * them one ladder step at a time as long as that saves calls. Only when no
+   * quiet coin can give anything back are the fastest coins backed off.
+   * @param {Map<string, number>} volatility - Relative volatility per coin
+   * @returns {Map<string, number>} - Interval in slots per coin
+   */
+  planIntervals(volatility) {
+    const values = [...volatility.values()].sort((a, b) => a - b);
+    const median = values[Math.floor(values.length / 2)];
+    const baseSlots = config.baseIntervalMs / this.slotMs;
+    const baseLevel = this.nearestLevel(baseSlots);
+    const slowest = this.ladder.length - 1;
+
+    const levels = new Map();
+    config.coins.forEach(coin => {
+      const vol = volatility.get(coin);
+      // Coins without data, or when every coin is flat, stay at the base interval
+      const ratio = vol > 0 && median > 0 ? vol / median : 1;
+      levels.set(coin, this.nearestLevel(baseSlots / ratio));
+    });
+
+    const toPlan = () => new Map([...levels].map(([coin, level]) => [coin, this.ladder[level]]));
+    // Slow every coin on the given level down one step
+    const slowDown = level => levels.forEach((current, coin) => {
+      if (current === level) {
+        levels.set(coin, level + 1);
+      }
+    });
+
+    let plan = toPlan();
+    let cost = this.hourlyCost(plan);
+    while (cost > config.requestBudgetPerHour) {
+      // Quiet levels, quietest first
+      const quietLevels = [...new Set(levels.values())]
+        .filter(level => level >= baseLevel && level < slowest)
+        .sort((a, b) => b - a);
+
+      let reclaimed = false;
+      for (const level of quietLevels) {
+        const before = new Map(levels);
+        slowDown(level);
+        const candidate = toPlan();
+        const candidateCost = this.hourlyCost(candidate);
+        if (candidateCost < cost) {
+          plan = candidate;
+          cost = candidateCost;
+          reclaimed = true;
+          break;
+        }
+        // Their calls are shared with faster coins, so slowing them saves nothing
+        before.forEach((level, coin) => levels.set(coin, level));
+      }
+      if (reclaimed) {
+        continue;
+      }
+
+      const fastest = Math.min(...levels.values());
+      if (fastest >= slowest) {
+        break;
+      }
+      slowDown(fastest);
+      plan = toPlan();
+      cost = this.hourlyCost(plan);
+    }
+    return plan;
+  }
+
+  /**
+   * CoinGecko calls one hour of the plan would make. Every ladder step divides
+   * an hour, so simulating a single hour of slots is exact.
+   * @param {Map<string, number>} plan - Interval in slots per coin
+   * @returns {number}
+   */
+  hourlyCost(plan) {
+    const slotsPerHour = Math.round(60 * 60 * 1000 / this.slotMs);
+    let calls = 0;
+    for (let slot = 0; slot < slotsPerHour; slot++) {
+      let due = 0;
+      plan.forEach(interval => {
+        if (slot % interval === 0) due += 1;
+      });
+      calls += Math.ceil(due / config.shardSize);
+    }
+    return calls;
+  }
+}
+
+module.exports = AdaptiveScheduler;
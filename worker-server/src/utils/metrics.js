@@ -0,0 +1,27 @@
+/**
+ * Prometheus metrics of the worker server
+ */
+const { Registry, Counter, Gauge, Histogram, registerProcessMetrics } = require('koinx-metrics');
+
+const registry = registerProcessMetrics(new Registry());
+
+// Worker server metrics
+const natsPublished = registry.counter('nats_messages_published_total', 'NATS messages published by subject');
+const natsPublishErrors = registry.counter('nats_publish_errors_total', 'Failed NATS publishes by subject');
+const schedulerRuns = registry.counter('scheduler_runs_total', 'Scheduled update runs by scheduler mode');
+const schedulerLateness = registry.histogram(
+  'scheduler_slot_lateness_seconds',
+  'How late adaptive scheduler slots fired relative to their target time',
+  [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5]
+);
+
+module.exports = {
+  registry,
+  Counter,
+  Gauge,
+  Histogram,
+  natsPublished,
+  natsPublishErrors,
+  schedulerRuns,
+  schedulerLateness
+};
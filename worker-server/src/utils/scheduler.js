@@ -1,6 +1,9 @@
+const { randomUUID } = require('crypto');
 const cron = require('node-cron');
 const natsService = require('../services/natsService');
+const AdaptiveScheduler = require('./adaptiveScheduler');
 const config = require('../config');
+const { schedulerRuns } = require('./metrics');
 
 class Scheduler {
   constructor() {
@@ -11,10 +14,53 @@ class Scheduler {
    * Initialize the scheduler and set up jobs
    */
   initialize() {
-    this.setupCryptoUpdateJob();
+    if (config.schedulerMode === 'cron') {
+      this.setupCryptoUpdateJob();
+    } else {
+      this.setupAdaptiveUpdateJob();
+    }
     console.log('Scheduler initialized with jobs');
   }
 
+  /**
+   * Split coins into fixed-size shards
+   * @param {string[]} coins - Coins to split
+   * @returns {string[][]} - Coin ids per shard
+   */
+  getShards(coins) {
+    const shards = [];
+    for (let i = 0; i < coins.length; i += config.shardSize) {
+      shards.push(coins.slice(i, i + config.shardSize));
+    }
+    return shards;
+  }
+
+  /**
+   * Publish one work-queue message per shard for a single update tick
+   * @param {string[]} [coins] - Coins to update (defaults to the whole universe)
+   */
+  async publishUpdate(coins = config.coins) {
+    const timestamp = new Date().toISOString();
+    // One trace id per tick so every stage downstream can be tied back to this fire
+    const traceId = randomUUID();
+    const shards = this.getShards(coins);
+    
+    await Promise.all(shards.map((coins, shard) => natsService.publishDurable(
+      `${config.ingestSubject}.shard.${shard}`,
+      {
+        trigger: 'update',
+        timestamp,
+        traceId,
+        shard,
+        coins
+      },
+      // Identifies the tick and shard in the stream; every call is a new tick with a new id
+      `${timestamp}-${shard}`
+    )));
+    
+    return shards.length;
+  }
+
   /**
    * Set up the job to trigger cryptocurrency data updates
    */
@@ -29,14 +75,12 @@ class Scheduler {
     const job = cron.schedule(config.cronSchedule, async () => {
       try {
         console.log(`Running scheduled job at ${new Date().toISOString()}`);
+        schedulerRuns.inc({ mode: 'cron' });
         
-        // Publish update event to NATS
-        await natsService.publish('crypto.update', { 
-          trigger: 'update',
-          timestamp: new Date().toISOString()
-        });
+        // Publish update shards to the JetStream work queue
+        const shardCount = await this.publishUpdate();
         
-        console.log('Crypto update event published successfully');
+        console.log(`Crypto update event published successfully (${shardCount} shards)`);
       } catch (error) {
         console.error('Error executing crypto update job:', error);
       }
@@ -46,6 +90,19 @@ class Scheduler {
     console.log('Crypto update job scheduled successfully');
   }
 
+  /**
+   * Set up the volatility-driven timer wheel for cryptocurrency data updates
+   */
+  setupAdaptiveUpdateJob() {
+    console.log(`Setting up adaptive crypto update job (budget ${config.requestBudgetPerHour} calls/hour)`);
+    
+    const job = new AdaptiveScheduler(coins => this.publishUpdate(coins));
+    job.start();
+    
+    this.jobs.push(job);
+    console.log('Adaptive crypto update job scheduled successfully');
+  }
+
   /**
    * Stop all scheduled jobs
    */
@@ -55,4 +112,4 @@ class Scheduler {
   }
 }
 
-module.exports = new Scheduler();
\ No newline at end of file
+module.exports = new Scheduler();